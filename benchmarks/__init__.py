@@ -0,0 +1,7 @@
+"""
+Performance benchmarks for Gemini CLI.
+
+    python -m benchmarks            # run and compare with baseline.json
+    python -m benchmarks -k memory  # only matching benchmarks
+    python -m benchmarks --save     # store this run as the baseline
+"""
@@ -0,0 +1,319 @@
+"""
+Benchmark runner: timing, stored baselines and regression report.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, ContextManager, Dict, List, Optional
+
+# Default baseline file, committed alongside the suite
+BASELINE_FILE = Path(__file__).with_name("baseline.json")
+
+# Relative slowdown of the median that counts as a regression
+DEFAULT_THRESHOLD = 0.20
+
+
+@dataclass
+class Benchmark:
+    """A named timed operation."""
+    name: str
+    setup: Callable[[Path], ContextManager[Callable[[], object]]]
+    repeat: int = 5
+    number: int = 1
+    threshold: Optional[float] = None
+    slow: bool = False
+    memory: bool = False
+
+
+REGISTRY: Dict[str, Benchmark] = {}
+
+
+def benchmark(
+    name: str,
+    repeat: int = 5,
+    number: int = 1,
+    threshold: Optional[float] = None,
+    slow: bool = False,
+    memory: bool = False
+):
+    """
+    Register a benchmark.
+
+    The decorated function is a generator taking a scratch directory: it
+    prepares state, yields the callable to time, then cleans up.
+
+    Args:
+        name: Unique dotted name (e.g. "memory.save_10k")
+        repeat: Timed samples
+        number: Calls per sample (for very fast operations)
+        threshold: Regression threshold overriding the run's default
+        slow: Skipped by --quick
+        memory: Also measure the memory kept alive by the operation's
+            return value (and the peak while it runs)
+    """
+    def register(setup):
+        REGISTRY[name] = Benchmark(name, contextmanager(setup), repeat, number, threshold, slow, memory)
+        return setup
+    return register
+
+
+def measure(bench: Benchmark, repeat: Optional[int] = None) -> Dict[str, float]:
+    """
+    Time one benchmark.
+
+    Args:
+        bench: Benchmark to run
+        repeat: Override the number of samples
+
+    Returns:
+        Median, min and max seconds per call, and the sample count (plus
+        retained and peak bytes for memory benchmarks)
+    """
+    samples = []
+    footprint = {}
+    with tempfile.TemporaryDirectory(prefix="gemini-bench-") as scratch:
+        with bench.setup(Path(scratch)) as operation:
+            operation()  # warm-up (imports, caches, .pyc files)
+            for _ in range(repeat or bench.repeat):
+                started = time.perf_counter()
+                for _ in range(bench.number):
+                    operation()
+                samples.append((time.perf_counter() - started) / bench.number)
+            if bench.memory:
+                # Untimed extra call: tracing slows allocation down
+                tracemalloc.start()
+                try:
+                    kept = operation()
+                    retained, peak = tracemalloc.get_traced_memory()
+                finally:
+                    tracemalloc.stop()
+                del kept
+                footprint = {"bytes": retained, "peak_bytes": peak}
+    return {
+        "median": statistics.median(samples),
+        "min": min(samples),
+        "max": max(samples),
+        "samples": len(samples),
+        **footprint,
+    }
+
+
+def environment() -> Dict[str, str]:
+    """Describe the machine a run happened on."""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(terse=True),
+        "machine": platform.machine(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def load_baseline(path: Path) -> Dict:
+    """
+    Read a baseline file.
+
+    Args:
+        path: Baseline JSON
+
+    Returns:
+        Baseline with "meta" and "results" (empty if missing)
+    """
+    try:
+        return json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {"meta": {}, "results": {}}
+
+
+def save_baseline(path: Path, results: Dict[str, Dict], merge: bool = True) -> None:
+    """
+    Write results as the new baseline.
+
+    Args:
+        path: Baseline JSON
+        results: Results by benchmark name
+        merge: Keep baseline entries for benchmarks that were not run
+    """
+    stored = load_baseline(path)["results"] if merge else {}
+    stored.update(results)
+    data = {"meta": environment(), "results": dict(sorted(stored.items()))}
+    Path(path).write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+
+
+def compare(
+    results: Dict[str, Dict],
+    baseline: Dict[str, Dict],
+    threshold: float = DEFAULT_THRESHOLD,
+    thresholds: Optional[Dict[str, float]] = None
+) -> List[Dict]:
+    """
+    Compare medians (and retained memory, where measured) against a baseline.
+
+    Args:
+        results: Current results by name
+        baseline: Baseline results by name
+        threshold: Default relative slowdown that counts as a regression
+        thresholds: Per-benchmark overrides
+
+    Returns:
+        Rows with name, baseline, current, change, memory, memory_change
+        and status ("ok", "regressed", "improved" or "new"); growth of
+        either time or memory past the threshold is a regression
+    """
+    rows = []
+    for name, result in results.items():
+        limit = (thresholds or {}).get(name) or threshold
+        current = result["median"]
+        base = baseline.get(name, {}).get("median")
+        memory = result.get("bytes")
+        if not base:
+            rows.append({
+                "name": name, "baseline": None, "current": current, "change": None,
+                "memory": memory, "memory_change": None, "status": "new",
+            })
+            continue
+        change = current / base - 1
+        base_memory = baseline[name].get("bytes")
+        memory_change = memory / base_memory - 1 if memory is not None and base_memory else None
+        changes = [c for c in (change, memory_change) if c is not None]
+        if any(c > limit for c in changes):
+            status = "regressed"
+        elif any(c < -limit for c in changes):
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append({
+            "name": name, "baseline": base, "current": current, "change": change,
+            "memory": memory, "memory_change": memory_change, "status": status,
+        })
+    return rows
+
+
+def format_seconds(value: Optional[float]) -> str:
+    """Format a duration with a readable unit."""
+    if value is None:
+        return "-"
+    if value >= 1:
+        return f"{value:.2f}s"
+    if value >= 1e-3:
+        return f"{value * 1e3:.1f}ms"
+    return f"{value * 1e6:.0f}µs"
+
+
+def format_bytes(value: Optional[int]) -> str:
+    """Format a byte count with a readable unit."""
+    if value is None:
+        return "-"
+    if value >= 1 << 20:
+        return f"{value / (1 << 20):.1f} MiB"
+    if value >= 1 << 10:
+        return f"{value / (1 << 10):.1f} KiB"
+    return f"{value} B"
+
+
+def format_report(rows: List[Dict]) -> str:
+    """
+    Render comparison rows as a text table.
+
+    Args:
+        rows: Output of compare()
+
+    Returns:
+        Report text
+    """
+    headers = ["Benchmark", "Baseline", "Current", "Change", "Status"]
+    table = [
+        [
+            row["name"],
+            format_seconds(row["baseline"]),
+            format_seconds(row["current"]),
+            f"{row['change']:+.0%}" if row["change"] is not None else "-",
+            row["status"].upper() if row["status"] == "regressed" else row["status"],
+        ]
+        for row in rows
+    ]
+    if any(row.get("memory") is not None for row in rows):
+        headers.insert(4, "Memory")
+        for line, row in zip(table, rows):
+            memory = format_bytes(row.get("memory"))
+            if row.get("memory_change") is not None:
+                memory += f" ({row['memory_change']:+.0%})"
+            line.insert(4, memory)
+    widths = [max(len(str(cell)) for cell in column) for column in zip(headers, *table)]
+    lines = ["  ".join(cell.ljust(width) for cell, width in zip(line, widths)) for line in [headers, *table]]
+    regressed = sum(row["status"] == "regressed" for row in rows)
+    lines.append("")
+    lines.append(f"{len(rows)} benchmark(s), {regressed} regression(s)")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run benchmarks and compare them with the stored baseline."""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Run Gemini CLI benchmarks and compare them with the stored baseline",
+    )
+    parser.add_argument("-k", dest="patterns", action="append", default=[],
+                        help="Only benchmarks whose name contains this (repeatable)")
+    parser.add_argument("--list", action="store_true", help="List benchmarks and exit")
+    parser.add_argument("--quick", action="store_true", help="Skip slow benchmarks, 3 samples each")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE, help="Baseline JSON file")
+    parser.add_argument("--save", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Slowdown that counts as a regression (default: 0.20 = 20%%)")
+    parser.add_argument("--json", type=Path, help="Also write results to this file")
+    parser.add_argument("--no-fail", action="store_true", help="Exit 0 even with regressions")
+    args = parser.parse_args(argv)
+
+    from benchmarks import suite  # noqa: F401 - registers the benchmarks
+
+    selected = [
+        bench for bench in REGISTRY.values()
+        if (not args.patterns or any(p in bench.name for p in args.patterns))
+        and not (args.quick and bench.slow)
+    ]
+    if args.list:
+        for bench in selected:
+            print(bench.name)
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    meta = baseline.get("meta", {})
+    if meta and (meta.get("machine"), meta.get("python")) != (platform.machine(), platform.python_version()):
+        print(
+            f"Note: baseline is from Python {meta.get('python')} on {meta.get('machine')}; "
+            "rerun with --save to compare on this machine",
+            file=sys.stderr,
+        )
+
+    results = {}
+    for bench in selected:
+        print(f"  {bench.name} ...", end="", flush=True, file=sys.stderr)
+        results[bench.name] = measure(bench, repeat=3 if args.quick else None)
+        print(f" {format_seconds(results[bench.name]['median'])}", file=sys.stderr)
+
+    rows = compare(
+        results,
+        baseline.get("results", {}),
+        threshold=args.threshold,
+        thresholds={bench.name: bench.threshold for bench in selected if bench.threshold},
+    )
+    print(format_report(rows))
+
+    if args.json:
+        args.json.write_text(json.dumps({"meta": environment(), "results": results, "report": rows}, indent=2))
+    if args.save:
+        save_baseline(args.baseline, results)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    regressed = any(row["status"] == "regressed" for row in rows)
+    return 1 if regressed and not args.no_fail else 0
@@ -0,0 +1,343 @@
+"""
+Benchmarks for startup, configuration, history persistence, rendering
+and end-to-end requests (against the offline fake API).
+"""
+
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmarks.runner import benchmark
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# A key that passes Auth.validate_api_key; only the fake API ever sees it
+FAKE_API_KEY = "AIza" + "0" * 35
+
+
+def _cli(home: Path, *args: str, check: bool = False):
+    """Return a callable running `python -m gemini_cli.main ARGS` in a fresh process."""
+    env = dict(os.environ, HOME=str(home), PYTHONPATH=str(REPO_ROOT), GEMINI_API_KEY=FAKE_API_KEY)
+    command = [sys.executable, "-m", "gemini_cli.main", *args]
+
+    def run():
+        result = subprocess.run(command, env=env, capture_output=True, check=False)
+        if check and result.returncode != 0:
+            raise RuntimeError(result.stderr.decode(errors="replace"))
+    return run
+
+
+def _write_config(home: Path, text: str) -> None:
+    config_dir = home / ".config" / "gemini-cli"
+    config_dir.mkdir(parents=True, exist_ok=True)
+    (config_dir / "config.toml").write_text(text, encoding="utf-8")
+
+
+# CLI cold start per subcommand (fresh interpreter each call)
+
+COLD_START = {
+    "version": ["--version"],
+    "help": ["--help"],
+    "config_show": ["config", "show"],
+    "doctor": ["doctor"],
+    "cache_stats": ["cache", "stats"],
+    "stats": ["stats"],
+    "serve_status": ["serve", "--status"],
+}
+
+
+def _cold_start(args):
+    def setup(scratch):
+        yield _cli(scratch, *args)
+    return setup
+
+
+for _name, _args in COLD_START.items():
+    benchmark(f"startup.{_name}", threshold=0.3)(_cold_start(_args))
+
+
+# Configuration
+
+@benchmark("config.load", number=50)
+def config_load(scratch):
+    from gemini_cli.core.config import Config
+
+    config = Config(config_dir=scratch)
+    shutil.copy(REPO_ROOT / "config.example.toml", config.config_file)
+    yield config.load
+
+
+@benchmark("config.properties", number=200)
+def config_properties(scratch):
+    from gemini_cli.core.config import Config
+
+    config = Config(config_dir=scratch)
+    shutil.copy(REPO_ROOT / "config.example.toml", config.config_file)
+    config.load()
+
+    def access():
+        # What a chat start-up reads
+        config.api, config.generation, config.ui, config.history
+        config.resilience, config.cache, config.ratelimit, config.metrics
+    yield access
+
+
+# Conversation history persistence
+
+def _memory(scratch: Path, messages: int):
+    from gemini_cli.utils.memory import ConversationMemory
+
+    memory = ConversationMemory(data_dir=scratch, max_entries=messages)
+    for i in range(messages):
+        role = "user" if i % 2 == 0 else "model"
+        memory.add_message(role, f"Message {i}: " + "lorem ipsum dolor sit amet " * 8)
+    return memory
+
+
+def _memory_benchmarks(label: str, messages: int, repeat: int, slow: bool = False):
+    @benchmark(f"memory.save_{label}", repeat=repeat, slow=slow)
+    def save(scratch):
+        # One chat turn saved on top of `messages` of history
+        memory = _memory(scratch, messages)
+        memory.save()
+
+        def turn():
+            memory.add_message("user", "question " * 20)
+            memory.add_message("model", "answer " * 80)
+            memory.save()
+        yield turn
+        memory.close()
+
+    @benchmark(f"memory.load_{label}", repeat=repeat, slow=slow)
+    def load(scratch):
+        memory = _memory(scratch, messages)
+        memory.save()
+        yield memory.load
+
+
+_memory_benchmarks("1k", 1_000, repeat=10)
+_memory_benchmarks("10k", 10_000, repeat=5)
+_memory_benchmarks("100k", 100_000, repeat=3, slow=True)
+
+
+@benchmark("memory.turn_autosave_10k", repeat=10)
+def turn_autosave(scratch):
+    # What the chat thread pays per turn when a background writer saves
+    from gemini_cli.utils.autosave import AutoSaver
+
+    memory = _memory(scratch, 10_000)
+    memory.save()
+    saver = AutoSaver(memory.save, debounce=0.05)
+
+    def turn():
+        memory.add_message("user", "question " * 20)
+        memory.add_message("model", "answer " * 80)
+        saver.request()
+    yield turn
+    saver.close()
+    memory.close()
+
+
+@benchmark("memory.context_summarized_1k", repeat=10, number=20)
+def context_summarized(scratch):
+    # Context selection with a cached rolling summary (no summary requests)
+    from gemini_cli.utils.summary import Summarizer
+
+    memory = _memory(scratch, 1_000)
+    summarizer = Summarizer(lambda prompt: "summary " * 50, threshold=4000)
+    memory.get_context_for_api(max_tokens=100_000, summarizer=summarizer)
+    yield lambda: memory.get_context_for_api(max_tokens=100_000, summarizer=summarizer)
+    memory.close()
+
+
+def _footprint_benchmark(label: str, messages: int, slow: bool = False):
+    @benchmark(f"memory.footprint_{label}", repeat=3, slow=slow, memory=True)
+    def footprint(scratch):
+        # RAM held by a loaded history (the figure that matters on low-memory phones)
+        from gemini_cli.utils.memory import ConversationMemory
+
+        _memory(scratch, messages).close()
+
+        def load():
+            memory = ConversationMemory(data_dir=scratch, max_entries=messages)
+            memory.log.close()
+            return memory
+        yield load
+
+
+_footprint_benchmark("10k", 10_000)
+_footprint_benchmark("100k", 100_000, slow=True)
+
+
+def _search_benchmark(backend: str, label: str, messages: int, slow: bool = False):
+    @benchmark(f"history.search_{backend}_{label}", repeat=5, slow=slow)
+    def search(scratch):
+        from gemini_cli.utils.memory import ConversationMemory
+
+        memory = ConversationMemory(data_dir=scratch, max_entries=messages, backend=backend)
+        memory.log.append(
+            {
+                "role": "user" if i % 2 == 0 else "model",
+                "content": f"Message {i} about topic{i % 500}: " + "lorem ipsum dolor sit amet " * 8,
+                "timestamp": f"2024-01-01T00:00:{i:09d}",
+            }
+            for i in range(messages)
+        )
+        yield lambda: memory.search("topic123 lorem", limit=20)
+        memory.close()
+
+
+_search_benchmark("jsonl", "10k", 10_000)
+_search_benchmark("sqlite", "10k", 10_000)
+_search_benchmark("sqlite", "100k", 100_000, slow=True)
+
+
+def _export_benchmark(label: str, messages: int, output: str, slow: bool = False):
+    @benchmark(f"history.export_{label}", repeat=3, slow=slow, memory=True)
+    def export(scratch):
+        from gemini_cli.utils.memory import ConversationMemory
+
+        memory = ConversationMemory(data_dir=scratch / "data", max_entries=messages)
+        memory.log.append(
+            {
+                "role": "user" if i % 2 == 0 else "model",
+                "content": f"Message {i}: " + "lorem ipsum dolor sit amet " * 8,
+                "timestamp": "2024-01-01T00:00:00",
+            }
+            for i in range(messages)
+        )
+        yield lambda: memory.export(scratch / output)
+        memory.close()
+
+
+_export_benchmark("md_10k", 10_000, "out.md")
+_export_benchmark("jsonl_gz_10k", 10_000, "out.jsonl.gz")
+_export_benchmark("html_gz_100k", 100_000, "out.html.gz", slow=True)
+
+
+def _many_sessions(scratch: Path, sessions: int, messages: int):
+    from gemini_cli.utils.memory import ConversationMemory
+
+    memory = ConversationMemory(data_dir=scratch, max_entries=messages)
+    for s in range(sessions):
+        memory.switch(f"project-{s}")
+        for i in range(messages):
+            memory.add_message("user" if i % 2 == 0 else "model", f"Message {i} " + "lorem ipsum " * 20)
+    memory.switch("project-0")
+    return memory
+
+
+@benchmark("sessions.list_500", repeat=10, number=20, threshold=0.5)
+def sessions_list(scratch):
+    memory = _many_sessions(scratch, 500, 2)
+    yield memory.sessions.list
+    memory.close()
+
+
+@benchmark("sessions.switch_500")
+def sessions_switch(scratch):
+    # Switching reads only the target's tail, however many sessions exist
+    memory = _many_sessions(scratch, 500, 2)
+    memory.max_entries = 1000
+    memory.switch("big-a")
+    for i in range(1000):
+        memory.add_message("user", f"Message {i} " + "lorem ipsum " * 20)
+    memory.switch("big-b")
+    for i in range(1000):
+        memory.add_message("user", f"Message {i} " + "lorem ipsum " * 20)
+    memory.save()
+
+    def switch():
+        memory.switch("big-a" if memory.session == "big-b" else "big-b")
+    yield switch
+    memory.close()
+
+
+# Rendering
+
+def _large_markdown(sections: int = 40) -> str:
+    parts = []
+    for i in range(sections):
+        parts.append(f"## Section {i}\n\nSome **bold** text, `inline code` and a [link](https://example.com).\n")
+        parts.append("\n".join(f"- item {j} with *emphasis*" for j in range(5)))
+        parts.append("\n```python\n" + "\n".join(f"def f{j}(x):\n    return x * {j}" for j in range(5)) + "\n```\n")
+    return "\n".join(parts)
+
+
+def _display():
+    from rich.console import Console
+    from gemini_cli.ui.display import Display
+
+    display = Display()
+    display.console = Console(file=io.StringIO(), width=100, force_terminal=True, color_system="truecolor")
+    return display
+
+
+@benchmark("render.markdown_large")
+def render_markdown(scratch):
+    display = _display()
+    text = _large_markdown()
+    yield lambda: display.print_markdown(text)
+
+
+@benchmark("render.stream_20k_chunks")
+def render_stream(scratch):
+    display = _display()
+    chunks = ["token "] * 20_000
+    yield lambda: display.print_stream(iter(chunks))
+
+
+# End-to-end requests against the fake API
+
+@benchmark("client.stream_fake", number=20)
+def client_stream(scratch):
+    from gemini_cli.core.client import GeminiClient
+    from gemini_cli.core.fake import FakeSettings, FakeTransport
+
+    transport = FakeTransport(FakeSettings(response_chars=2000, chunk_size=16))
+    client = GeminiClient(FAKE_API_KEY, model="gemini-1.5-flash", backend="rest", transport=transport)
+    yield lambda: "".join(client.generate_content("hello", stream=True, use_cache=False))
+
+
+def _fake_cli(scratch: Path):
+    from gemini_cli.core.fake import FakeServer, FakeSettings
+
+    server = FakeServer(FakeSettings(response_chars=2000, chunk_size=16)).start()
+    _write_config(scratch, (
+        f'[api]\nbackend = "rest"\nbase_url = "{server.url}"\nmodel = "gemini-1.5-flash"\n'
+        '[daemon]\nenabled = false\n[ratelimit]\nenabled = false\n'
+    ))
+    return server
+
+
+@benchmark("e2e.ask", threshold=0.3)
+def e2e_ask(scratch):
+    server = _fake_cli(scratch)
+    try:
+        yield _cli(scratch, "ask", "--no-cache", "hello", check=True)
+    finally:
+        server.close()
+
+
+@benchmark("e2e.ask_stream", threshold=0.3)
+def e2e_ask_stream(scratch):
+    server = _fake_cli(scratch)
+    try:
+        yield _cli(scratch, "ask", "--stream", "--no-cache", "hello", check=True)
+    finally:
+        server.close()
+
+
+@benchmark("e2e.batch_20", threshold=0.3)
+def e2e_batch(scratch):
+    server = _fake_cli(scratch)
+    prompts = scratch / "prompts.jsonl"
+    prompts.write_text("".join(json.dumps(f"question {i}") + "\n" for i in range(20)))
+    try:
+        yield _cli(scratch, "batch", str(prompts), "--no-resume", "-o", str(scratch / "out.jsonl"), check=True)
+    finally:
+        server.close()
@@ -13,14 +13,17 @@ __version__ = "1.0.0"
 __author__ = "Alex72-py"
 __license__ = "MIT"
 
-from gemini_cli.core.config import Config
-from gemini_cli.core.auth import Auth
-
 __all__ = ["GeminiClient", "Config", "Auth", "__version__"]
 
+_LAZY_EXPORTS = {
+    "GeminiClient": "gemini_cli.core.client",
+    "Config": "gemini_cli.core.config",
+    "Auth": "gemini_cli.core.auth",
+}
+
 
 def __getattr__(name: str):
-    """Lazily import optional heavy modules on demand."""
-    if name == "GeminiClient":
-        return import_module("gemini_cli.core.client").GeminiClient
+    """Lazily import modules on demand so `--version` stays cheap."""
+    if name in _LAZY_EXPORTS:
+        return getattr(import_module(_LAZY_EXPORTS[name]), name)
     raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
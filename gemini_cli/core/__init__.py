@@ -5,11 +5,16 @@ from importlib import import_module
 from gemini_cli.core.auth import Auth
 from gemini_cli.core.config import Config
 
-__all__ = ["Auth", "Config", "GeminiClient"]
+__all__ = ["Auth", "Config", "GeminiClient", "AsyncGeminiClient"]
+
+_LAZY_EXPORTS = {
+    "GeminiClient": "gemini_cli.core.client",
+    "AsyncGeminiClient": "gemini_cli.core.async_client",
+}
 
 
 def __getattr__(name: str):
-    """Lazily expose GeminiClient so non-API features work without SDK deps."""
-    if name == "GeminiClient":
-        return import_module("gemini_cli.core.client").GeminiClient
+    """Lazily expose API clients so non-API features work without SDK deps."""
+    if name in _LAZY_EXPORTS:
+        return getattr(import_module(_LAZY_EXPORTS[name]), name)
     raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
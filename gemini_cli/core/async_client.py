@@ -0,0 +1,336 @@
+"""
+Asyncio Gemini API client.
+Runs many streaming generations concurrently on one event loop.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Dict, Iterable, List, Optional, TypeVar
+
+from gemini_cli.core.cache import ResponseCache
+from gemini_cli.core.client import GeminiClient
+from gemini_cli.core.singleflight import AsyncSingleFlight
+from gemini_cli.core.tokens import estimate_content_tokens
+
+T = TypeVar("T")
+
+
+class AsyncGeminiClient:
+    """Asyncio counterpart to GeminiClient with a concurrency limit."""
+
+    MODELS = GeminiClient.MODELS
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gemini-2.0-flash-exp",
+        max_concurrency: int = 8,
+        **generation_config
+    ):
+        """
+        Initialize async Gemini client.
+
+        Args:
+            api_key: Google API key
+            model: Model name to use
+            max_concurrency: Maximum number of requests in flight at once
+            **generation_config: Additional generation parameters
+        """
+        self._setup(GeminiClient(api_key=api_key, model=model, **generation_config), max_concurrency)
+
+    @classmethod
+    def from_client(cls, client: GeminiClient, max_concurrency: int = 8) -> "AsyncGeminiClient":
+        """
+        Wrap an existing GeminiClient, sharing its model and chat session.
+
+        Args:
+            client: Configured GeminiClient
+            max_concurrency: Maximum number of requests in flight at once
+
+        Returns:
+            AsyncGeminiClient instance
+        """
+        instance = cls.__new__(cls)
+        instance._setup(client, max_concurrency)
+        return instance
+
+    def _setup(self, client: GeminiClient, max_concurrency: int) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._in_flight = 0
+        # A chat session can only have one turn in flight
+        self._chat_lock = asyncio.Lock()
+        # Coalesce identical one-shot requests when the client does
+        self._flights = AsyncSingleFlight() if getattr(client, "inflight", None) is not None else None
+
+    @property
+    def model_name(self) -> str:
+        """Current model name."""
+        return self.client.model_name
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests currently holding a concurrency slot."""
+        return self._in_flight
+
+    async def aclose(self) -> None:
+        """Close the connections opened for the running event loop."""
+        close = getattr(self.client.api, "aclose", None)
+        if close is not None:
+            await close()
+
+    def run(self, coroutine: Awaitable[T]) -> T:
+        """
+        Run a coroutine on a new event loop, like asyncio.run().
+
+        Connections opened on the loop are closed before it ends, so
+        repeated runs (e.g. one per /compare) don't leak a pool each.
+
+        Args:
+            coroutine: Work using this client
+
+        Returns:
+            The coroutine's result
+        """
+        async def main():
+            try:
+                return await coroutine
+            finally:
+                await self.aclose()
+        return asyncio.run(main())
+
+    @asynccontextmanager
+    async def _slot(self):
+        """Hold one concurrency slot for the duration of a request."""
+        async with self._semaphore:
+            self._in_flight += 1
+            try:
+                yield
+            finally:
+                self._in_flight -= 1
+
+    def start_chat(self, history: Optional[List[Dict[str, str]]] = None) -> None:
+        """
+        Start a new chat session.
+
+        Args:
+            history: Optional conversation history
+        """
+        self.client.start_chat(history=history)
+
+    async def send_message(self, message: str) -> AsyncIterator[str]:
+        """
+        Send a message in the current chat session.
+
+        Args:
+            message: Message to send
+
+        Yields:
+            Response text chunks
+        """
+        async for chunk in self._send_chat(message):
+            yield chunk
+
+    async def send_message_with_files(
+        self,
+        message: str,
+        files: List[Path]
+    ) -> AsyncIterator[str]:
+        """
+        Send a message with file attachments.
+
+        Files are uploaded concurrently in worker threads before the message
+        is sent.
+
+        Args:
+            message: Message to send
+            files: List of file paths to attach
+
+        Yields:
+            Response text chunks
+        """
+        uploaded_files = await self.upload_files(files)
+        async for chunk in self._send_chat([message, *uploaded_files]):
+            yield chunk
+
+    async def generate_content(
+        self,
+        prompt: str,
+        files: Optional[List[Path]] = None,
+        model: Optional[str] = None,
+        generation_config: Optional[Dict] = None
+    ) -> AsyncIterator[str]:
+        """
+        Generate content without chat context (one-shot).
+
+        Args:
+            prompt: Prompt to generate from
+            files: Optional file paths to attach
+            model: Optional model override for this request
+            generation_config: Optional parameters merged over the client's
+
+        Yields:
+            Generated text chunks
+        """
+        metrics = getattr(self.client, "request_metrics", None)
+        record = metrics.begin(model or self.model_name) if metrics is not None else None
+        error = None
+        first = None
+        try:
+            if self._flights is not None:
+                # Identical concurrent requests share one upstream stream
+                key = ResponseCache.make_key(
+                    model or self.model_name,
+                    {**self.client.generation_config, **(generation_config or {})},
+                    prompt,
+                    files,
+                )
+                chunks = self._flights.subscribe(
+                    key, lambda: self._generate(prompt, files, model, generation_config, record)
+                )
+            else:
+                chunks = self._generate(prompt, files, model, generation_config, record)
+            async for chunk in chunks:
+                if record is not None:
+                    if first is None:
+                        record.mark("ttft")
+                        first = time.perf_counter()
+                    record.count("chunks")
+                    record.count("bytes", len(chunk.encode("utf-8")))
+                yield chunk
+        except BaseException as e:
+            # Includes cancellation (e.g. race losers), recorded as a failure
+            error = e
+            raise
+        finally:
+            if record is not None:
+                if first is not None:
+                    record.add_time("stream", time.perf_counter() - first)
+                metrics.finish(record, error)
+
+    async def _generate(
+        self,
+        prompt: str,
+        files: Optional[List[Path]],
+        model: Optional[str],
+        generation_config: Optional[Dict],
+        record=None
+    ) -> AsyncIterator[str]:
+        """Upload attachments and stream one upstream generation."""
+        content = prompt
+        if files:
+            started = time.perf_counter()
+            content = [prompt, *await self.upload_files(files)]
+            if record is not None:
+                record.add_time("upload", time.perf_counter() - started)
+
+        generative_model = self.client.get_model(model, generation_config)
+        async with self._slot():
+            chunks = self._resilient(
+                lambda: self._iter_text(generative_model.generate_content_async(content, stream=True)),
+                permit=self._permit(content, model),
+            )
+            async for chunk in chunks:
+                yield chunk
+
+    async def generate_text(self, prompt: str, **options) -> str:
+        """
+        Generate content and return the full text.
+
+        Args:
+            prompt: Prompt to generate from
+            **options: Extra arguments for generate_content
+
+        Returns:
+            Generated text
+        """
+        return "".join([chunk async for chunk in self.generate_content(prompt, **options)])
+
+    async def generate_many(self, prompts: Iterable[str]) -> List[str]:
+        """
+        Generate responses for many prompts concurrently.
+
+        Args:
+            prompts: Prompts to generate from
+
+        Returns:
+            Generated texts in prompt order
+        """
+        return list(await asyncio.gather(*(self.generate_text(p) for p in prompts)))
+
+    async def upload_files(self, files: List[Path]) -> list:
+        """
+        Upload files concurrently, reusing handles for known content.
+
+        Args:
+            files: List of file paths to upload
+
+        Returns:
+            Uploaded file parts (failed uploads are skipped)
+        """
+        results = await asyncio.to_thread(self.client.uploads.upload, files)
+        uploaded_files = []
+        for result in results:
+            if result.ok:
+                uploaded_files.append(result.part)
+            else:
+                print(f"Warning: Could not upload {result.path}: {result.error}")
+        return uploaded_files
+
+    async def _send_chat(self, content) -> AsyncIterator[str]:
+        if self.client.chat_session is None:
+            self.client.start_chat()
+
+        chat_session = self.client.chat_session
+        async with self._chat_lock, self._slot():
+            chunks = self._resilient(
+                lambda: self._iter_text(chat_session.send_message_async(content, stream=True)),
+                idempotent=False,
+                permit=self._permit(content),
+            )
+            async for chunk in chunks:
+                yield chunk
+
+    def _permit(self, content, model: Optional[str] = None):
+        """Create a rate-limit permit when the client has a limiter."""
+        limiter = getattr(self.client, "rate_limiter", None)
+        if limiter is None:
+            return None
+        return limiter.permit(model or self.model_name, estimate_content_tokens(content))
+
+    def _resilient(self, factory, idempotent: bool = True, permit=None) -> AsyncIterator[str]:
+        """Apply the client's rate limit, deadlines, retries and breaker when present."""
+        resilience = getattr(self.client, "resilience", None)
+        if resilience is None:
+            return factory()
+        return resilience.astream(factory, idempotent=idempotent, permit=permit)
+
+    @staticmethod
+    async def _iter_text(pending_response) -> AsyncIterator[str]:
+        """Await a streamed response and yield the text of each chunk."""
+        response = await pending_response
+        async for chunk in response:
+            if chunk.text:
+                yield chunk.text
+
+    def get_history(self) -> List[Dict[str, str]]:
+        """Get chat history."""
+        return self.client.get_history()
+
+    def clear_history(self) -> None:
+        """Clear chat history and start fresh."""
+        self.client.clear_history()
+
+    def set_model(self, model: str) -> None:
+        """
+        Change the model.
+
+        Args:
+            model: New model name
+        """
+        self.client.set_model(model)
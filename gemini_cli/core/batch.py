@@ -0,0 +1,254 @@
+"""
+Batch generation over JSONL prompt files.
+Runs prompts with a bounded worker pool, streams results as JSONL in
+completion order and resumes interrupted runs from the output file.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, TextIO
+
+
+@dataclass
+class BatchItem:
+    """One prompt read from a batch input file."""
+    index: int
+    prompt: str
+    id: Optional[str] = None
+    model: Optional[str] = None
+    generation_config: Dict = field(default_factory=dict)
+    files: List[str] = field(default_factory=list)
+
+    @property
+    def fingerprint(self) -> str:
+        """Short hash of the request, stored with its result to match it on resume."""
+        request = [self.prompt, self.model, self.generation_config, self.files]
+        data = json.dumps(request, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        return hashlib.sha256(data).hexdigest()[:16]
+
+
+@dataclass
+class BatchStats:
+    """Summary of a batch run."""
+    total: int = 0
+    skipped: int = 0
+    changed: int = 0  # done before, but for a different input line; run again
+    succeeded: int = 0
+    failed: int = 0
+    elapsed: float = 0.0
+
+
+def read_items(input_path: Path) -> Iterator[BatchItem]:
+    """
+    Read batch items lazily from a JSONL file.
+
+    Each line is either a JSON string (the prompt) or an object with a
+    ``prompt`` field and optional ``id``, ``model``, ``generation_config``
+    and ``files``. Blank lines are skipped but still count as an index.
+
+    Args:
+        input_path: Path to the JSONL input file
+
+    Yields:
+        BatchItem per prompt line
+
+    Raises:
+        ValueError: If a line is not valid JSON or has no prompt
+    """
+    with open(input_path, "r", encoding="utf-8") as f:
+        for index, line in enumerate(f):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Line {index + 1}: invalid JSON ({e})") from e
+
+            if isinstance(record, str):
+                record = {"prompt": record}
+            if not isinstance(record, dict) or not record.get("prompt"):
+                raise ValueError(f"Line {index + 1}: missing 'prompt'")
+
+            yield BatchItem(
+                index=index,
+                prompt=record["prompt"],
+                id=record.get("id"),
+                model=record.get("model"),
+                generation_config=record.get("generation_config") or {},
+                files=record.get("files") or [],
+            )
+
+
+def load_completed(output_path: Path) -> Dict[int, Optional[str]]:
+    """
+    Collect indices that already have a successful result.
+
+    The output file doubles as the checkpoint: failed items and a torn
+    final line (from a killed process) are ignored so they run again.
+
+    Args:
+        output_path: Path to a previous run's output file
+
+    Returns:
+        Completed input indices mapped to the fingerprint of the request
+        they answered (None for records written without one)
+    """
+    completed: Dict[int, Optional[str]] = {}
+    if not output_path.exists():
+        return completed
+
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(record, dict) and "response" in record:
+                completed[record["index"]] = record.get("input")
+    return completed
+
+
+def open_output(output_path: Path, resume: bool = True) -> TextIO:
+    """
+    Open the results file for appending (resume) or from scratch.
+
+    A torn final line left by a killed run is terminated first so the next
+    record starts on its own line.
+
+    Args:
+        output_path: Path to the results file
+        resume: Whether to keep existing results
+
+    Returns:
+        Writable text stream
+    """
+    if resume and output_path.exists() and output_path.stat().st_size:
+        with open(output_path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            torn = f.read(1) != b"\n"
+        output = open(output_path, "a", encoding="utf-8")
+        if torn:
+            output.write("\n")
+        return output
+    return open(output_path, "a" if resume else "w", encoding="utf-8")
+
+
+class BatchRunner:
+    """Runs batch items through an AsyncGeminiClient with N workers."""
+
+    def __init__(
+        self,
+        client,
+        output: TextIO,
+        workers: int = 8,
+        checkpoint_every: int = 20
+    ):
+        """
+        Initialize batch runner.
+
+        Args:
+            client: AsyncGeminiClient to generate with
+            output: Text stream results are appended to
+            workers: Number of concurrent workers
+            checkpoint_every: Fsync the output after this many results
+        """
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.client = client
+        self.output = output
+        self.workers = workers
+        self.checkpoint_every = checkpoint_every
+        self.stats = BatchStats()
+        self._unsynced = 0
+
+    async def run(
+        self,
+        items: Iterator[BatchItem],
+        skip: Optional[Dict[int, Optional[str]]] = None
+    ) -> BatchStats:
+        """
+        Run all items, writing one JSONL record per finished item.
+
+        Args:
+            items: Batch items (consumed lazily)
+            skip: Completed indices and their fingerprints (from
+                load_completed); an item is skipped only if its fingerprint
+                still matches, otherwise it runs again and counts as changed
+
+        Returns:
+            Run statistics
+        """
+        skip = skip or {}
+        start = time.monotonic()
+        # Bounded queue keeps memory flat for very large input files
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.workers * 2)
+        workers = [asyncio.create_task(self._worker(queue)) for _ in range(self.workers)]
+
+        try:
+            for item in items:
+                self.stats.total += 1
+                if item.index in skip:
+                    if skip[item.index] == item.fingerprint:
+                        self.stats.skipped += 1
+                        continue
+                    self.stats.changed += 1
+                await queue.put(item)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            self._checkpoint()
+            self.stats.elapsed = time.monotonic() - start
+
+        return self.stats
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            self._write(await self._process(item))
+
+    async def _process(self, item: BatchItem) -> Dict:
+        record = {"index": item.index, "input": item.fingerprint}
+        if item.id is not None:
+            record["id"] = item.id
+        record["model"] = item.model or self.client.model_name
+
+        started = time.monotonic()
+        try:
+            record["response"] = await self.client.generate_text(
+                item.prompt,
+                files=[Path(f) for f in item.files],
+                model=item.model,
+                generation_config=item.generation_config,
+            )
+            self.stats.succeeded += 1
+        except Exception as e:
+            record["error"] = str(e)
+            self.stats.failed += 1
+        record["elapsed"] = round(time.monotonic() - started, 3)
+        return record
+
+    def _write(self, record: Dict) -> None:
+        self.output.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.output.flush()
+        self._unsynced += 1
+        if self._unsynced >= self.checkpoint_every:
+            self._checkpoint()
+
+    def _checkpoint(self) -> None:
+        """Force written results to disk so a killed run can resume."""
+        self._unsynced = 0
+        try:
+            os.fsync(self.output.fileno())
+        except (AttributeError, OSError, ValueError):
+            # Not a real file (e.g. stdout pipe or StringIO)
+            pass
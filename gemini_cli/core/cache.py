@@ -0,0 +1,298 @@
+"""
+Persistent response cache for one-shot generations.
+Entries are content-addressed by model, generation config, prompt and
+attachment bytes, expire after a TTL and are evicted least-recently-used
+once the cache grows past its size bound. Hit/miss counters are kept in
+memory and added to the shared stats file on close (and at exit).
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import Dict, Generator, Iterable, List, Optional, Tuple
+
+from gemini_cli.utils.locking import locked_json, read_json
+
+# Open caches, closed at exit so unsaved counters reach stats_file
+_open_caches: "weakref.WeakSet[ResponseCache]" = weakref.WeakSet()
+
+
+@atexit.register
+def _close_caches() -> None:
+    for cache in list(_open_caches):
+        cache.close()
+
+
+class ResponseCache:
+    """On-disk cache of generated responses."""
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        ttl: float = 7 * 24 * 3600,
+        max_size: int = 50 * 1024 * 1024,
+        sampled: bool = False
+    ):
+        """
+        Initialize response cache.
+
+        Args:
+            cache_dir: Directory for cache entries (e.g. Config.cache_dir / "responses")
+            ttl: Seconds an entry stays valid (0 disables expiry)
+            max_size: Maximum total size of entries in bytes
+            sampled: Also cache requests sampled with a temperature above 0,
+                whose answers are not meant to repeat
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_size = max_size
+        self.sampled = sampled
+        self.stats_file = self.cache_dir / "stats.json"
+        self._lock = threading.Lock()
+        # Lookups not yet added to stats_file
+        self._counters = {"hits": 0, "misses": 0}
+        # Approximate bytes on disk; scanned on the first put
+        self._size: Optional[int] = None
+        _open_caches.add(self)
+
+    @staticmethod
+    def make_key(
+        model: str,
+        generation_config: Dict,
+        prompt: str,
+        files: Optional[Iterable[Path]] = None
+    ) -> str:
+        """
+        Build the cache key for a request.
+
+        Args:
+            model: Model name
+            generation_config: Generation parameters
+            prompt: Prompt text
+            files: Attachment paths (hashed by content, not name)
+
+        Returns:
+            Hex digest identifying the request
+        """
+        digest = hashlib.sha256()
+        header = {"model": model, "generation_config": generation_config, "prompt": prompt}
+        digest.update(json.dumps(header, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+        for file_path in files or []:
+            digest.update(b"\0file\0")
+            digest.update(hash_file(Path(file_path)).encode("ascii"))
+        return digest.hexdigest()
+
+    def accepts(self, generation_config: Dict) -> bool:
+        """
+        Whether requests with these generation parameters are cached.
+
+        Only deterministic (temperature 0) requests are, unless `sampled`
+        is set; the API samples when no temperature is given.
+        """
+        return self.sampled or generation_config.get("temperature") == 0
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[List[str]]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            Cached response chunks, or None on miss
+        """
+        path = self._entry_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self._count("misses")
+            return None
+
+        if self.ttl and time.time() - entry.get("created", 0) > self.ttl:
+            path.unlink(missing_ok=True)
+            self._count("misses")
+            return None
+
+        # Touch for LRU ordering
+        os.utime(path)
+        self._count("hits")
+        return entry["chunks"]
+
+    def put(self, key: str, chunks: List[str], model: str = "") -> None:
+        """
+        Store a response.
+
+        Args:
+            key: Cache key from make_key
+            chunks: Response chunks in order
+            model: Model name (informational)
+        """
+        path = self._entry_path(key)
+        path.parent.mkdir(exist_ok=True)
+        # Unique per thread: batch workers and daemon handlers may store the same key
+        tmp_path = path.with_name(f"{key}.{os.getpid()}.{threading.get_ident()}.tmp")
+        entry = {"created": time.time(), "model": model, "chunks": chunks}
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+                written = f.tell()
+            os.replace(tmp_path, path)
+        except OSError as e:
+            tmp_path.unlink(missing_ok=True)
+            print(f"Warning: Could not write response cache: {e}")
+            return
+
+        with self._lock:
+            if self._size is None:
+                self._size = sum(stat.st_size for _, stat in self._entries())
+            else:
+                # Other processes' writes are only seen at the next eviction scan
+                self._size += written
+            over = self._size > self.max_size
+        if over:
+            self.evict()
+
+    def record(
+        self,
+        key: str,
+        chunks: Iterable[str],
+        model: str = ""
+    ) -> Generator[str, None, None]:
+        """
+        Pass chunks through and cache them once the stream completes.
+
+        Args:
+            key: Cache key from make_key
+            chunks: Streamed response chunks
+            model: Model name (informational)
+
+        Yields:
+            The same chunks
+        """
+        collected = []
+        for chunk in chunks:
+            collected.append(chunk)
+            yield chunk
+        self.put(key, collected, model=model)
+
+    def _entries(self) -> List[Tuple[Path, os.stat_result]]:
+        entries = []
+        for path in self.cache_dir.glob("??/*.json"):
+            try:
+                entries.append((path, path.stat()))
+            except FileNotFoundError:
+                continue
+        return entries
+
+    def evict(self) -> int:
+        """
+        Remove expired entries, then least recently used ones over max_size.
+
+        Returns:
+            Number of entries removed
+        """
+        now = time.time()
+        removed = 0
+        live = []
+        for path, stat in self._entries():
+            # mtime >= creation time, so an entry untouched for a full TTL is expired
+            if self.ttl and now - stat.st_mtime > self.ttl:
+                path.unlink(missing_ok=True)
+                removed += 1
+            else:
+                live.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in live)
+        for _, size, path in sorted(live):
+            if total <= self.max_size:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        with self._lock:
+            self._size = total
+        return removed
+
+    def clear(self) -> int:
+        """
+        Remove all entries and reset counters.
+
+        Returns:
+            Number of entries removed
+        """
+        entries = self._entries()
+        for path, _ in entries:
+            path.unlink(missing_ok=True)
+        with self._lock:
+            self._counters = dict.fromkeys(self._counters, 0)
+            self._size = 0
+            self.stats_file.unlink(missing_ok=True)
+        return len(entries)
+
+    def _count(self, field: str) -> None:
+        """Increment an in-memory hit/miss counter (persisted by close)."""
+        with self._lock:
+            self._counters[field] += 1
+
+    def close(self) -> None:
+        """Add this process's hit/miss counts to the shared stats file."""
+        with self._lock:
+            pending, self._counters = self._counters, dict.fromkeys(self._counters, 0)
+            if not any(pending.values()):
+                return
+            try:
+                with locked_json(self.stats_file) as counters:
+                    for field, count in pending.items():
+                        counters[field] = counters.get(field, 0) + count
+            except OSError:
+                pass
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dict with hits, misses (this process's unsaved ones included),
+            entries and bytes
+        """
+        counters = read_json(self.stats_file)
+        with self._lock:
+            pending = dict(self._counters)
+        entries = self._entries()
+        return {
+            "hits": counters.get("hits", 0) + pending["hits"],
+            "misses": counters.get("misses", 0) + pending["misses"],
+            "entries": len(entries),
+            "bytes": sum(stat.st_size for _, stat in entries),
+        }
+
+
+def hash_file(file_path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Hash a file's contents.
+
+    Args:
+        file_path: Path to file
+        chunk_size: Read size in bytes
+
+    Returns:
+        SHA-256 hex digest
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while True:
+            block = f.read(chunk_size)
+            if not block:
+                break
+            digest.update(block)
+    return digest.hexdigest()
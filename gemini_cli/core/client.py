@@ -3,14 +3,54 @@ Gemini API client for chat and generation.
 Handles all interactions with Google's Generative AI API.
 """
 
+import json
+import threading
+import time
+from collections import OrderedDict
 from importlib import import_module
 from importlib.util import find_spec
 from pathlib import Path
 from typing import Generator, List, Dict, Optional
 
+from gemini_cli.core.cache import ResponseCache
+from gemini_cli.core.metrics import current_request
+from gemini_cli.core.resilience import Resilience, RetryPolicy
+from gemini_cli.core.tokens import chars_to_tokens, estimate_content_tokens, estimate_tokens
+from gemini_cli.core.uploads import UploadManager
+
 
 GENAI_AVAILABLE = find_spec("google") is not None and find_spec("google.generativeai") is not None
-genai = import_module("google.generativeai") if GENAI_AVAILABLE else None
+genai = None  # imported on first use; the REST backend never loads it
+
+# API backends: the google-generativeai SDK or the httpx REST transport
+BACKENDS = ("sdk", "rest", "auto")
+
+# Large attachments on mobile links need far longer than a generation request
+UPLOAD_TIMEOUT = 600
+
+# GenerativeModel instances kept warm per (model, generation config)
+MODEL_POOL_SIZE = 16
+
+
+def load_sdk():
+    """
+    Import google-generativeai on first use.
+    
+    Returns:
+        The google.generativeai module
+        
+    Raises:
+        RuntimeError: If the SDK is not installed
+    """
+    global genai
+    if genai is None:
+        if not GENAI_AVAILABLE:
+            raise RuntimeError(
+                "Missing dependency: google-generativeai. Install it with "
+                "`pip install google-generativeai`, or set `backend = \"rest\"` in [api]."
+            )
+        genai = import_module("google.generativeai")
+    return genai
 
 
 class GeminiClient:
@@ -29,6 +69,10 @@ class GeminiClient:
         self,
         api_key: str,
         model: str = "gemini-2.0-flash-exp",
+        backend: str = "sdk",
+        base_url: str = "",
+        transport=None,
+        timeout: float = 60.0,
         **generation_config
     ):
         """
@@ -37,28 +81,64 @@ class GeminiClient:
         Args:
             api_key: Google API key
             model: Model name to use
+            backend: "sdk" (google-generativeai), "rest" (httpx) or "auto"
+                (the SDK when installed, otherwise REST)
+            base_url: Custom API endpoint for the REST backend (e.g. a local
+                fake server); implies REST under "auto"
+            transport: Custom httpx transport for the REST backend
+                (e.g. gemini_cli.core.fake.FakeTransport)
+            timeout: Read timeout per network operation (REST backend)
             **generation_config: Additional generation parameters
         """
         self.api_key = api_key
         self.model_name = model
         self.generation_config = generation_config
 
-        if not GENAI_AVAILABLE:
-            raise RuntimeError(
-                "Missing dependency: google-generativeai. Install it with `pip install google-generativeai`."
-            )
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend: {backend}. Available: {BACKENDS}")
+        if backend == "auto":
+            backend = "sdk" if GENAI_AVAILABLE and not (base_url or transport) else "rest"
+        self.backend = backend
         
         # Configure API
-        genai.configure(api_key=self.api_key)
+        if backend == "rest":
+            from gemini_cli.core.rest import API_BASE, RestTransport
+            self.api = RestTransport(
+                api_key=self.api_key,
+                timeout=timeout,
+                base_url=base_url or API_BASE,
+                transport=transport,
+            )
+        else:
+            self.api = load_sdk()
+            self.api.configure(api_key=self.api_key)
         
-        # Initialize model
-        self.model = genai.GenerativeModel(
-            model_name=self.model_name,
-            generation_config=self.generation_config
-        )
+        # Initialize model (pooled so switching back and forth is free)
+        self._model_pool = OrderedDict()
+        self._pool_lock = threading.Lock()
+        self.model = self._pooled_model(self.model_name, self.generation_config)
         
         # Chat session
         self.chat_session = None
+        
+        # Optional ResponseCache for one-shot generations
+        self.response_cache = None
+        
+        # Deadlines, retries and circuit breaker around every API call
+        self.resilience = Resilience(RetryPolicy())
+        
+        # Optional RateLimiter shared with other processes
+        self.rate_limiter = None
+        
+        # Optional Metrics collector for per-request timings
+        self.request_metrics = None
+        
+        # Optional SingleFlight coalescing identical concurrent one-shot requests
+        self.inflight = None
+        
+        # Attachment uploads (deduplicated by content hash)
+        self.uploads = UploadManager(uploader=self._upload_file)
+        self.last_uploads = []
     
     def start_chat(self, history: Optional[List[Dict[str, str]]] = None) -> None:
         """
@@ -67,6 +147,11 @@ class GeminiClient:
         Args:
             history: Optional conversation history
         """
+        self.chat_session = self.model.start_chat(history=self._format_history(history))
+    
+    @staticmethod
+    def _format_history(history: Optional[List[Dict[str, str]]]) -> List[Dict]:
+        """Convert role/content messages to API contents."""
         formatted_history = []
         if history:
             for msg in history:
@@ -74,8 +159,20 @@ class GeminiClient:
                     "role": msg["role"],
                     "parts": [msg["content"]]
                 })
+        return formatted_history
+    
+    def count_tokens(self, messages: List[Dict[str, str]] | str) -> int:
+        """
+        Count tokens exactly with the API's count endpoint.
         
-        self.chat_session = self.model.start_chat(history=formatted_history)
+        Args:
+            messages: Prompt text or role/content messages
+            
+        Returns:
+            Total input tokens for the current model
+        """
+        contents = messages if isinstance(messages, str) else self._format_history(messages)
+        return self.resilience.call(lambda: self.model.count_tokens(contents).total_tokens)
     
     def send_message(
         self,
@@ -95,14 +192,20 @@ class GeminiClient:
         if self.chat_session is None:
             self.start_chat()
         
+        chat_session = self.chat_session
+        record, owned = self._request_record()
+        permit = self._permit(message, chat_session)
         if stream:
-            response = self.chat_session.send_message(message, stream=True)
-            for chunk in response:
-                if chunk.text:
-                    yield chunk.text
-        else:
-            response = self.chat_session.send_message(message)
-            return response.text
+            return self._timed(self._metered(self.resilience.stream(
+                lambda: self._iter_text(chat_session.send_message(message, stream=True)),
+                idempotent=False,
+                permit=permit,
+            ), permit), record, owned)
+        
+        text = self._timed_call(lambda: self.resilience.call(
+            lambda: chat_session.send_message(message).text, idempotent=False, permit=permit
+        ), record, owned)
+        return self._charge_output(text, permit)
     
     def send_message_with_files(
         self,
@@ -121,54 +224,254 @@ class GeminiClient:
         Returns:
             Response text or generator for streaming
         """
-        # Upload files
-        uploaded_files = []
-        for file_path in files:
-            try:
-                uploaded_file = genai.upload_file(path=str(file_path))
-                uploaded_files.append(uploaded_file)
-            except Exception as e:
-                print(f"Warning: Could not upload {file_path}: {e}")
+        record, owned = self._request_record()
         
         # Prepare content parts
         parts = [message]
-        parts.extend(uploaded_files)
+        parts.extend(self._upload_files(files, record))
         
         if self.chat_session is None:
             self.start_chat()
         
+        chat_session = self.chat_session
+        permit = self._permit(parts, chat_session)
         if stream:
-            response = self.chat_session.send_message(parts, stream=True)
-            for chunk in response:
-                if chunk.text:
-                    yield chunk.text
-        else:
-            response = self.chat_session.send_message(parts)
-            return response.text
+            return self._timed(self._metered(self.resilience.stream(
+                lambda: self._iter_text(chat_session.send_message(parts, stream=True)),
+                idempotent=False,
+                permit=permit,
+            ), permit), record, owned)
+        
+        text = self._timed_call(lambda: self.resilience.call(
+            lambda: chat_session.send_message(parts).text, idempotent=False, permit=permit
+        ), record, owned)
+        return self._charge_output(text, permit)
     
     def generate_content(
         self,
         prompt: str,
-        stream: bool = False
+        stream: bool = False,
+        files: Optional[List[Path]] = None,
+        use_cache: bool = True,
+        refresh: bool = False
     ) -> Generator[str, None, None] | str:
         """
         Generate content without chat context (one-shot).
         
+        When a response cache is attached, identical requests (same model,
+        generation config, prompt and attachment bytes) are answered from it
+        if the cache accepts the generation config (see ResponseCache.accepts).
+        
         Args:
             prompt: Prompt to generate from
             stream: Whether to stream the response
+            files: Optional file paths to attach
+            use_cache: Whether to use the response cache
+            refresh: Skip cache lookup but store the fresh response
             
         Returns:
             Generated text or generator for streaming
         """
+        record, owned = self._request_record()
+        cache = self.response_cache if use_cache else None
+        if cache is not None and not cache.accepts(self.generation_config):
+            cache = None
+        key = None
+        if cache is not None or self.inflight is not None:
+            key = ResponseCache.make_key(self.model_name, self.generation_config, prompt, files)
+        if cache is not None and not refresh:
+            cached = cache.get(key)
+            if cached is not None:
+                if record is not None:
+                    record.count("cached")
+                if stream:
+                    return self._timed(iter(cached), record, owned)
+                return self._timed_call(lambda: "".join(cached), record, owned)
+        
+        if self.inflight is not None:
+            # Identical concurrent requests share one upstream call; uploads
+            # happen on the leader's pump thread
+            if stream:
+                return self._timed(self.inflight.subscribe(
+                    key, lambda: self._stream_content(self._content(prompt, files, record), key, cache)
+                ), record, owned)
+            return self._timed_call(lambda: "".join(self.inflight.subscribe(
+                key, lambda: iter([self._generate_text(self._content(prompt, files, record), key, cache)])
+            )), record, owned)
+        
+        content = self._content(prompt, files, record)
         if stream:
-            response = self.model.generate_content(prompt, stream=True)
-            for chunk in response:
-                if chunk.text:
-                    yield chunk.text
-        else:
-            response = self.model.generate_content(prompt)
-            return response.text
+            return self._timed(self._stream_content(content, key, cache), record, owned)
+        return self._timed_call(lambda: self._generate_text(content, key, cache), record, owned)
+    
+    def _content(self, prompt: str, files: Optional[List[Path]], record=None):
+        """Build request content, uploading any attachments."""
+        if not files:
+            return prompt
+        return [prompt, *self._upload_files(files, record)]
+    
+    def _stream_content(self, content, key: Optional[str], cache) -> Generator[str, None, None]:
+        """Stream a one-shot request, caching the response if complete."""
+        model = self.model
+        permit = self._permit(content)
+        chunks = self._metered(self.resilience.stream(
+            lambda: self._iter_text(model.generate_content(content, stream=True)),
+            hedge=True,
+            permit=permit,
+        ), permit)
+        if cache is not None:
+            chunks = cache.record(key, chunks, model=self.model_name)
+        return chunks
+    
+    def _generate_text(self, content, key: Optional[str], cache) -> str:
+        """Run a non-streamed one-shot request, caching the response."""
+        model = self.model
+        permit = self._permit(content)
+        text = self.resilience.call(lambda: model.generate_content(content).text, permit=permit)
+        self._charge_output(text, permit)
+        if cache is not None:
+            cache.put(key, [text], model=self.model_name)
+        return text
+    
+    def _upload_files(self, files: List[Path], record=None) -> list:
+        """
+        Upload files for use in a request.
+        
+        Files whose content was uploaded before and whose handle is still
+        valid are reused; the rest are uploaded in parallel. Per-file
+        outcomes and timings are kept in `last_uploads`.
+        
+        Args:
+            files: List of file paths
+            record: Optional metrics record for the "upload" span
+            
+        Returns:
+            Uploaded file handles (failed uploads are skipped)
+        """
+        started = time.perf_counter()
+        self.last_uploads = self.uploads.upload(files)
+        if record is not None:
+            record.add_time("upload", time.perf_counter() - started)
+        uploaded_files = []
+        for result in self.last_uploads:
+            if result.ok:
+                uploaded_files.append(result.part)
+            else:
+                print(f"Warning: Could not upload {result.path}: {result.error}")
+        return uploaded_files
+    
+    def _upload_file(self, path: str):
+        """Upload one file through the resilience layer."""
+        return self.resilience.call(lambda: self.api.upload_file(path=path), timeout=UPLOAD_TIMEOUT)
+    
+    def _permit(self, content, chat_session=None):
+        """
+        Create a rate-limit permit for a request, if a limiter is attached.
+        
+        Chat turns resend the whole history, so it counts towards the
+        request's estimated tokens.
+        """
+        if self.rate_limiter is None:
+            return None
+        tokens = estimate_content_tokens(content)
+        if chat_session is not None:
+            for msg in getattr(chat_session, "history", []):
+                tokens += sum(estimate_tokens(getattr(part, "text", "")) for part in msg.parts)
+        return self.rate_limiter.permit(self.model_name, tokens)
+    
+    def _request_record(self):
+        """
+        Get the metrics record for a request.
+        
+        Returns:
+            (record, owned): the caller's current record, or a new one the
+            client writes when the request ends (owned); (None, False)
+            without metrics
+        """
+        record = current_request()
+        if record is not None:
+            return record, False
+        if self.request_metrics is None:
+            return None, False
+        return self.request_metrics.begin(self.model_name), True
+    
+    def _timed(self, chunks, record, owned: bool) -> Generator[str, None, None]:
+        """Record time to first token, stream duration, chunks and bytes."""
+        if record is None:
+            return chunks
+        
+        def generate():
+            error = None
+            first = None
+            try:
+                for chunk in chunks:
+                    if first is None:
+                        record.mark("ttft")
+                        first = time.perf_counter()
+                    record.count("chunks")
+                    record.count("bytes", len(chunk.encode("utf-8")))
+                    yield chunk
+            except GeneratorExit:
+                raise
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                if first is not None:
+                    record.add_time("stream", time.perf_counter() - first)
+                if owned:
+                    self.request_metrics.finish(record, error)
+        
+        return generate()
+    
+    def _timed_call(self, call, record, owned: bool) -> str:
+        """Record the duration and size of a non-streamed request."""
+        if record is None:
+            return call()
+        
+        error = None
+        try:
+            with record.span("generate"):
+                text = call()
+            record.count("bytes", len(text.encode("utf-8")))
+            return text
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            if owned:
+                self.request_metrics.finish(record, error)
+    
+    @staticmethod
+    def _metered(chunks, permit) -> Generator[str, None, None]:
+        """Charge streamed output against the TPM quota once it completes."""
+        if permit is None:
+            return chunks
+        
+        def generate():
+            produced = 0
+            try:
+                for chunk in chunks:
+                    produced += len(chunk)
+                    yield chunk
+            finally:
+                permit.add_output(chars_to_tokens(produced))
+        
+        return generate()
+    
+    @staticmethod
+    def _charge_output(text: str, permit) -> str:
+        """Charge a complete response against the TPM quota."""
+        if permit is not None:
+            permit.add_output(estimate_tokens(text))
+        return text
+    
+    @staticmethod
+    def _iter_text(response) -> Generator[str, None, None]:
+        """Yield the text of each streamed response chunk."""
+        for chunk in response:
+            if chunk.text:
+                yield chunk.text
     
     def get_history(self) -> List[Dict[str, str]]:
         """
@@ -192,9 +495,82 @@ class GeminiClient:
         """Clear chat history and start fresh."""
         self.chat_session = None
     
+    def get_model(
+        self,
+        model: Optional[str] = None,
+        generation_config: Optional[Dict] = None
+    ):
+        """
+        Get a GenerativeModel, optionally overriding model or parameters.
+
+        Args:
+            model: Model name (default: current model)
+            generation_config: Parameters merged over the current config
+
+        Returns:
+            GenerativeModel instance
+        """
+        if (model is None or model == self.model_name) and not generation_config:
+            return self.model
+
+        return self._pooled_model(
+            model or self.model_name,
+            {**self.generation_config, **(generation_config or {})}
+        )
+
+    def _pooled_model(self, model: str, generation_config: Dict):
+        """
+        Get a GenerativeModel from the pool, creating it on first use.
+
+        Args:
+            model: Model name
+            generation_config: Generation parameters
+
+        Returns:
+            GenerativeModel instance
+        """
+        key = (model, json.dumps(generation_config, sort_keys=True, default=str))
+        with self._pool_lock:
+            instance = self._model_pool.get(key)
+            if instance is not None:
+                self._model_pool.move_to_end(key)
+                return instance
+
+            instance = self.api.GenerativeModel(
+                model_name=model,
+                generation_config=dict(generation_config)
+            )
+            self._model_pool[key] = instance
+            if len(self._model_pool) > MODEL_POOL_SIZE:
+                self._model_pool.popitem(last=False)
+            return instance
+
+    def _activate_model(self) -> None:
+        """Switch to the pooled model for the current settings, keeping the chat."""
+        self.model = self._pooled_model(self.model_name, self.generation_config)
+        if self.chat_session is not None:
+            # Chat sessions are local objects; rebinding the history is free
+            self.chat_session = self.model.start_chat(history=list(self.chat_session.history))
+
+    def fork(self) -> "GeminiClient":
+        """
+        Create a client that shares this client's configured model and model pool.
+
+        The fork gets its own chat session and generation config, so several
+        conversations can run against one warm client (e.g. in the daemon).
+
+        Returns:
+            New GeminiClient without a chat session
+        """
+        forked = object.__new__(type(self))
+        forked.__dict__.update(self.__dict__)
+        forked.generation_config = dict(self.generation_config)
+        forked.chat_session = None
+        return forked
+
     def set_model(self, model: str) -> None:
         """
-        Change the model.
+        Change the model, keeping the current conversation.
         
         Args:
             model: New model name
@@ -203,23 +579,14 @@ class GeminiClient:
             raise ValueError(f"Unknown model: {model}. Available: {self.MODELS}")
         
         self.model_name = model
-        self.model = genai.GenerativeModel(
-            model_name=self.model_name,
-            generation_config=self.generation_config
-        )
-        
-        # Reset chat session
-        self.chat_session = None
+        self._activate_model()
     
     def update_generation_config(self, **kwargs) -> None:
         """
-        Update generation configuration.
+        Update generation configuration, keeping the current conversation.
         
         Args:
             **kwargs: Generation parameters to update
         """
         self.generation_config.update(kwargs)
-        self.model = genai.GenerativeModel(
-            model_name=self.model_name,
-            generation_config=self.generation_config
-        )
+        self._activate_model()
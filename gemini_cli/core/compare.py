@@ -0,0 +1,103 @@
+"""
+Concurrent multi-model comparison.
+Fans one prompt out to several models at once and tracks per-model
+latency, throughput and output as the streams arrive.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+from gemini_cli.core.tokens import chars_to_tokens
+
+
+@dataclass
+class ModelRun:
+    """Progress and timings of one model's answer."""
+    model: str
+    started: float = 0.0
+    first_token_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    chunks: List[str] = field(default_factory=list)
+    chars: int = 0
+    error: Optional[str] = None
+
+    @property
+    def text(self) -> str:
+        return "".join(self.chunks)
+
+    @property
+    def done(self) -> bool:
+        return self.finished_at is not None
+
+    @property
+    def ttft(self) -> Optional[float]:
+        """Seconds until the first chunk."""
+        return self.first_token_at - self.started if self.first_token_at else None
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since start (total latency once done)."""
+        end = self.finished_at or time.monotonic()
+        return end - self.started if self.started else 0.0
+
+    @property
+    def tokens(self) -> int:
+        """Estimated output tokens."""
+        return chars_to_tokens(self.chars)
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        """Estimated generation speed after the first token."""
+        if self.first_token_at is None:
+            return None
+        end = self.finished_at or time.monotonic()
+        streaming = end - self.first_token_at
+        return self.tokens / streaming if streaming > 0 else None
+
+
+async def compare_models(
+    client,
+    prompt: str,
+    models: Sequence[str],
+    files: Optional[List[Path]] = None,
+    runs: Optional[List[ModelRun]] = None
+) -> List[ModelRun]:
+    """
+    Stream one prompt from several models concurrently.
+
+    `runs` is updated in place as chunks arrive, so a view can render it
+    while the comparison is in progress.
+
+    Args:
+        client: AsyncGeminiClient
+        prompt: Prompt to send
+        models: Models to compare
+        files: Optional attachments (uploaded once, shared by all models)
+        runs: Optional pre-created ModelRun list (one per model, same order)
+
+    Returns:
+        One ModelRun per model, in the given order
+    """
+    if runs is None:
+        runs = [ModelRun(model) for model in models]
+    if files:
+        await client.upload_files(files)
+
+    async def run_one(run: ModelRun) -> None:
+        run.started = time.monotonic()
+        try:
+            async for chunk in client.generate_content(prompt, files=files, model=run.model):
+                if run.first_token_at is None:
+                    run.first_token_at = time.monotonic()
+                run.chunks.append(chunk)
+                run.chars += len(chunk)
+        except Exception as e:
+            run.error = str(e)
+        finally:
+            run.finished_at = time.monotonic()
+
+    await asyncio.gather(*(run_one(run) for run in runs))
+    return runs
@@ -7,7 +7,7 @@ import os
 import toml
 from pathlib import Path
 from typing import Any, Dict, Optional
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field, fields
 
 
 @dataclass
@@ -15,6 +15,10 @@ class APIConfig:
     """API configuration settings."""
     model: str = "gemini-2.0-flash-exp"
     timeout: int = 60
+    max_concurrency: int = 8
+    backend: str = "auto"
+    base_url: str = ""
+    coalesce: bool = True
 
 
 @dataclass
@@ -33,6 +37,8 @@ class UIConfig:
     syntax_highlighting: bool = True
     show_timestamps: bool = True
     streaming: bool = True
+    stream_fps: float = 20.0
+    stream_flush_bytes: int = 512
 
 
 @dataclass
@@ -41,6 +47,14 @@ class HistoryConfig:
     enabled: bool = True
     max_entries: int = 1000
     auto_save: bool = True
+    max_context_tokens: int = 0
+    exact_token_count: bool = False
+    fsync_batch: int = 16
+    backend: str = "jsonl"
+    autosave_debounce: float = 1.0
+    summarize: bool = False
+    summary_model: str = "gemini-1.5-flash-8b"
+    summary_threshold: int = 8000
 
 
 @dataclass
@@ -50,6 +64,82 @@ class ClipboardConfig:
     auto_copy_code: bool = False
 
 
+@dataclass
+class ResilienceConfig:
+    """Retry, deadline and circuit breaker settings."""
+    max_retries: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 8.0
+    connect_timeout: float = 30.0
+    total_timeout: float = 600.0
+    breaker_threshold: int = 5
+    breaker_cooldown: float = 30.0
+    hedge: bool = False
+    hedge_percentile: float = 95.0
+
+
+@dataclass
+class CacheConfig:
+    """Response cache settings."""
+    enabled: bool = True
+    ttl_hours: float = 168
+    max_size_mb: float = 50
+    sampled: bool = False
+
+
+@dataclass
+class RateLimitConfig:
+    """Client-side quota limits (shared by all processes)."""
+    enabled: bool = False
+    rpm: int = 15
+    tpm: int = 1_000_000
+    models: Dict[str, Dict[str, int]] = field(default_factory=dict)
+
+
+@dataclass
+class DaemonConfig:
+    """Resident daemon (`serve`) settings."""
+    enabled: bool = True
+    socket: str = ""
+
+
+@dataclass
+class MetricsConfig:
+    """Per-request latency metrics (`stats`) settings."""
+    enabled: bool = True
+    max_size_kb: int = 1024
+    backups: int = 3
+
+
+def coerce_value(value: Any, kind: Any) -> Any:
+    """
+    Convert a string (e.g. from `config set`) to a setting's type.
+
+    Args:
+        value: Value to convert (non-strings are returned unchanged)
+        kind: The setting's type (bool, int, float or str)
+
+    Returns:
+        Converted value
+
+    Raises:
+        ValueError: If the string is not a valid value of that type
+    """
+    if not isinstance(value, str) or kind not in (bool, int, float):
+        return value
+    text = value.strip()
+    if kind is bool:
+        if text.lower() in ("true", "yes", "on", "1"):
+            return True
+        if text.lower() in ("false", "no", "off", "0"):
+            return False
+        raise ValueError(f"expected true or false, got {value!r}")
+    try:
+        return kind(text)
+    except ValueError:
+        raise ValueError(f"expected {'an integer' if kind is int else 'a number'}, got {value!r}") from None
+
+
 class Config:
     """Manages application configuration."""
     
@@ -58,6 +148,10 @@ class Config:
         "api": {
             "model": "gemini-2.0-flash-exp",
             "timeout": 60,
+            "max_concurrency": 8,
+            "backend": "auto",
+            "base_url": "",
+            "coalesce": True,
         },
         "generation": {
             "temperature": 0.9,
@@ -70,16 +164,71 @@ class Config:
             "syntax_highlighting": True,
             "show_timestamps": True,
             "streaming": True,
+            "stream_fps": 20.0,
+            "stream_flush_bytes": 512,
         },
         "history": {
             "enabled": True,
             "max_entries": 1000,
             "auto_save": True,
+            "max_context_tokens": 0,
+            "exact_token_count": False,
+            "fsync_batch": 16,
+            "backend": "jsonl",
+            "autosave_debounce": 1.0,
+            "summarize": False,
+            "summary_model": "gemini-1.5-flash-8b",
+            "summary_threshold": 8000,
         },
         "clipboard": {
             "use_termux_api": True,
             "auto_copy_code": False,
         },
+        "resilience": {
+            "max_retries": 3,
+            "backoff_base": 0.5,
+            "backoff_max": 8.0,
+            "connect_timeout": 30.0,
+            "total_timeout": 600.0,
+            "breaker_threshold": 5,
+            "breaker_cooldown": 30.0,
+            "hedge": False,
+            "hedge_percentile": 95.0,
+        },
+        "cache": {
+            "enabled": True,
+            "ttl_hours": 168,
+            "max_size_mb": 50,
+            "sampled": False,
+        },
+        "daemon": {
+            "enabled": True,
+            "socket": "",
+        },
+        "ratelimit": {
+            "enabled": False,
+            "rpm": 15,
+            "tpm": 1_000_000,
+        },
+        "metrics": {
+            "enabled": True,
+            "max_size_kb": 1024,
+            "backups": 3,
+        },
+    }
+    
+    # Settings dataclass of each section
+    SECTIONS = {
+        "api": APIConfig,
+        "generation": GenerationConfig,
+        "ui": UIConfig,
+        "history": HistoryConfig,
+        "clipboard": ClipboardConfig,
+        "resilience": ResilienceConfig,
+        "cache": CacheConfig,
+        "daemon": DaemonConfig,
+        "ratelimit": RateLimitConfig,
+        "metrics": MetricsConfig,
     }
     
     def __init__(self, config_dir: Optional[Path] = None):
@@ -155,12 +304,34 @@ class Config:
         Args:
             section: Configuration section
             key: Configuration key
-            value: Value to set
+            value: Value to set (strings are converted to the setting's type)
+            
+        Raises:
+            ValueError: If the value does not fit the setting's type
         """
+        kind = self._field_types(section).get(key)
+        if kind is not None:
+            value = coerce_value(value, kind)
         if section not in self._config:
             self._config[section] = {}
         self._config[section][key] = value
     
+    def _field_types(self, section: str) -> Dict[str, Any]:
+        """Setting name -> type for a section (empty if unknown)."""
+        settings = self.SECTIONS.get(section)
+        return {f.name: f.type for f in fields(settings)} if settings else {}
+    
+    def _section(self, section: str) -> Any:
+        """Build a section's settings, converting values stored as strings."""
+        types = self._field_types(section)
+        values = {}
+        for key, value in self._config.get(section, {}).items():
+            try:
+                values[key] = coerce_value(value, types.get(key))
+            except ValueError as e:
+                print(f"Warning: Ignoring {section}.{key}: {e}")
+        return self.SECTIONS[section](**values)
+    
     def reset(self) -> None:
         """Reset configuration to defaults."""
         self._config = self.DEFAULTS.copy()
@@ -169,27 +340,58 @@ class Config:
     @property
     def api(self) -> APIConfig:
         """Get API configuration."""
-        return APIConfig(**self._config.get("api", {}))
+        return self._section("api")
     
     @property
     def generation(self) -> GenerationConfig:
         """Get generation configuration."""
-        return GenerationConfig(**self._config.get("generation", {}))
+        return self._section("generation")
     
     @property
     def ui(self) -> UIConfig:
         """Get UI configuration."""
-        return UIConfig(**self._config.get("ui", {}))
+        return self._section("ui")
     
     @property
     def history(self) -> HistoryConfig:
         """Get history configuration."""
-        return HistoryConfig(**self._config.get("history", {}))
+        return self._section("history")
     
     @property
     def clipboard(self) -> ClipboardConfig:
         """Get clipboard configuration."""
-        return ClipboardConfig(**self._config.get("clipboard", {}))
+        return self._section("clipboard")
+    
+    @property
+    def resilience(self) -> ResilienceConfig:
+        """Get retry/deadline configuration."""
+        return self._section("resilience")
+    
+    @property
+    def cache(self) -> CacheConfig:
+        """Get response cache configuration."""
+        return self._section("cache")
+    
+    @property
+    def daemon(self) -> DaemonConfig:
+        """Get daemon configuration."""
+        return self._section("daemon")
+    
+    @property
+    def ratelimit(self) -> RateLimitConfig:
+        """Get rate limit configuration."""
+        return self._section("ratelimit")
+    
+    @property
+    def metrics(self) -> MetricsConfig:
+        """Get metrics configuration."""
+        return self._section("metrics")
+    
+    @property
+    def daemon_socket(self) -> Path:
+        """Get the daemon's Unix socket path."""
+        socket_path = self.daemon.socket
+        return Path(socket_path).expanduser() if socket_path else self.cache_dir / "daemon.sock"
     
     def as_dict(self) -> Dict[str, Any]:
         """
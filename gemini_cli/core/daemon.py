@@ -0,0 +1,435 @@
+"""
+Resident daemon for Gemini CLI.
+Keeps a warm GeminiClient behind a Unix domain socket so `ask` and `chat`
+skip interpreter start-up, SDK import and model construction on every call.
+
+Protocol: newline-delimited JSON. Each request is one object with an ``op``
+field; the daemon answers with zero or more ``{"chunk": ...}`` lines followed
+by ``{"done": true}``, a single ``{"result": ...}`` line, or ``{"error": ...}``.
+"""
+
+import json
+import os
+import socket
+import socketserver
+import threading
+from pathlib import Path
+from typing import Any, Dict, Generator, Iterator, List, Optional
+
+
+# Operations whose replies are streamed back chunk by chunk
+STREAM_OPS = {"send_message", "send_message_with_files", "generate_content"}
+
+# How long a client waits for the daemon to accept a connection
+CONNECT_TIMEOUT = 0.5
+
+
+class DaemonError(RuntimeError):
+    """Raised when the daemon reports an error or the connection breaks."""
+
+
+class _DaemonHandler(socketserver.StreamRequestHandler):
+    """Serves one client connection with its own chat session."""
+
+    def handle(self) -> None:
+        client = self.server.client.fork()
+
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                op = request.get("op")
+                if op in STREAM_OPS:
+                    self._stream(client, op, request)
+                else:
+                    self._send(result=self._call(client, op, request))
+            except (BrokenPipeError, ConnectionResetError):
+                return
+            except Exception as e:
+                try:
+                    self._send(error=str(e))
+                except OSError:
+                    return
+
+    def _stream(self, client, op: str, request: Dict[str, Any]) -> None:
+        """Run a generation op and forward its chunks."""
+        if op == "generate_content":
+            model = request.get("model")
+            if model and model != client.model_name:
+                # One-shot on another model; the connection keeps its own
+                client = client.fork()
+                client.set_model(model)
+            chunks = client.generate_content(
+                request["prompt"],
+                stream=True,
+                files=[Path(f) for f in request.get("files", [])],
+                use_cache=request.get("use_cache", True),
+                refresh=request.get("refresh", False),
+            )
+        elif op == "send_message_with_files":
+            files = [Path(f) for f in request.get("files", [])]
+            chunks = client.send_message_with_files(request["message"], files, stream=True)
+        else:
+            chunks = client.send_message(request["message"], stream=True)
+
+        try:
+            for chunk in chunks:
+                self._send(chunk=chunk)
+        finally:
+            # Stops the request early when the client hung up mid-reply
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+        self._send(done=True)
+
+    def _call(self, client, op: str, request: Dict[str, Any]) -> Any:
+        """Run a non-streaming op and return its JSON-serializable result."""
+        if op == "ping":
+            resilience = getattr(self.server.client, "resilience", None)
+            metrics = resilience.metrics() if resilience else {}
+            inflight = getattr(self.server.client, "inflight", None)
+            if inflight is not None:
+                metrics.update({f"inflight_{name}": value for name, value in inflight.stats.items()})
+            return {
+                "pid": os.getpid(),
+                "model": client.model_name,
+                "connections": self.server.connections,
+                "metrics": metrics,
+            }
+        if op == "start_chat":
+            client.start_chat(history=request.get("history"))
+            return True
+        if op == "get_history":
+            return client.get_history()
+        if op == "clear_history":
+            client.clear_history()
+            return True
+        if op == "count_tokens":
+            return client.count_tokens(request["messages"])
+        if op == "set_model":
+            client.set_model(request["model"])
+            return client.model_name
+        if op == "configure":
+            model = request.get("model")
+            if model and model != client.model_name:
+                client.set_model(model)
+            if request.get("generation_config"):
+                client.update_generation_config(**request["generation_config"])
+            return client.model_name
+        if op == "shutdown":
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return True
+        raise ValueError(f"Unknown daemon operation: {op}")
+
+    def _send(self, **message) -> None:
+        """Write one protocol line and flush it immediately."""
+        self.wfile.write(json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n")
+        self.wfile.flush()
+
+
+class GeminiDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server that shares one warm GeminiClient."""
+
+    daemon_threads = True
+
+    def __init__(self, client, socket_path: Path):
+        """
+        Initialize the daemon and bind its socket.
+
+        Args:
+            client: Warm GeminiClient to serve requests with
+            socket_path: Unix socket path
+
+        Raises:
+            DaemonError: If another daemon is already listening on the path
+        """
+        self.client = client
+        self.socket_path = Path(socket_path)
+        self.connections = 0
+
+        if self.socket_path.exists():
+            if is_daemon_running(self.socket_path):
+                raise DaemonError(f"Daemon already running on {self.socket_path}")
+            # Stale socket left by a daemon that did not exit cleanly
+            self.socket_path.unlink()
+
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        # The daemon holds the API key; only the owner may talk to it. The
+        # socket is created owner-only, so it is never reachable by others
+        # between bind() and a later chmod
+        umask = os.umask(0o177)
+        try:
+            super().__init__(str(self.socket_path), _DaemonHandler)
+        finally:
+            os.umask(umask)
+
+    def process_request(self, request, client_address) -> None:
+        self.connections += 1
+        super().process_request(request, client_address)
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            self.socket_path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class DaemonClient:
+    """Thin GeminiClient stand-in that forwards calls to a running daemon."""
+
+    def __init__(self, sock: socket.socket, socket_path: Path):
+        """
+        Initialize daemon client over a connected socket.
+
+        Args:
+            sock: Connected Unix socket
+            socket_path: Path the socket is connected to
+        """
+        self.socket_path = socket_path
+        self._lock = threading.Lock()
+        # Connection state, replayed on the new connection after a reconnect
+        self._settings: Dict[str, Any] = {}
+        self._history: Optional[List[Dict[str, str]]] = None
+
+        self._attach(sock)
+        self.model_name = self._info["model"]
+        self.daemon_pid = self._info["pid"]
+        self.metrics = self._info.get("metrics", {})
+
+    @property
+    def MODELS(self) -> List[str]:
+        """Available models (same list as GeminiClient)."""
+        from gemini_cli.core.client import GeminiClient
+        return GeminiClient.MODELS
+
+    @classmethod
+    def connect(cls, socket_path: Path) -> Optional["DaemonClient"]:
+        """
+        Connect to the daemon if one is listening.
+
+        Args:
+            socket_path: Unix socket path
+
+        Returns:
+            DaemonClient, or None when no daemon is running
+        """
+        sock = _open_socket(Path(socket_path))
+        if sock is None:
+            return None
+        try:
+            return cls(sock, Path(socket_path))
+        except (OSError, DaemonError, ValueError):
+            sock.close()
+            return None
+
+    def close(self) -> None:
+        """Close the connection (ends the daemon-side chat session)."""
+        try:
+            if self._file is not None:
+                self._file.close()
+        finally:
+            self._sock.close()
+
+    def start_chat(self, history: Optional[List[Dict[str, str]]] = None) -> None:
+        """Start a new chat session on the daemon."""
+        self._request("start_chat", history=history)
+        self._history = list(history or [])
+
+    def send_message(
+        self,
+        message: str,
+        stream: bool = False
+    ) -> Generator[str, None, None] | str:
+        """Send a chat message through the daemon."""
+        chunks = self._turn(message, self._stream("send_message", message=message))
+        return chunks if stream else "".join(chunks)
+
+    def send_message_with_files(
+        self,
+        message: str,
+        files: List[Path],
+        stream: bool = False
+    ) -> Generator[str, None, None] | str:
+        """Send a chat message with attachments through the daemon."""
+        paths = [str(Path(f).resolve()) for f in files]
+        chunks = self._turn(message, self._stream("send_message_with_files", message=message, files=paths))
+        return chunks if stream else "".join(chunks)
+
+    def generate_content(
+        self,
+        prompt: str,
+        stream: bool = False,
+        files: Optional[List[Path]] = None,
+        use_cache: bool = True,
+        refresh: bool = False,
+        model: Optional[str] = None
+    ) -> Generator[str, None, None] | str:
+        """Generate one-shot content through the daemon (on `model`, if given)."""
+        chunks = self._stream(
+            "generate_content",
+            prompt=prompt,
+            files=[str(Path(f).resolve()) for f in files or []],
+            use_cache=use_cache,
+            refresh=refresh,
+            model=model,
+        )
+        return chunks if stream else "".join(chunks)
+
+    def get_history(self) -> List[Dict[str, str]]:
+        """Get the daemon-side chat history."""
+        return self._request("get_history")
+
+    def clear_history(self) -> None:
+        """Clear the daemon-side chat history."""
+        self._request("clear_history")
+        self._history = []
+
+    def count_tokens(self, messages: List[Dict[str, str]] | str) -> int:
+        """Count tokens exactly through the daemon's client."""
+        return self._request("count_tokens", messages=messages)
+
+    def set_model(self, model: str) -> None:
+        """Change the model for this connection's session."""
+        self.model_name = self._request("set_model", model=model)
+        self._settings["model"] = self.model_name
+
+    def configure(self, model: str, generation_config: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Use the caller's model and generation settings for this connection.
+
+        The daemon's client was configured when `serve` started; this makes
+        the caller's current config.toml apply instead.
+
+        Args:
+            model: Model name
+            generation_config: Generation parameters (temperature, ...)
+        """
+        self.model_name = self._request("configure", model=model, generation_config=generation_config or {})
+        self._settings = {"model": model, "generation_config": generation_config or {}}
+
+    def shutdown_daemon(self) -> None:
+        """Ask the daemon process to exit."""
+        self._request("shutdown")
+
+    def _attach(self, sock: socket.socket) -> None:
+        """Use a freshly connected socket (caller holds _lock or is __init__)."""
+        self._sock = sock
+        self._file = sock.makefile("rwb")
+        self._write("ping", {})
+        self._info = self._read().get("result")
+
+    def _reconnect(self) -> None:
+        """
+        Replace a connection left mid-reply with a new one in the same state.
+
+        Hanging up makes the daemon stop generating, so a caller that stops
+        reading early (Ctrl-C, a cancelled race) doesn't wait for the rest.
+        The chat session is rebuilt from its history; the unfinished turn
+        is dropped. Caller holds _lock.
+        """
+        self.close()
+        self._file = None
+        sock = _open_socket(self.socket_path)
+        if sock is None:
+            return
+        try:
+            self._attach(sock)
+            if self._settings:
+                self._write("configure", self._settings)
+                self._read()
+            if self._history is not None:
+                self._write("start_chat", {"history": self._history})
+                self._read()
+        except (OSError, DaemonError):
+            self.close()
+            self._file = None
+
+    def _turn(self, message: str, chunks: Iterator[str]) -> Generator[str, None, None]:
+        """Pass a chat reply through, adding the turn to the history once complete."""
+        parts = []
+        for chunk in chunks:
+            parts.append(chunk)
+            yield chunk
+        if self._history is None:
+            self._history = []
+        self._history += [
+            {"role": "user", "content": message},
+            {"role": "model", "content": "".join(parts)},
+        ]
+
+    def _write(self, op: str, fields: Dict[str, Any]) -> None:
+        if self._file is None:
+            raise DaemonError("Lost the connection to the daemon")
+        payload = dict(fields, op=op)
+        self._file.write(json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n")
+        self._file.flush()
+
+    def _read(self) -> Dict[str, Any]:
+        line = self._file.readline()
+        if not line:
+            raise DaemonError("Daemon closed the connection")
+        message = json.loads(line)
+        if "error" in message:
+            raise DaemonError(message["error"])
+        return message
+
+    def _request(self, op: str, **fields) -> Any:
+        with self._lock:
+            self._write(op, fields)
+            return self._read().get("result")
+
+    def _stream(self, op: str, **fields) -> Generator[str, None, None]:
+        with self._lock:
+            self._write(op, fields)
+            done = False
+            try:
+                while True:
+                    message = self._read()
+                    if message.get("done"):
+                        done = True
+                        return
+                    yield message["chunk"]
+            except DaemonError:
+                # The daemon ends the reply with the error line
+                done = True
+                raise
+            finally:
+                if not done:
+                    # The consumer stopped early; reading on would wait for
+                    # the whole generation
+                    self._reconnect()
+
+
+def _open_socket(socket_path: Path) -> Optional[socket.socket]:
+    """Connect to a Unix socket, returning None if nothing is listening."""
+    if not hasattr(socket, "AF_UNIX") or not socket_path.exists():
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT)
+    try:
+        sock.connect(str(socket_path))
+    except OSError:
+        sock.close()
+        return None
+    sock.settimeout(None)
+    return sock
+
+
+def is_daemon_running(socket_path: Path) -> bool:
+    """
+    Check whether a daemon is accepting connections.
+
+    Args:
+        socket_path: Unix socket path
+
+    Returns:
+        True if a daemon answered the connection
+    """
+    sock = _open_socket(Path(socket_path))
+    if sock is None:
+        return False
+    sock.close()
+    return True
@@ -0,0 +1,419 @@
+"""
+Offline stand-in for the Gemini REST API.
+Implements the generate, stream, count-tokens and upload endpoints the REST
+backend uses, with configurable time to first token, inter-chunk delay,
+chunk size and injected errors/429s. Runs in-process as an httpx transport
+(tests) or as a local HTTP server (benchmarks, manual runs):
+
+    python -m gemini_cli.core.fake --port 8765 --ttft 0.4 --chunk-delay 0.02
+    gemini-termux config set api.base_url http://127.0.0.1:8765
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+
+
+# Filler for generated answers (repeated up to response_chars)
+LOREM = (
+    "Termux brings a Linux userland to Android, so Python, git and ssh run "
+    "on the phone. Responses stream in small chunks, which is what this fake "
+    "server imitates for offline benchmarks. "
+)
+
+# How long fake uploads stay valid
+FILE_TTL = timedelta(hours=48)
+
+
+@dataclass
+class FakeSettings:
+    """Latency, size and failure behaviour of the fake API."""
+    ttft: float = 0.0
+    chunk_delay: float = 0.0
+    chunk_size: int = 32
+    response_chars: int = 600
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after: float = 1.0
+    upload_delay: float = 0.0
+    reply: Optional[str] = None
+    seed: Optional[int] = None
+
+
+@dataclass
+class FakeReply:
+    """HTTP reply as a status, headers and (delay, bytes) body chunks."""
+    status: int
+    headers: Dict[str, str] = field(default_factory=dict)
+    chunks: List[Tuple[float, bytes]] = field(default_factory=list)
+
+
+def _json_reply(status: int, data: Dict, delay: float = 0.0, headers: Optional[Dict] = None) -> FakeReply:
+    return FakeReply(
+        status,
+        {"content-type": "application/json", **(headers or {})},
+        [(delay, json.dumps(data).encode("utf-8"))],
+    )
+
+
+class FakeGemini:
+    """Request handler shared by FakeTransport and FakeServer."""
+
+    def __init__(self, settings: Optional[FakeSettings] = None):
+        """
+        Initialize fake API.
+
+        Args:
+            settings: Behaviour (default: instant, no errors)
+        """
+        self.settings = settings or FakeSettings()
+        self.random = random.Random(self.settings.seed)
+        self.files: Dict[str, Dict] = {}
+        self.stats = {"requests": 0, "streams": 0, "uploads": 0, "errors": 0, "rate_limited": 0}
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def reply_text(self, prompt: str) -> str:
+        """
+        Get the answer for a prompt.
+
+        Args:
+            prompt: Text of the last user turn
+
+        Returns:
+            The fixed reply, or an echo of the prompt padded with filler
+        """
+        if self.settings.reply is not None:
+            return self.settings.reply
+        text = f"Echo: {prompt[:80]}. "
+        length = max(self.settings.response_chars, len(text))
+        filler = LOREM * (length // len(LOREM) + 1)
+        return (text + filler)[:length]
+
+    def handle(self, method: str, url: str, headers: Dict[str, str], body: bytes) -> FakeReply:
+        """
+        Answer one request.
+
+        Args:
+            method: HTTP method
+            url: Full request URL
+            headers: Request headers (lower-case names)
+            body: Request body
+
+        Returns:
+            FakeReply
+        """
+        parts = urlsplit(url)
+        path = parts.path
+        with self._lock:
+            self.stats["requests"] += 1
+
+        if method != "POST":
+            return _json_reply(404, {"error": {"code": 404, "message": f"Not found: {path}"}})
+        if path.startswith("/upload/"):
+            return self._upload(f"{parts.scheme}://{parts.netloc}", parts.query, headers, body)
+
+        action = path.rpartition(":")[2]
+        if "/models/" not in path or action not in ("generateContent", "streamGenerateContent", "countTokens"):
+            return _json_reply(404, {"error": {"code": 404, "message": f"Not found: {path}"}})
+
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError:
+            return _json_reply(400, {"error": {"code": 400, "message": "Invalid JSON payload"}})
+        texts = [
+            part.get("text", "")
+            for content in request.get("contents", [])
+            for part in content.get("parts", [])
+        ]
+
+        if action == "countTokens":
+            return _json_reply(200, {"totalTokens": (sum(len(t) for t in texts) + 3) // 4})
+
+        failure = self._inject_failure()
+        if failure is not None:
+            return failure
+
+        last = request.get("contents", [{}])[-1].get("parts", [])
+        prompt = " ".join(part.get("text", "") for part in last)
+        text = self.reply_text(prompt)
+        usage = {
+            "promptTokenCount": (sum(len(t) for t in texts) + 3) // 4,
+            "candidatesTokenCount": (len(text) + 3) // 4,
+        }
+        if action == "generateContent":
+            return _json_reply(200, self._candidate(text, usage), delay=self.settings.ttft)
+
+        with self._lock:
+            self.stats["streams"] += 1
+        return FakeReply(200, {"content-type": "text/event-stream"}, list(self._events(text, usage)))
+
+    def _inject_failure(self) -> Optional[FakeReply]:
+        """Roll for an injected 429 or 503."""
+        settings = self.settings
+        with self._lock:
+            roll = self.random.random()
+            if roll < settings.rate_limit_rate:
+                self.stats["rate_limited"] += 1
+                return _json_reply(
+                    429,
+                    {"error": {"code": 429, "message": "Resource has been exhausted (e.g. check quota).",
+                               "status": "RESOURCE_EXHAUSTED"}},
+                    delay=settings.ttft,
+                    headers={"retry-after": f"{settings.retry_after:g}"},
+                )
+            if roll < settings.rate_limit_rate + settings.error_rate:
+                self.stats["errors"] += 1
+                return _json_reply(
+                    503,
+                    {"error": {"code": 503, "message": "The model is overloaded. Please try again later.",
+                               "status": "UNAVAILABLE"}},
+                    delay=settings.ttft,
+                )
+        return None
+
+    @staticmethod
+    def _candidate(text: str, usage: Optional[Dict] = None, finished: bool = True) -> Dict:
+        candidate = {"content": {"role": "model", "parts": [{"text": text}]}, "index": 0}
+        if finished:
+            candidate["finishReason"] = "STOP"
+        data = {"candidates": [candidate]}
+        if usage:
+            data["usageMetadata"] = usage
+        return data
+
+    def _events(self, text: str, usage: Dict) -> Iterator[Tuple[float, bytes]]:
+        """Split an answer into delayed server-sent events."""
+        size = max(1, self.settings.chunk_size)
+        pieces = [text[i:i + size] for i in range(0, len(text), size)] or [""]
+        for index, piece in enumerate(pieces):
+            last = index == len(pieces) - 1
+            event = self._candidate(piece, usage if last else None, finished=last)
+            delay = self.settings.ttft if index == 0 else self.settings.chunk_delay
+            yield delay, f"data: {json.dumps(event)}\r\n\r\n".encode("utf-8")
+
+    def _upload(self, base: str, query: str, headers: Dict[str, str], body: bytes) -> FakeReply:
+        """Resumable upload protocol: start, then upload + finalize."""
+        command = headers.get("x-goog-upload-command", "")
+        if command == "start":
+            upload_id = next(self._ids)
+            with self._lock:
+                self._pending[upload_id] = headers.get(
+                    "x-goog-upload-header-content-type", "application/octet-stream"
+                )
+            return FakeReply(200, {"x-goog-upload-url": f"{base}/upload/v1beta/files?upload_id={upload_id}"})
+
+        if "finalize" in command:
+            upload_id = int(parse_qs(query).get("upload_id", ["0"])[0])
+            with self._lock:
+                mime_type = self._pending.pop(upload_id, None)
+            if mime_type is None:
+                return _json_reply(404, {"error": {"code": 404, "message": "Unknown upload session"}})
+            name = f"files/fake-{upload_id}"
+            expiration = datetime.now(timezone.utc) + FILE_TTL
+            info = {
+                "name": name,
+                "uri": f"{base}/v1beta/{name}",
+                "mimeType": mime_type,
+                "sizeBytes": str(len(body)),
+                "expirationTime": expiration.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+                "state": "ACTIVE",
+            }
+            with self._lock:
+                self.files[name] = info
+                self.stats["uploads"] += 1
+            return _json_reply(200, {"file": info}, delay=self.settings.upload_delay)
+
+        return _json_reply(400, {"error": {"code": 400, "message": f"Bad upload command: {command}"}})
+
+
+class DelayedStream(httpx.SyncByteStream, httpx.AsyncByteStream):
+    """Response body that releases each chunk after its delay."""
+
+    def __init__(self, chunks: List[Tuple[float, bytes]]):
+        self.chunks = chunks
+
+    def __iter__(self) -> Iterator[bytes]:
+        for delay, data in self.chunks:
+            if delay > 0:
+                time.sleep(delay)
+            yield data
+
+    async def __aiter__(self):
+        for delay, data in self.chunks:
+            if delay > 0:
+                await asyncio.sleep(delay)
+            yield data
+
+
+class FakeTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """In-process httpx transport backed by FakeGemini (sync and async)."""
+
+    def __init__(self, settings: Optional[FakeSettings] = None, api: Optional[FakeGemini] = None):
+        """
+        Initialize fake transport.
+
+        Args:
+            settings: Fake API behaviour
+            api: Existing FakeGemini to share (overrides settings)
+        """
+        self.api = api or FakeGemini(settings)
+
+    def _response(self, request: httpx.Request) -> httpx.Response:
+        reply = self.api.handle(
+            request.method,
+            str(request.url),
+            {name.lower(): value for name, value in request.headers.items()},
+            request.content,
+        )
+        return httpx.Response(reply.status, headers=reply.headers, stream=DelayedStream(reply.chunks))
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.read()
+        return self._response(request)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        return self._response(request)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    api: FakeGemini = None
+
+    def _serve(self) -> None:
+        length = int(self.headers.get("content-length") or 0)
+        body = self.rfile.read(length) if length else b""
+        host = self.headers.get("host") or "%s:%s" % self.server.server_address[:2]
+        reply = self.api.handle(
+            self.command,
+            f"http://{host}{self.path}",
+            {name.lower(): value for name, value in self.headers.items()},
+            body,
+        )
+        self.send_response(reply.status)
+        for name, value in reply.headers.items():
+            self.send_header(name, value)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for delay, data in reply.chunks:
+                if delay > 0:
+                    time.sleep(delay)
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # Client gave up (e.g. cancelled race entrant)
+            self.close_connection = True
+
+    do_GET = do_POST = _serve
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+class FakeServer:
+    """FakeGemini behind a local threaded HTTP server."""
+
+    def __init__(self, settings: Optional[FakeSettings] = None, host: str = "127.0.0.1", port: int = 0):
+        """
+        Initialize fake server.
+
+        Args:
+            settings: Fake API behaviour
+            host: Interface to bind
+            port: Port to bind (0 = any free port)
+        """
+        self.api = FakeGemini(settings)
+        handler = type("FakeHandler", (_Handler,), {"api": self.api})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL to use as `api.base_url`."""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeServer":
+        """Serve in a background thread."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        """Stop serving."""
+        if self._thread is not None:
+            self.httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.httpd.server_close()
+
+    def __enter__(self) -> "FakeServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the fake API server in the foreground."""
+    parser = argparse.ArgumentParser(
+        prog="python -m gemini_cli.core.fake",
+        description="Offline stand-in for the Gemini REST API",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    defaults = FakeSettings()
+    parser.add_argument("--ttft", type=float, default=defaults.ttft,
+                        help="Seconds before the first chunk")
+    parser.add_argument("--chunk-delay", type=float, default=defaults.chunk_delay,
+                        help="Seconds between streamed chunks")
+    parser.add_argument("--chunk-size", type=int, default=defaults.chunk_size,
+                        help="Characters per streamed chunk")
+    parser.add_argument("--response-chars", type=int, default=defaults.response_chars,
+                        help="Length of generated answers")
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate,
+                        help="Fraction of requests failing with 503")
+    parser.add_argument("--rate-limit-rate", type=float, default=defaults.rate_limit_rate,
+                        help="Fraction of requests failing with 429")
+    parser.add_argument("--retry-after", type=float, default=defaults.retry_after,
+                        help="Retry-After seconds sent with 429s")
+    parser.add_argument("--upload-delay", type=float, default=defaults.upload_delay,
+                        help="Seconds to accept an upload")
+    parser.add_argument("--reply", help="Fixed answer text")
+    parser.add_argument("--seed", type=int, help="Seed for reproducible error injection")
+    args = parser.parse_args(argv)
+
+    settings = FakeSettings(**{
+        name: getattr(args, name) for name in asdict(defaults)
+    })
+    server = FakeServer(settings, host=args.host, port=args.port)
+    print(f"Fake Gemini API on {server.url} ({json.dumps(asdict(settings))})")
+    print(f"Use it with: api.backend = \"rest\", api.base_url = \"{server.url}\"")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        print(json.dumps(server.api.stats))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
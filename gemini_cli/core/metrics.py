@@ -0,0 +1,447 @@
+"""
+Per-request latency metrics.
+Times the phases of each request (config load, client init, upload,
+time to first token, streaming, rendering), counts streamed bytes and
+chunks, and appends one compact record per request to a rotating JSONL
+file that `gemini-termux stats` aggregates into percentiles.
+"""
+
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+
+# Rotate the metrics file once it reaches this size
+MAX_BYTES = 1024 * 1024
+
+# Rotated files kept (metrics.jsonl.1 ... metrics.jsonl.N)
+BACKUPS = 3
+
+PERCENTILES = (50, 95, 99)
+
+WINDOW_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+_local = threading.local()
+
+
+class RequestRecord:
+    """Timings and counters of one request."""
+
+    def __init__(self, command: str = "", model: Optional[str] = None):
+        """
+        Initialize request record.
+
+        Args:
+            command: CLI command that issued the request
+            model: Model name (may be filled in later)
+        """
+        self.command = command
+        self.model = model
+        self.timestamp = time.time()
+        self.started = time.perf_counter()
+        self.spans: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self.error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def elapsed(self) -> float:
+        """Seconds since the request started."""
+        return time.perf_counter() - self.started
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """
+        Time a block, adding to the named span.
+
+        Args:
+            name: Span name (e.g. "upload", "render")
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - started)
+
+    def add_time(self, name: str, seconds: float) -> None:
+        """
+        Add seconds to a span.
+
+        Args:
+            name: Span name
+            seconds: Duration
+        """
+        with self._lock:
+            self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    def mark(self, name: str) -> None:
+        """
+        Record the time since the request started, once (e.g. "ttft").
+
+        Args:
+            name: Span name
+        """
+        with self._lock:
+            self.spans.setdefault(name, self.elapsed())
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """
+        Increment a counter.
+
+        Args:
+            name: Counter name (e.g. "bytes", "chunks")
+            amount: Increment
+        """
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def to_dict(self) -> Dict:
+        """
+        Get the compact JSON form written to the metrics file.
+
+        Returns:
+            Record with span durations in milliseconds
+        """
+        spans = dict(self.spans)
+        spans.setdefault("total", self.elapsed())
+        record = {
+            "ts": round(self.timestamp, 3),
+            "cmd": self.command,
+            "model": self.model,
+            "ok": self.error is None,
+            "ms": {name: round(seconds * 1000, 1) for name, seconds in spans.items()},
+        }
+        if self.counters:
+            record["n"] = dict(self.counters)
+        if self.error:
+            record["error"] = self.error
+        return record
+
+
+def current_request() -> Optional[RequestRecord]:
+    """Get the request record active on this thread, if any."""
+    return getattr(_local, "record", None)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """
+    Time a block into the active request record (no-op without one).
+
+    Args:
+        name: Span name
+    """
+    record = current_request()
+    with record.span(name) if record is not None else nullcontext():
+        yield
+
+
+class MetricsLog:
+    """Append-only JSONL metrics file with size-based rotation."""
+
+    def __init__(self, path: Path, max_bytes: int = MAX_BYTES, backups: int = BACKUPS):
+        """
+        Initialize metrics log.
+
+        Args:
+            path: JSONL file (e.g. Config.data_dir / "metrics.jsonl")
+            max_bytes: Rotate once the file reaches this size
+            backups: Number of rotated files to keep
+        """
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backups = backups
+
+    def append(self, record: Dict) -> None:
+        """
+        Append one record, rotating the file first if it is full.
+
+        Args:
+            record: JSON-serializable record
+        """
+        line = json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # A separate lock file, since rotation renames the log itself
+        with open(self.path.with_name(self.path.name + ".lock"), "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                try:
+                    if self.path.stat().st_size >= self.max_bytes:
+                        self._rotate()
+                except FileNotFoundError:
+                    pass
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _rotate(self) -> None:
+        """Shift metrics.jsonl -> .1 -> .2 ..., dropping the oldest."""
+        oldest = self._rotated(self.backups)
+        if oldest.exists():
+            oldest.unlink()
+        for index in range(self.backups - 1, 0, -1):
+            source = self._rotated(index)
+            if source.exists():
+                source.rename(self._rotated(index + 1))
+        if self.backups > 0:
+            self.path.rename(self._rotated(1))
+        else:
+            self.path.unlink()
+
+    def _rotated(self, index: int) -> Path:
+        return self.path.with_name(f"{self.path.name}.{index}")
+
+    def files(self) -> List[Path]:
+        """Existing metrics files, oldest first."""
+        candidates = [self._rotated(i) for i in range(self.backups, 0, -1)] + [self.path]
+        return [path for path in candidates if path.exists()]
+
+    def read(self, since: Optional[float] = None) -> Iterator[Dict]:
+        """
+        Iterate over records, oldest first.
+
+        Args:
+            since: Only records at or after this epoch time
+
+        Yields:
+            Record dicts (corrupt lines are skipped)
+        """
+        for path in self.files():
+            try:
+                with open(path, encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            continue
+                        if not isinstance(record, dict):
+                            continue
+                        if since is not None and record.get("ts", 0) < since:
+                            continue
+                        yield record
+            except OSError:
+                continue
+
+    def clear(self) -> int:
+        """
+        Delete all metrics files.
+
+        Returns:
+            Number of files removed
+        """
+        files = self.files()
+        for path in files:
+            path.unlink(missing_ok=True)
+        return len(files)
+
+
+class Metrics:
+    """Creates request records for one process and writes them to a MetricsLog."""
+
+    def __init__(self, log: MetricsLog, command: str = ""):
+        """
+        Initialize metrics collector.
+
+        Args:
+            log: Destination log
+            command: CLI command recorded with each request
+        """
+        self.log = log
+        self.command = command
+        # Process-level spans (config load, client init), attached to the first record
+        self.startup: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def begin(self, model: Optional[str] = None, command: Optional[str] = None) -> RequestRecord:
+        """
+        Start a request record without making it current.
+
+        Args:
+            model: Model name
+            command: Command (default: the collector's)
+
+        Returns:
+            New RequestRecord; pass it to finish() when the request ends
+        """
+        return RequestRecord(command or self.command, model)
+
+    def finish(self, record: RequestRecord, error: Optional[BaseException] = None) -> None:
+        """
+        Write a completed record.
+
+        Metrics must never break a request, so write errors are ignored.
+
+        Args:
+            record: Record to write
+            error: Exception that ended the request, if any
+        """
+        if error is not None and record.error is None:
+            record.error = type(error).__name__
+        data = record.to_dict()
+        with self._lock:
+            if self.startup:
+                data["ms"].update(
+                    {name: round(seconds * 1000, 1) for name, seconds in self.startup.items()}
+                )
+                self.startup = {}
+        try:
+            self.log.append(data)
+        except OSError:
+            pass
+
+    @contextmanager
+    def request(self, model: Optional[str] = None, command: Optional[str] = None) -> Iterator[RequestRecord]:
+        """
+        Record a request made by the enclosed block.
+
+        The record is current on this thread for the duration of the block,
+        so the client and renderer add their spans to it. Nested scopes
+        share the outer record.
+
+        Args:
+            model: Model name
+            command: Command (default: the collector's)
+
+        Yields:
+            The RequestRecord
+        """
+        outer = current_request()
+        if outer is not None:
+            yield outer
+            return
+
+        record = self.begin(model, command)
+        _local.record = record
+        error = None
+        try:
+            yield record
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            _local.record = None
+            self.finish(record, error)
+
+
+def track(metrics: Optional[Metrics], model: Optional[str] = None, command: Optional[str] = None):
+    """
+    Scope a request record when metrics are enabled.
+
+    Args:
+        metrics: Metrics collector, or None when disabled
+        model: Model name
+        command: Command (default: the collector's)
+
+    Returns:
+        Context manager yielding the RequestRecord (or None)
+    """
+    if metrics is None:
+        return nullcontext()
+    return metrics.request(model, command)
+
+
+def parse_window(window: str) -> float:
+    """
+    Parse a time window like "30m", "24h" or "7d".
+
+    Args:
+        window: Number followed by s, m, h, d or w (a bare number is hours)
+
+    Returns:
+        Window length in seconds
+
+    Raises:
+        ValueError: For malformed windows
+    """
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smhdw]?)\s*", window.lower())
+    if not match:
+        raise ValueError(f"Invalid time window: {window} (use e.g. 30m, 24h, 7d)")
+    return float(match.group(1)) * WINDOW_UNITS[match.group(2) or "h"]
+
+
+def percentile(values: Sequence[float], pct: float) -> Optional[float]:
+    """
+    Linear-interpolated percentile.
+
+    Args:
+        values: Samples
+        pct: Percentile (0-100)
+
+    Returns:
+        Percentile value, or None without samples
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def format_ms(value: Optional[float]) -> str:
+    """
+    Format a duration in milliseconds for tables.
+
+    Args:
+        value: Milliseconds, or None
+
+    Returns:
+        e.g. "412ms", "2.31s" or "-"
+    """
+    if value is None:
+        return "-"
+    if value < 1000:
+        return f"{value:.0f}ms"
+    return f"{value / 1000:.2f}s"
+
+
+def summarize(records: Iterator[Dict], by: str = "model", span_name: str = "total") -> List[Dict]:
+    """
+    Aggregate records into per-group percentiles.
+
+    Args:
+        records: Metrics records
+        by: Group key: "model" or "command"
+        span_name: Span to aggregate (e.g. "total", "ttft", "render")
+
+    Returns:
+        Rows with group, requests, errors, samples and p50/p95/p99 in
+        milliseconds (of successful requests), busiest group first
+    """
+    key = {"model": "model", "command": "cmd"}[by]
+    groups: Dict[str, Dict] = {}
+    for record in records:
+        group = groups.setdefault(record.get(key) or "-", {"requests": 0, "errors": 0, "values": []})
+        group["requests"] += 1
+        if not record.get("ok", True):
+            # Failed and cancelled requests would skew the latencies
+            group["errors"] += 1
+            continue
+        value = record.get("ms", {}).get(span_name)
+        if value is not None:
+            group["values"].append(value)
+
+    rows = []
+    for name, group in groups.items():
+        row = {
+            "group": name,
+            "requests": group["requests"],
+            "errors": group["errors"],
+            "samples": len(group["values"]),
+        }
+        for pct in PERCENTILES:
+            row[f"p{pct}"] = percentile(group["values"], pct)
+        rows.append(row)
+    return sorted(rows, key=lambda row: (-row["requests"], row["group"]))
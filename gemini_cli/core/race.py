@@ -0,0 +1,196 @@
+"""
+Multi-model racing for latency-critical one-shot queries.
+Sends one prompt to several models at once, streams from whichever
+produces a token first and cancels the rest.
+"""
+
+import asyncio
+import time
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Sequence
+
+from gemini_cli.utils.locking import locked_json, read_json
+
+
+def resolve_model(name: str, models: Sequence[str]) -> str:
+    """
+    Resolve a model name, allowing the "gemini-" prefix to be omitted.
+
+    Args:
+        name: Full or short model name (e.g. "1.5-flash")
+        models: Known model names
+
+    Returns:
+        Full model name
+
+    Raises:
+        ValueError: If the name is unknown or ambiguous
+    """
+    name = name.strip()
+    for candidate in (name, f"gemini-{name}"):
+        if candidate in models:
+            return candidate
+    matching = [m for m in models if name.lower() in m.lower()]
+    if len(matching) == 1:
+        return matching[0]
+    if matching:
+        raise ValueError(f"Ambiguous model: {name} ({', '.join(matching)})")
+    raise ValueError(f"Unknown model: {name}. Available: {', '.join(models)}")
+
+
+def resolve_models(spec: str, models: Sequence[str], minimum: int = 2) -> List[str]:
+    """
+    Parse a comma-separated model list.
+
+    Args:
+        spec: e.g. "1.5-flash,2.0-flash-exp"
+        models: Known model names
+        minimum: Minimum number of distinct models
+
+    Returns:
+        Full model names, without duplicates
+
+    Raises:
+        ValueError: For unknown names or too few models
+    """
+    resolved = []
+    for name in spec.split(","):
+        if name.strip():
+            model = resolve_model(name, models)
+            if model not in resolved:
+                resolved.append(model)
+    if len(resolved) < minimum:
+        raise ValueError(f"Need at least {minimum} different models, got: {spec}")
+    return resolved
+
+
+class RaceStats:
+    """Persistent per-model win counts and time-to-first-token."""
+
+    def __init__(self, stats_file: Path):
+        """
+        Initialize race statistics.
+
+        Args:
+            stats_file: JSON file (e.g. Config.cache_dir / "race.json")
+        """
+        self.stats_file = Path(stats_file)
+
+    def record(self, entrants: Sequence[str], winner: str, ttft: float) -> None:
+        """
+        Record the outcome of one race.
+
+        Args:
+            entrants: Models that took part
+            winner: Model that produced the first token
+            ttft: Winner's time to first token in seconds
+        """
+        with locked_json(self.stats_file) as stats:
+            for model in entrants:
+                entry = stats.setdefault(model, {"races": 0, "wins": 0, "ttft_total": 0.0})
+                entry["races"] += 1
+            stats[winner]["wins"] += 1
+            stats[winner]["ttft_total"] += ttft
+            stats[winner]["last_ttft"] = ttft
+
+    def summary(self) -> List[Dict]:
+        """
+        Get per-model results, best first.
+
+        Returns:
+            Rows with model, races, wins, win_rate and mean winning ttft
+        """
+        rows = []
+        for model, entry in read_json(self.stats_file).items():
+            wins = entry.get("wins", 0)
+            rows.append({
+                "model": model,
+                "races": entry.get("races", 0),
+                "wins": wins,
+                "win_rate": wins / entry["races"] if entry.get("races") else 0.0,
+                "mean_ttft": entry.get("ttft_total", 0.0) / wins if wins else None,
+            })
+        return sorted(rows, key=lambda row: (-row["win_rate"], row["mean_ttft"] or float("inf")))
+
+
+class ModelRace:
+    """Races one prompt across several models."""
+
+    def __init__(self, client, models: Sequence[str], stats: Optional[RaceStats] = None):
+        """
+        Initialize a race.
+
+        Args:
+            client: AsyncGeminiClient
+            models: Models to race
+            stats: Optional RaceStats to record outcomes in
+        """
+        self.client = client
+        self.models = list(models)
+        self.stats = stats
+        self.winner: Optional[str] = None
+        self.ttft: Optional[float] = None
+        self.errors: Dict[str, BaseException] = {}
+
+    async def run(self, prompt: str, files: Optional[List[Path]] = None) -> AsyncIterator[str]:
+        """
+        Stream the answer of the first model to respond.
+
+        Losing requests are cancelled as soon as the winner is known. A model
+        that fails before its first token drops out of the race.
+
+        Args:
+            prompt: Prompt to send
+            files: Optional attachments
+
+        Yields:
+            The winning model's text chunks
+        """
+        if files:
+            # Upload once up front; every entrant then reuses the handles
+            await self.client.upload_files(files)
+
+        started = time.monotonic()
+        streams = {
+            model: self.client.generate_content(prompt, files=files, model=model)
+            for model in self.models
+        }
+        pending = {asyncio.ensure_future(stream.__anext__()): model for model, stream in streams.items()}
+        first = None
+        try:
+            while pending and self.winner is None:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    model = pending.pop(task)
+                    try:
+                        chunk = task.result()
+                    except StopAsyncIteration:
+                        continue
+                    except Exception as e:
+                        self.errors[model] = e
+                        continue
+                    if self.winner is None:
+                        self.winner, first = model, chunk
+                        self.ttft = time.monotonic() - started
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            for model, stream in streams.items():
+                if model != self.winner:
+                    await stream.aclose()
+
+        if self.winner is None:
+            if self.errors:
+                raise next(iter(self.errors.values()))
+            return
+
+        if self.stats is not None:
+            self.stats.record(self.models, self.winner, self.ttft)
+
+        try:
+            yield first
+            async for chunk in streams[self.winner]:
+                yield chunk
+        finally:
+            await streams[self.winner].aclose()
@@ -0,0 +1,266 @@
+"""
+Cross-process rate limiting for Gemini API quotas.
+Token buckets for requests-per-minute and tokens-per-minute per model, kept
+in a lock-protected state file so every gemini-termux process shares them.
+"""
+
+import asyncio
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from gemini_cli.core.resilience import status_code
+from gemini_cli.utils.locking import locked_json, read_json
+
+
+# Adaptive rate scaling after quota errors
+MIN_SCALE = 0.1
+PENALTY_FACTOR = 0.5
+RECOVERY_STEP = 0.05
+
+
+class RateLimiter:
+    """Shared RPM/TPM token buckets with adaptive backoff on quota errors."""
+
+    def __init__(
+        self,
+        state_file: Path,
+        rpm: int = 15,
+        tpm: int = 1_000_000,
+        model_limits: Optional[Dict[str, Dict[str, int]]] = None
+    ):
+        """
+        Initialize rate limiter.
+
+        Args:
+            state_file: Shared state file (e.g. Config.cache_dir / "ratelimit.json")
+            rpm: Default requests per minute (0 = unlimited)
+            tpm: Default tokens per minute (0 = unlimited)
+            model_limits: Per-model overrides, e.g. {"gemini-1.5-pro": {"rpm": 2}}
+        """
+        self.state_file = Path(state_file)
+        self.rpm = rpm
+        self.tpm = tpm
+        self.model_limits = model_limits or {}
+
+    def limits(self, model: str) -> Tuple[int, int]:
+        """
+        Get the configured (rpm, tpm) for a model.
+
+        Args:
+            model: Model name
+
+        Returns:
+            Tuple of requests and tokens per minute
+        """
+        override = self.model_limits.get(model, {})
+        return override.get("rpm", self.rpm), override.get("tpm", self.tpm)
+
+    def _bucket(self, state: Dict, model: str, now: float) -> Dict:
+        """Get a model's bucket, refilled up to now."""
+        rpm, tpm = self.limits(model)
+        bucket = state.setdefault(model, {
+            "requests": float(rpm),
+            "tokens": float(tpm),
+            "updated": now,
+            "scale": 1.0,
+            "blocked_until": 0.0,
+        })
+        elapsed = max(0.0, now - bucket["updated"])
+        scale = bucket["scale"]
+        bucket["requests"] = min(rpm * scale, bucket["requests"] + elapsed * rpm * scale / 60)
+        bucket["tokens"] = min(tpm * scale, bucket["tokens"] + elapsed * tpm * scale / 60)
+        bucket["updated"] = now
+        return bucket
+
+    def try_acquire(self, model: str, tokens: int = 0) -> float:
+        """
+        Take one request and `tokens` tokens from the model's buckets.
+
+        Args:
+            model: Model name
+            tokens: Estimated tokens for the request
+
+        Returns:
+            0 if acquired, otherwise seconds to wait before trying again
+        """
+        rpm, tpm = self.limits(model)
+        if not rpm and not tpm:
+            return 0.0
+
+        now = time.time()
+        with locked_json(self.state_file) as state:
+            bucket = self._bucket(state, model, now)
+            if bucket["blocked_until"] > now:
+                return bucket["blocked_until"] - now
+
+            scale = bucket["scale"]
+            # A request larger than the whole bucket waits for a full bucket
+            needed = min(tokens, tpm * scale) if tpm else 0
+            waits = []
+            if rpm and bucket["requests"] < 1:
+                waits.append((1 - bucket["requests"]) * 60 / (rpm * scale))
+            if tpm and bucket["tokens"] < needed:
+                waits.append((needed - bucket["tokens"]) * 60 / (tpm * scale))
+            if waits:
+                return max(waits)
+
+            if rpm:
+                bucket["requests"] -= 1
+            if tpm:
+                bucket["tokens"] -= needed
+            return 0.0
+
+    def acquire(self, model: str, tokens: int = 0) -> float:
+        """
+        Block until the model's quota allows a request.
+
+        Args:
+            model: Model name
+            tokens: Estimated tokens for the request
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            wait = self.try_acquire(model, tokens)
+            if not wait:
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+    async def acquire_async(self, model: str, tokens: int = 0) -> float:
+        """Async variant of acquire()."""
+        waited = 0.0
+        while True:
+            wait = self.try_acquire(model, tokens)
+            if not wait:
+                return waited
+            await asyncio.sleep(wait)
+            waited += wait
+
+    def record_tokens(self, model: str, tokens: int) -> None:
+        """
+        Charge tokens used after the fact (e.g. generated output).
+
+        Args:
+            model: Model name
+            tokens: Tokens to deduct
+        """
+        if not tokens or not self.limits(model)[1]:
+            return
+        with locked_json(self.state_file) as state:
+            self._bucket(state, model, time.time())["tokens"] -= tokens
+
+    def report_quota_error(self, model: str, retry_after: Optional[float] = None) -> None:
+        """
+        Slow down after the server rejected a request for quota.
+
+        Halves the model's effective rate and blocks it briefly; the rate
+        recovers gradually as requests succeed.
+
+        Args:
+            model: Model name
+            retry_after: Server-suggested delay in seconds, if known
+        """
+        now = time.time()
+        with locked_json(self.state_file) as state:
+            bucket = self._bucket(state, model, now)
+            bucket["scale"] = max(MIN_SCALE, bucket["scale"] * PENALTY_FACTOR)
+            rpm = self.limits(model)[0] or 60
+            delay = retry_after if retry_after else 60 / (rpm * bucket["scale"])
+            bucket["blocked_until"] = max(bucket["blocked_until"], now + delay)
+            bucket["requests"] = min(bucket["requests"], 0.0)
+
+    def report_success(self, model: str) -> None:
+        """
+        Let the effective rate recover after a successful request.
+
+        Args:
+            model: Model name
+        """
+        state = read_json(self.state_file).get(model)
+        if not state or state.get("scale", 1.0) >= 1.0:
+            return
+        with locked_json(self.state_file) as state:
+            bucket = self._bucket(state, model, time.time())
+            bucket["scale"] = min(1.0, bucket["scale"] + RECOVERY_STEP)
+
+    def permit(self, model: str, tokens: int = 0) -> "Permit":
+        """
+        Create a permit for one logical request (covering its retries).
+
+        Args:
+            model: Model name
+            tokens: Estimated input tokens
+
+        Returns:
+            Permit bound to this limiter
+        """
+        return Permit(self, model, tokens)
+
+    def status(self) -> Dict[str, Dict]:
+        """
+        Get current bucket levels per model.
+
+        Returns:
+            Mapping of model name to bucket state
+        """
+        now = time.time()
+        state = read_json(self.state_file)
+        return {model: self._bucket(state, model, now) for model in list(state)}
+
+
+class Permit:
+    """Rate-limit hooks for one request, driven by the resilience layer."""
+
+    def __init__(self, limiter: RateLimiter, model: str, tokens: int = 0):
+        self.limiter = limiter
+        self.model = model
+        self.tokens = tokens
+        self.waited = 0.0
+
+    def wait(self) -> None:
+        """Block until the request may be sent."""
+        self.waited += self.limiter.acquire(self.model, self.tokens)
+
+    async def wait_async(self) -> None:
+        """Await until the request may be sent."""
+        self.waited += await self.limiter.acquire_async(self.model, self.tokens)
+
+    def try_take(self) -> bool:
+        """Take quota for an extra request (e.g. a hedge) only if available now."""
+        return not self.limiter.try_acquire(self.model, self.tokens)
+
+    def succeeded(self) -> None:
+        """Record that the request was accepted."""
+        self.limiter.report_success(self.model)
+
+    def failed(self, exc: BaseException) -> None:
+        """Record a failed attempt; quota errors slow the shared rate down."""
+        if status_code(exc) == 429 or type(exc).__name__ in ("ResourceExhausted", "TooManyRequests"):
+            self.limiter.report_quota_error(self.model, retry_after_seconds(exc))
+
+    def add_output(self, tokens: int) -> None:
+        """Charge generated tokens against the TPM bucket."""
+        self.limiter.record_tokens(self.model, tokens)
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """
+    Read a Retry-After hint from an API error, if present.
+
+    Args:
+        exc: Exception raised by the API
+
+    Returns:
+        Seconds to wait, or None
+    """
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        value = headers.get("retry-after") or headers.get("Retry-After")
+        return float(value) if value else None
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,555 @@
+"""
+Resilience layer for Gemini API calls.
+Applies connect/read deadlines, retries transient errors with exponential
+backoff and jitter, fails fast through a circuit breaker while the backend
+is degraded, and can hedge slow one-shot streams with a duplicate request.
+"""
+
+import asyncio
+import queue
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional
+
+
+# HTTP status codes worth retrying
+TRANSIENT_STATUS = {408, 429, 500, 502, 503, 504}
+
+# google.api_core exception class names for the same conditions
+TRANSIENT_ERRORS = {
+    "ResourceExhausted",
+    "TooManyRequests",
+    "ServiceUnavailable",
+    "InternalServerError",
+    "DeadlineExceeded",
+    "GatewayTimeout",
+    "BadGateway",
+    "Aborted",
+}
+
+# Pump message kinds
+_CHUNK, _END, _ERROR = "chunk", "end", "error"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when the circuit breaker rejects a call."""
+
+
+class RequestTimeout(TimeoutError):
+    """Raised when a request misses its connect or read deadline."""
+
+
+def status_code(exc: BaseException) -> Optional[int]:
+    """
+    Extract an HTTP status code from an API exception, if any.
+
+    Args:
+        exc: Exception raised by the SDK or transport
+
+    Returns:
+        Status code or None
+    """
+    code = getattr(exc, "code", None)
+    if isinstance(code, int):
+        return code
+    response = getattr(exc, "response", None)
+    code = getattr(response, "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def is_transient(exc: BaseException) -> bool:
+    """
+    Check whether an error is worth retrying.
+
+    Args:
+        exc: Exception raised by an API call
+
+    Returns:
+        True for timeouts, connection failures, 429 and 5xx errors
+    """
+    if isinstance(exc, CircuitOpenError):
+        return False
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    if type(exc).__name__ in TRANSIENT_ERRORS:
+        return True
+    return status_code(exc) in TRANSIENT_STATUS
+
+
+@dataclass
+class RetryPolicy:
+    """Retry and deadline settings."""
+    max_retries: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 8.0
+    connect_timeout: float = 30.0
+    read_timeout: float = 60.0
+    total_timeout: float = 600.0
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Delay before retry number `attempt` (full jitter).
+
+        Args:
+            attempt: 1-based retry number
+
+        Returns:
+            Seconds to sleep
+        """
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """
+    Opens after consecutive transient failures, half-opens after a cooldown.
+
+    While half-open a single trial call goes through; others are rejected
+    until it succeeds (closing the circuit) or fails (reopening it).
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, threshold: int = 5, cooldown: float = 30.0):
+        """
+        Initialize circuit breaker.
+
+        Args:
+            threshold: Consecutive failures that open the circuit (0 disables)
+            cooldown: Seconds to stay open before allowing a trial call
+        """
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = 0.0
+        self.open_count = 0
+        self._state = self.CLOSED
+        # Start of the half-open trial call in flight (None = no trial)
+        self._trial_started: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Current breaker state."""
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        # Caller holds _lock
+        if self._state == self.OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+            self._state = self.HALF_OPEN
+        return self._state
+
+    def before_call(self) -> None:
+        """
+        Check whether a call may proceed.
+
+        Raises:
+            CircuitOpenError: While the circuit is open, or half-open with
+                the trial call still in flight
+        """
+        if not self.threshold:
+            return
+        with self._lock:
+            state = self._current_state()
+            now = time.monotonic()
+            if state == self.OPEN:
+                remaining = self.cooldown - (now - self.opened_at)
+                raise CircuitOpenError(
+                    f"Gemini API temporarily unavailable; retrying in {max(remaining, 0):.0f}s"
+                )
+            if state == self.HALF_OPEN:
+                # A trial that never reported back (e.g. cancelled) expires
+                # after another cooldown
+                if self._trial_started is not None and now - self._trial_started < self.cooldown:
+                    raise CircuitOpenError(
+                        "Gemini API temporarily unavailable; waiting for a trial request"
+                    )
+                self._trial_started = now
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._state = self.CLOSED
+            self._trial_started = None
+
+    def release(self) -> None:
+        """End a trial call that failed for a reason unrelated to the backend's health."""
+        with self._lock:
+            self._trial_started = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial_started = None
+            should_open = self._state == self.HALF_OPEN or (
+                self.threshold and self.failures >= self.threshold
+            )
+            if should_open and self._state != self.OPEN:
+                self._state = self.OPEN
+                self.opened_at = time.monotonic()
+                self.open_count += 1
+
+
+class _Pump(threading.Thread):
+    """Drains a blocking iterator into a queue so reads can time out."""
+
+    def __init__(self, factory: Callable[[], Iterator], out: queue.Queue, tag: int = 0):
+        super().__init__(daemon=True)
+        self.factory = factory
+        self.out = out
+        self.tag = tag
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        try:
+            iterator = self.factory()
+            for item in iterator:
+                if self.stopped.is_set():
+                    close = getattr(iterator, "close", None)
+                    if close:
+                        close()
+                    return
+                self.out.put((self.tag, _CHUNK, item))
+            self.out.put((self.tag, _END, None))
+        except BaseException as e:
+            self.out.put((self.tag, _ERROR, e))
+
+    def stop(self) -> None:
+        self.stopped.set()
+
+
+class Resilience:
+    """Wraps client calls with deadlines, retries, a breaker and hedging."""
+
+    def __init__(
+        self,
+        policy: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        hedge: bool = False,
+        hedge_percentile: float = 95.0,
+        hedge_min_samples: int = 20
+    ):
+        """
+        Initialize resilience layer.
+
+        Args:
+            policy: Retry and deadline settings
+            breaker: Circuit breaker (shared by all calls through this layer)
+            hedge: Send a duplicate one-shot request when first token is slow
+            hedge_percentile: Time-to-first-token percentile that triggers a hedge
+            hedge_min_samples: Samples needed before hedging starts
+        """
+        self.policy = policy or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self._ttft = deque(maxlen=200)
+        self._counters = {
+            "calls": 0,
+            "attempts": 0,
+            "retries": 0,
+            "failures": 0,
+            "timeouts": 0,
+            "rejected": 0,
+            "hedges": 0,
+            "hedge_wins": 0,
+        }
+        self._lock = threading.Lock()
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += amount
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Get retry, breaker and hedge counters.
+
+        Returns:
+            Counter snapshot
+        """
+        with self._lock:
+            snapshot = dict(self._counters)
+        snapshot["breaker_state"] = self.breaker.state
+        snapshot["breaker_opened"] = self.breaker.open_count
+        snapshot["hedge_threshold"] = self.hedge_threshold()
+        return snapshot
+
+    def hedge_threshold(self) -> Optional[float]:
+        """Time-to-first-token (seconds) after which a hedge is sent."""
+        with self._lock:
+            samples = sorted(self._ttft)
+        if len(samples) < self.hedge_min_samples:
+            return None
+        index = min(len(samples) - 1, int(len(samples) * self.hedge_percentile / 100))
+        return samples[index]
+
+    def _record_ttft(self, seconds: float) -> None:
+        with self._lock:
+            self._ttft.append(seconds)
+
+    def _should_retry(self, exc: BaseException, retry: int, idempotent: bool = True) -> bool:
+        """Record a failed attempt and decide whether to try again."""
+        transient = is_transient(exc)
+        timed_out = isinstance(exc, TimeoutError)
+        if timed_out:
+            self._count("timeouts")
+        if transient:
+            self.breaker.record_failure()
+        else:
+            self.breaker.release()
+        # A timed-out request may still complete server-side; only repeat it
+        # when doing so twice is harmless
+        if timed_out and not idempotent:
+            transient = False
+        if not transient or retry >= self.policy.max_retries:
+            self._count("failures")
+            return False
+        self._count("retries")
+        return True
+
+    def _before_attempt(self, permit=None) -> None:
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError:
+            self._count("rejected")
+            raise
+        # Rate-limit waits happen here, outside the request deadlines
+        if permit is not None:
+            permit.wait()
+        self._count("attempts")
+
+    def call(
+        self,
+        fn: Callable[[], Any],
+        idempotent: bool = True,
+        timeout: Optional[float] = None,
+        permit=None
+    ) -> Any:
+        """
+        Run a blocking call with an overall deadline and retries.
+
+        The deadline covers the whole response, so it is much longer than
+        the per-read timeout the transport applies. An attempt that misses
+        it can't be cancelled and may still be answered (and billed), so it
+        is never repeated; timeouts raised by the call itself are retried.
+
+        Args:
+            fn: Zero-argument callable making the request
+            idempotent: Whether a timed-out call may be repeated
+            timeout: Deadline in seconds (default: policy.total_timeout)
+            permit: Rate-limit permit (see core.ratelimit) waited on per attempt
+
+        Returns:
+            fn's return value
+        """
+        self._count("calls")
+        timeout = timeout or self.policy.total_timeout
+        retry = 0
+        while True:
+            self._before_attempt(permit)
+            out: queue.Queue = queue.Queue()
+            pump = _Pump(lambda: iter([fn()]), out)
+            pump.start()
+            try:
+                _, kind, value = self._get(out, timeout, "response")
+                if kind == _ERROR:
+                    raise value
+            except Exception as e:
+                if permit is not None:
+                    permit.failed(e)
+                retry += 1
+                # The abandoned attempt is still running
+                running = isinstance(e, RequestTimeout) and pump.is_alive()
+                if not self._should_retry(e, retry, idempotent and not running):
+                    raise
+                time.sleep(self.policy.backoff(retry))
+                continue
+            self.breaker.record_success()
+            if permit is not None:
+                permit.succeeded()
+            return value
+
+    def stream(
+        self,
+        factory: Callable[[], Iterator],
+        hedge: bool = False,
+        idempotent: bool = True,
+        permit=None
+    ) -> Iterator:
+        """
+        Stream from an iterator factory with deadlines and retries.
+
+        Errors before the first chunk are retried (and optionally hedged);
+        once chunks have been delivered, errors propagate to the caller.
+
+        Args:
+            factory: Callable that starts the request and returns an iterator
+            hedge: Whether a duplicate request may be sent (one-shot calls only)
+            idempotent: Whether a timed-out request may be repeated
+            permit: Rate-limit permit (see core.ratelimit) waited on per attempt
+
+        Yields:
+            Chunks from the winning request
+        """
+        self._count("calls")
+        retry = 0
+        while True:
+            self._before_attempt(permit)
+            out: queue.Queue = queue.Queue()
+            pumps = [_Pump(factory, out, tag=0)]
+            pumps[0].start()
+            started = time.monotonic()
+            try:
+                tag, kind, value = self._first(out, pumps, factory, hedge and self.hedge, permit)
+            except Exception as e:
+                for pump in pumps:
+                    pump.stop()
+                if permit is not None:
+                    permit.failed(e)
+                retry += 1
+                if not self._should_retry(e, retry, idempotent):
+                    raise
+                time.sleep(self.policy.backoff(retry))
+                continue
+            break
+
+        self.breaker.record_success()
+        if permit is not None:
+            permit.succeeded()
+        self._record_ttft(time.monotonic() - started)
+        for pump in pumps:
+            if pump.tag != tag:
+                pump.stop()
+
+        try:
+            while kind != _END:
+                yield value
+                while True:
+                    item_tag, kind, value = self._get(out, self.policy.read_timeout, "chunk")
+                    if item_tag == tag:
+                        break
+                if kind == _ERROR:
+                    raise value
+        finally:
+            pumps[tag].stop()
+
+    def _first(self, out: queue.Queue, pumps: list, factory: Callable, hedge: bool, permit=None):
+        """Wait for the first chunk, launching a hedge request if it is slow."""
+        deadline = time.monotonic() + self.policy.connect_timeout
+        threshold = self.hedge_threshold() if hedge else None
+        failed = set()
+
+        while True:
+            wait = deadline - time.monotonic()
+            if threshold is not None and len(pumps) == 1:
+                wait = min(wait, threshold)
+            try:
+                tag, kind, value = self._get(out, max(wait, 0), "first token")
+            except RequestTimeout:
+                if threshold is not None and len(pumps) == 1 and time.monotonic() < deadline:
+                    if permit is not None and not permit.try_take():
+                        # No quota to spare for a duplicate; keep waiting
+                        threshold = None
+                        continue
+                    self._count("hedges")
+                    pumps.append(_Pump(factory, out, tag=1))
+                    pumps[1].start()
+                    continue
+                raise
+
+            if kind == _ERROR:
+                failed.add(tag)
+                if len(failed) < len(pumps):
+                    continue  # the other request may still succeed
+                raise value
+            if tag == 1:
+                self._count("hedge_wins")
+            return tag, kind, value
+
+    @staticmethod
+    def _get(out: queue.Queue, timeout: float, what: str):
+        try:
+            return out.get(timeout=timeout)
+        except queue.Empty:
+            raise RequestTimeout(f"Timed out after {timeout:.1f}s waiting for {what}") from None
+
+    async def astream(
+        self,
+        factory: Callable[[], AsyncIterator],
+        idempotent: bool = True,
+        permit=None
+    ) -> AsyncIterator:
+        """
+        Async counterpart of stream() (without hedging).
+
+        Args:
+            factory: Callable returning an async iterator that starts the request
+            idempotent: Whether a timed-out request may be repeated
+            permit: Rate-limit permit (see core.ratelimit) awaited per attempt
+
+        Yields:
+            Chunks from the request
+        """
+        self._count("calls")
+        retry = 0
+        while True:
+            if permit is not None:
+                await permit.wait_async()
+            self._before_attempt()
+            iterator = factory().__aiter__()
+            started = time.monotonic()
+            try:
+                first = await asyncio.wait_for(iterator.__anext__(), self.policy.connect_timeout)
+            except StopAsyncIteration:
+                self.breaker.record_success()
+                if permit is not None:
+                    permit.succeeded()
+                return
+            except Exception as e:
+                await _aclose(iterator)
+                if isinstance(e, asyncio.TimeoutError):
+                    e = RequestTimeout(
+                        f"Timed out after {self.policy.connect_timeout:.1f}s waiting for first token"
+                    )
+                if permit is not None:
+                    permit.failed(e)
+                retry += 1
+                if not self._should_retry(e, retry, idempotent):
+                    raise e
+                await asyncio.sleep(self.policy.backoff(retry))
+                continue
+            break
+
+        self.breaker.record_success()
+        if permit is not None:
+            permit.succeeded()
+        self._record_ttft(time.monotonic() - started)
+        try:
+            yield first
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(iterator.__anext__(), self.policy.read_timeout)
+                except StopAsyncIteration:
+                    return
+                except asyncio.TimeoutError:
+                    raise RequestTimeout(
+                        f"Timed out after {self.policy.read_timeout:.1f}s waiting for chunk"
+                    ) from None
+                yield chunk
+        finally:
+            await _aclose(iterator)
+
+
+async def _aclose(iterator) -> None:
+    close = getattr(iterator, "aclose", None)
+    if close is not None:
+        try:
+            await close()
+        except Exception:
+            pass
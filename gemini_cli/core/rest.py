@@ -0,0 +1,590 @@
+"""
+REST transport for the Gemini API.
+Talks to the Generative Language REST API over a pooled keep-alive httpx
+client (HTTP/2 when `h2` is installed), as a lightweight stand-in for the google-generativeai SDK
+(no grpcio or protobuf). Exposes the small part of the SDK surface that
+GeminiClient uses: GenerativeModel, chat sessions and upload_file.
+"""
+
+import asyncio
+import json
+import mimetypes
+import threading
+import weakref
+from dataclasses import dataclass, field
+from datetime import datetime
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional
+
+import httpx
+
+
+API_BASE = "https://generativelanguage.googleapis.com"
+API_VERSION = "v1beta"
+
+# HTTP/2 needs the optional `h2` package (the `http2` extra); fall back to
+# HTTP/1.1 keep-alive
+HTTP2_AVAILABLE = find_spec("h2") is not None
+
+# SDK-style generation parameter names -> REST field names
+GENERATION_FIELDS = {
+    "temperature": "temperature",
+    "top_p": "topP",
+    "top_k": "topK",
+    "max_output_tokens": "maxOutputTokens",
+    "candidate_count": "candidateCount",
+    "stop_sequences": "stopSequences",
+    "response_mime_type": "responseMimeType",
+}
+
+
+class RestError(RuntimeError):
+    """HTTP error from the REST API (carries `code` and `response`)."""
+
+    def __init__(self, message: str, code: Optional[int] = None, response=None):
+        super().__init__(message)
+        self.code = code
+        self.response = response
+
+
+@dataclass
+class Part:
+    """One part of a message: text or a reference to an uploaded file."""
+    text: str = ""
+    file_data: Optional[Dict[str, str]] = None
+    inline_data: Optional[Dict[str, str]] = None
+
+    def to_json(self) -> Dict[str, Any]:
+        if self.file_data:
+            return {"fileData": {
+                "mimeType": self.file_data["mime_type"],
+                "fileUri": self.file_data["file_uri"],
+            }}
+        if self.inline_data:
+            return {"inlineData": {
+                "mimeType": self.inline_data["mime_type"],
+                "data": self.inline_data["data"],
+            }}
+        return {"text": self.text}
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "Part":
+        file_data = data.get("fileData")
+        if file_data:
+            return cls(file_data={"mime_type": file_data.get("mimeType", ""),
+                                  "file_uri": file_data.get("fileUri", "")})
+        return cls(text=data.get("text", ""))
+
+
+@dataclass
+class Content:
+    """A message in a conversation (role plus parts)."""
+    role: str
+    parts: List[Part] = field(default_factory=list)
+
+    def to_json(self) -> Dict[str, Any]:
+        return {"role": self.role, "parts": [part.to_json() for part in self.parts]}
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "Content":
+        return cls(data.get("role", "model"), [Part.from_json(p) for p in data.get("parts", [])])
+
+
+@dataclass
+class File:
+    """Handle for a file uploaded through the Files API."""
+    name: str
+    uri: str
+    mime_type: str
+    expiration_time: Optional[datetime] = None
+
+
+def to_part(value: Any) -> Part:
+    """
+    Convert a prompt element to a Part.
+
+    Args:
+        value: Text, Part, file handle or SDK-style part dict
+
+    Returns:
+        Part
+    """
+    if isinstance(value, Part):
+        return value
+    if isinstance(value, str):
+        return Part(text=value)
+    if isinstance(value, dict):
+        return Part(
+            text=value.get("text", ""),
+            file_data=value.get("file_data"),
+            inline_data=value.get("inline_data"),
+        )
+    uri = getattr(value, "uri", None)
+    if uri:
+        return Part(file_data={"mime_type": getattr(value, "mime_type", ""), "file_uri": uri})
+    text = getattr(value, "text", None)
+    if text is not None:
+        return Part(text=text)
+    raise TypeError(f"Unsupported content part: {type(value).__name__}")
+
+
+def to_content(value: Any, role: str = "user") -> Content:
+    """
+    Convert a prompt or history entry to a Content.
+
+    Args:
+        value: Text, list of parts, Content or {"role", "parts"} dict
+        role: Role for values that don't carry one
+
+    Returns:
+        Content
+    """
+    if isinstance(value, Content):
+        return value
+    if isinstance(value, dict) and "parts" in value:
+        return Content(value.get("role", role), [to_part(p) for p in value["parts"]])
+    if isinstance(value, (list, tuple)):
+        return Content(role, [to_part(p) for p in value])
+    parts = getattr(value, "parts", None)
+    if parts is not None:
+        return Content(getattr(value, "role", role), [to_part(p) for p in parts])
+    return Content(role, [to_part(value)])
+
+
+class Response:
+    """A complete response or one streamed chunk."""
+
+    def __init__(self, data: Dict[str, Any]):
+        self.data = data
+        feedback = data.get("promptFeedback") or {}
+        if feedback.get("blockReason") and not data.get("candidates"):
+            raise RestError(f"Prompt blocked: {feedback['blockReason']}", code=400)
+        candidates = data.get("candidates") or [{}]
+        self.content = Content.from_json(candidates[0].get("content") or {"role": "model"})
+        self.finish_reason = candidates[0].get("finishReason")
+        self.usage = data.get("usageMetadata") or {}
+
+    @property
+    def text(self) -> str:
+        return "".join(part.text for part in self.content.parts)
+
+
+class StreamResponse:
+    """Iterable over streamed Response chunks (sync or async)."""
+
+    def __init__(self, lines, on_complete=None, close=None):
+        self._lines = lines
+        self._on_complete = on_complete
+        self._close = close
+        self.chunks: List[Response] = []
+
+    def _finish(self) -> None:
+        if self._on_complete is not None:
+            self._on_complete(self.chunks)
+
+    def __iter__(self) -> Iterator[Response]:
+        try:
+            for event in parse_sse(self._lines):
+                chunk = Response(event)
+                self.chunks.append(chunk)
+                yield chunk
+            self._finish()
+        finally:
+            if self._close is not None:
+                self._close()
+
+    async def __aiter__(self) -> AsyncIterator[Response]:
+        parser = SSEParser()
+        try:
+            async for line in self._lines:
+                event = parser.feed(line)
+                if event is not None:
+                    chunk = Response(event)
+                    self.chunks.append(chunk)
+                    yield chunk
+            event = parser.feed("")
+            if event is not None:
+                chunk = Response(event)
+                self.chunks.append(chunk)
+                yield chunk
+            self._finish()
+        finally:
+            if self._close is not None:
+                await self._close()
+
+
+class SSEParser:
+    """Incremental server-sent-events parser yielding JSON payloads."""
+
+    def __init__(self):
+        self._data: List[str] = []
+
+    def feed(self, line: str) -> Optional[Dict[str, Any]]:
+        """
+        Feed one line of the event stream.
+
+        Args:
+            line: Line without its terminator
+
+        Returns:
+            Decoded event payload when an event completes, else None
+        """
+        if line:
+            if line.startswith("data:"):
+                self._data.append(line[5:].lstrip())
+            return None
+        if not self._data:
+            return None
+        payload = "\n".join(self._data)
+        self._data = []
+        return json.loads(payload)
+
+
+def parse_sse(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Parse a server-sent-events stream incrementally.
+
+    Args:
+        lines: Lines of the stream
+
+    Yields:
+        Decoded event payloads
+    """
+    parser = SSEParser()
+    for line in lines:
+        event = parser.feed(line)
+        if event is not None:
+            yield event
+    event = parser.feed("")
+    if event is not None:
+        yield event
+
+
+class RestTransport:
+    """Connection pool and request helpers for the REST API."""
+
+    def __init__(
+        self,
+        api_key: str,
+        timeout: float = 60.0,
+        base_url: str = API_BASE,
+        http2: Optional[bool] = None,
+        max_connections: int = 10,
+        transport=None
+    ):
+        """
+        Initialize REST transport.
+
+        Args:
+            api_key: Google API key
+            timeout: Connect/read timeout per network operation
+            base_url: API endpoint (overridable for testing)
+            http2: Use HTTP/2 (default: when `h2` is installed)
+            max_connections: Connection pool size
+            transport: Custom httpx transport (e.g. httpx.MockTransport)
+        """
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.http2 = HTTP2_AVAILABLE if http2 is None else http2
+        self.timeout = httpx.Timeout(timeout)
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=120,
+        )
+        self.headers = {"x-goog-api-key": api_key, "Accept-Encoding": "gzip"}
+        self.transport = transport
+        self._client: Optional[httpx.Client] = None
+        self._async_clients = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def configure(self, api_key: Optional[str] = None) -> None:
+        """SDK-compatible configure(); updates the API key."""
+        if api_key:
+            self.api_key = api_key
+            self.headers["x-goog-api-key"] = api_key
+
+    @property
+    def client(self) -> httpx.Client:
+        """Shared keep-alive client (created on first use)."""
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(
+                    http2=self.http2,
+                    timeout=self.timeout,
+                    limits=self.limits,
+                    headers=self.headers,
+                    transport=self.transport,
+                )
+            return self._client
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        """Keep-alive async client for the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._async_clients.get(loop)
+            if client is None:
+                # Clients are bound to the loop they were created on
+                client = self._async_clients[loop] = httpx.AsyncClient(
+                    http2=self.http2,
+                    timeout=self.timeout,
+                    limits=self.limits,
+                    headers=self.headers,
+                    transport=self.transport,
+                )
+            return client
+
+    async def aclose(self) -> None:
+        """Close the running event loop's async client (before the loop ends)."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._async_clients.pop(loop, None)
+        if client is not None:
+            await client.aclose()
+
+    def close(self) -> None:
+        """
+        Close pooled connections.
+
+        Async clients can only be closed on their own event loop, so call
+        aclose() from each loop before it ends (AsyncGeminiClient.run does).
+        Ones left over are closed here if their loop is still open.
+
+        Raises:
+            RuntimeError: If an async client's loop closed without aclose()
+        """
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+            leftovers = list(self._async_clients.items())
+            self._async_clients.clear()
+        unclosed = 0
+        for loop, client in leftovers:
+            if loop.is_closed():
+                unclosed += 1
+            elif loop.is_running():
+                # Owned by another thread (or this one, mid-callback)
+                loop.call_soon_threadsafe(loop.create_task, client.aclose())
+            else:
+                loop.run_until_complete(client.aclose())
+        if unclosed:
+            raise RuntimeError(
+                f"{unclosed} async client(s) outlived their event loop; await aclose() on each loop first"
+            )
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}/{API_VERSION}/{path}"
+
+    @staticmethod
+    def check(response: httpx.Response) -> httpx.Response:
+        """
+        Raise RestError for an HTTP error response.
+
+        Args:
+            response: Response (body must be read)
+
+        Returns:
+            The response, if successful
+        """
+        if response.status_code < 400:
+            return response
+        try:
+            message = response.json()["error"]["message"]
+        except Exception:
+            message = response.text[:200]
+        raise RestError(f"{response.status_code}: {message}", code=response.status_code, response=response)
+
+    def post(self, path: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """POST JSON and return the decoded reply."""
+        return self.check(self.client.post(self.url(path), json=body)).json()
+
+    async def apost(self, path: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Async POST JSON and return the decoded reply."""
+        return self.check(await self.async_client.post(self.url(path), json=body)).json()
+
+    def stream(self, path: str, body: Dict[str, Any], on_complete=None) -> StreamResponse:
+        """
+        Start a server-sent-events request.
+
+        Raises on HTTP errors before returning, so callers can retry.
+        """
+        request = self.client.build_request("POST", self.url(path), params={"alt": "sse"}, json=body)
+        response = self.client.send(request, stream=True)
+        if response.status_code >= 400:
+            response.read()
+            response.close()
+            self.check(response)
+        return StreamResponse(response.iter_lines(), on_complete, response.close)
+
+    async def astream(self, path: str, body: Dict[str, Any], on_complete=None) -> StreamResponse:
+        """Async counterpart of stream()."""
+        client = self.async_client
+        request = client.build_request("POST", self.url(path), params={"alt": "sse"}, json=body)
+        response = await client.send(request, stream=True)
+        if response.status_code >= 400:
+            await response.aread()
+            await response.aclose()
+            self.check(response)
+        return StreamResponse(response.aiter_lines(), on_complete, response.aclose)
+
+    # SDK-compatible surface
+
+    def GenerativeModel(self, model_name: str, generation_config: Optional[Dict] = None) -> "GenerativeModel":
+        return GenerativeModel(self, model_name, generation_config)
+
+    def upload_file(self, path: str, mime_type: Optional[str] = None, display_name: Optional[str] = None) -> File:
+        """
+        Upload a file with the Files API (resumable protocol, one chunk).
+
+        Args:
+            path: File path
+            mime_type: MIME type (guessed from the name by default)
+            display_name: Name shown in the Files API
+
+        Returns:
+            File handle
+        """
+        path = Path(path)
+        data = path.read_bytes()
+        mime_type = mime_type or mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+
+        start = self.check(self.client.post(
+            f"{self.base_url}/upload/{API_VERSION}/files",
+            headers={
+                "X-Goog-Upload-Protocol": "resumable",
+                "X-Goog-Upload-Command": "start",
+                "X-Goog-Upload-Header-Content-Length": str(len(data)),
+                "X-Goog-Upload-Header-Content-Type": mime_type,
+            },
+            json={"file": {"display_name": display_name or path.name}},
+        ))
+        upload_url = start.headers["x-goog-upload-url"]
+        reply = self.check(self.client.post(
+            upload_url,
+            headers={"X-Goog-Upload-Command": "upload, finalize", "X-Goog-Upload-Offset": "0"},
+            content=data,
+            timeout=None,
+        )).json()["file"]
+
+        expiration = reply.get("expirationTime")
+        return File(
+            name=reply.get("name", ""),
+            uri=reply["uri"],
+            mime_type=reply.get("mimeType", mime_type),
+            expiration_time=datetime.fromisoformat(expiration.replace("Z", "+00:00")) if expiration else None,
+        )
+
+
+class GenerativeModel:
+    """REST counterpart of genai.GenerativeModel."""
+
+    def __init__(self, transport: RestTransport, model_name: str, generation_config: Optional[Dict] = None):
+        self.transport = transport
+        self.model_name = model_name if model_name.startswith("models/") else f"models/{model_name}"
+        self.generation_config = dict(generation_config or {})
+
+    def _body(self, contents: List[Content]) -> Dict[str, Any]:
+        body: Dict[str, Any] = {"contents": [content.to_json() for content in contents]}
+        config = {
+            GENERATION_FIELDS.get(key, key): value
+            for key, value in self.generation_config.items()
+            if value is not None
+        }
+        if config:
+            body["generationConfig"] = config
+        return body
+
+    @staticmethod
+    def _contents(contents: Any) -> List[Content]:
+        # A list of messages (history) rather than the parts of one message
+        if isinstance(contents, list) and contents and all(
+            isinstance(c, Content) or (isinstance(c, dict) and "parts" in c) for c in contents
+        ):
+            return [to_content(c) for c in contents]
+        return [to_content(contents)]
+
+    def generate_content(self, contents: Any, stream: bool = False, on_complete=None):
+        """
+        Generate a response.
+
+        Args:
+            contents: Prompt text, parts or list of contents
+            stream: Return an iterator of chunks
+
+        Returns:
+            Response, or StreamResponse when streaming
+        """
+        body = self._body(self._contents(contents))
+        if stream:
+            return self.transport.stream(f"{self.model_name}:streamGenerateContent", body, on_complete)
+        return Response(self.transport.post(f"{self.model_name}:generateContent", body))
+
+    async def generate_content_async(self, contents: Any, stream: bool = False, on_complete=None):
+        """Async counterpart of generate_content()."""
+        body = self._body(self._contents(contents))
+        if stream:
+            return await self.transport.astream(f"{self.model_name}:streamGenerateContent", body, on_complete)
+        return Response(await self.transport.apost(f"{self.model_name}:generateContent", body))
+
+    def count_tokens(self, contents: Any):
+        """Count input tokens with the countTokens endpoint."""
+        reply = self.transport.post(
+            f"{self.model_name}:countTokens",
+            {"contents": [c.to_json() for c in self._contents(contents)]},
+        )
+        return TokenCount(reply.get("totalTokens", 0))
+
+    def start_chat(self, history: Optional[List[Any]] = None) -> "ChatSession":
+        return ChatSession(self, [to_content(entry) for entry in history or []])
+
+
+@dataclass
+class TokenCount:
+    total_tokens: int
+
+
+class ChatSession:
+    """REST counterpart of the SDK's ChatSession; history is updated per turn."""
+
+    def __init__(self, model: GenerativeModel, history: Optional[List[Content]] = None):
+        self.model = model
+        self.history: List[Content] = history or []
+
+    def _turn(self, content: Any):
+        message = to_content(content)
+
+        def record(chunks: List[Response]) -> None:
+            reply = Content("model", [Part(text="".join(chunk.text for chunk in chunks))])
+            self.history.extend([message, reply])
+
+        return [*self.history, message], record
+
+    def send_message(self, content: Any, stream: bool = False):
+        """
+        Send a chat turn.
+
+        Args:
+            content: Message text or parts
+            stream: Return an iterator of chunks
+
+        Returns:
+            Response, or StreamResponse when streaming
+        """
+        contents, record = self._turn(content)
+        if stream:
+            return self.model.generate_content(contents, stream=True, on_complete=record)
+        response = self.model.generate_content(contents)
+        record([response])
+        return response
+
+    async def send_message_async(self, content: Any, stream: bool = False):
+        """Async counterpart of send_message()."""
+        contents, record = self._turn(content)
+        if stream:
+            return await self.model.generate_content_async(contents, stream=True, on_complete=record)
+        response = await self.model.generate_content_async(contents)
+        record([response])
+        return response
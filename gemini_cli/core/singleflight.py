@@ -0,0 +1,222 @@
+"""
+Coalescing of identical in-flight requests ("singleflight").
+Concurrent callers asking for the same thing (same cache key: model,
+generation config, prompt and attachment hashes) share one upstream
+request. Each subscriber gets its own copy of the stream, replayed from
+the start; the upstream is cancelled only when the last subscriber leaves.
+"""
+
+import asyncio
+import threading
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+
+class Flight:
+    """One upstream request and the chunks it has produced so far."""
+
+    def __init__(self, key: str):
+        self.key = key
+        self.chunks: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.cancelled = False
+        self.subscribers = 0
+        # Set by the group: threading.Condition or asyncio.Condition
+        self.changed = None
+        self.task: Optional[asyncio.Task] = None
+
+
+class _Stats:
+    """Counters shared by both flight groups."""
+
+    def __init__(self):
+        self.stats = {"flights": 0, "coalesced": 0, "cancelled": 0}
+
+    def _join(self, flights: Dict[str, Flight], key: str) -> tuple:
+        """Attach to the flight for `key`, creating it if needed (caller holds any lock)."""
+        flight = flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = flights[key] = Flight(key)
+            self.stats["flights"] += 1
+        else:
+            self.stats["coalesced"] += 1
+        flight.subscribers += 1
+        return flight, leader
+
+    def _leave(self, flights: Dict[str, Flight], flight: Flight) -> bool:
+        """
+        Detach a subscriber (caller holds any lock).
+
+        Returns:
+            True if it was the last one and the upstream should be cancelled
+        """
+        flight.subscribers -= 1
+        if flight.subscribers or flight.done:
+            return False
+        flight.cancelled = True
+        self.stats["cancelled"] += 1
+        # New callers must not join a flight that is being torn down
+        if flights.get(flight.key) is flight:
+            del flights[flight.key]
+        return True
+
+
+class SingleFlight(_Stats):
+    """Thread-safe flight group for blocking chunk iterators."""
+
+    def __init__(self):
+        super().__init__()
+        self._flights: Dict[str, Flight] = {}
+        self._lock = threading.Lock()
+
+    def in_flight(self) -> int:
+        """Number of upstream requests currently running."""
+        with self._lock:
+            return len(self._flights)
+
+    def subscribe(self, key: str, factory: Callable[[], Iterator[str]]) -> Iterator[str]:
+        """
+        Stream the response for `key`, sharing a running request if any.
+
+        The first subscriber starts `factory()` on a pump thread; everyone
+        (including the first) reads from the shared buffer. Nothing starts
+        until the returned iterator is first advanced.
+
+        Args:
+            key: Request identity (e.g. ResponseCache.make_key)
+            factory: Starts the upstream request, returning its chunks
+
+        Yields:
+            Response chunks
+
+        Raises:
+            Whatever the upstream request raised
+        """
+        with self._lock:
+            flight, leader = self._join(self._flights, key)
+            if leader:
+                flight.changed = threading.Condition()
+        if leader:
+            threading.Thread(
+                target=self._pump, args=(flight, factory), name="singleflight", daemon=True
+            ).start()
+
+        index = 0
+        try:
+            while True:
+                with flight.changed:
+                    while index >= len(flight.chunks) and not flight.done:
+                        flight.changed.wait()
+                    pending = flight.chunks[index:]
+                    finished = flight.done
+                index += len(pending)
+                yield from pending
+                if finished:
+                    if flight.error is not None:
+                        raise flight.error
+                    return
+        finally:
+            with self._lock:
+                self._leave(self._flights, flight)
+
+    def _pump(self, flight: Flight, factory: Callable[[], Iterator[str]]) -> None:
+        """Drive the upstream request into the flight's buffer."""
+        upstream = None
+        try:
+            upstream = factory()
+            for chunk in upstream:
+                with flight.changed:
+                    if flight.cancelled:
+                        break
+                    flight.chunks.append(chunk)
+                    flight.changed.notify_all()
+        except Exception as e:
+            flight.error = e
+        finally:
+            close = getattr(upstream, "close", None)
+            if close is not None:
+                # Stops the HTTP stream (and response caching) when cancelled
+                close()
+            with self._lock:
+                if self._flights.get(flight.key) is flight:
+                    del self._flights[flight.key]
+            with flight.changed:
+                flight.done = True
+                flight.changed.notify_all()
+
+
+class AsyncSingleFlight(_Stats):
+    """Flight group for async chunk iterators on one event loop."""
+
+    def __init__(self):
+        super().__init__()
+        self._flights: Dict[str, Flight] = {}
+
+    def in_flight(self) -> int:
+        """Number of upstream requests currently running."""
+        return len(self._flights)
+
+    async def subscribe(self, key: str, factory: Callable[[], AsyncIterator[str]]) -> AsyncIterator[str]:
+        """
+        Stream the response for `key`, sharing a running request if any.
+
+        The first subscriber starts `factory()` in a pump task; when the
+        last subscriber leaves (or is cancelled) the task is cancelled.
+
+        Args:
+            key: Request identity (e.g. ResponseCache.make_key)
+            factory: Starts the upstream request, returning its chunks
+
+        Yields:
+            Response chunks
+
+        Raises:
+            Whatever the upstream request raised
+        """
+        flight, leader = self._join(self._flights, key)
+        if leader:
+            flight.changed = asyncio.Condition()
+            flight.task = asyncio.create_task(self._pump(flight, factory))
+
+        index = 0
+        try:
+            while True:
+                async with flight.changed:
+                    await flight.changed.wait_for(lambda: index < len(flight.chunks) or flight.done)
+                    pending = flight.chunks[index:]
+                    finished = flight.done
+                index += len(pending)
+                for chunk in pending:
+                    yield chunk
+                if finished:
+                    if flight.error is not None:
+                        raise flight.error
+                    return
+        finally:
+            if self._leave(self._flights, flight) and flight.task is not None:
+                flight.task.cancel()
+
+    async def _pump(self, flight: Flight, factory: Callable[[], AsyncIterator[str]]) -> None:
+        """Drive the upstream request into the flight's buffer."""
+        upstream = None
+        try:
+            upstream = factory()
+            async for chunk in upstream:
+                async with flight.changed:
+                    flight.chunks.append(chunk)
+                    flight.changed.notify_all()
+        except asyncio.CancelledError:
+            # Every subscriber left; nobody is waiting for the result
+            flight.error = asyncio.CancelledError()
+        except Exception as e:
+            flight.error = e
+        finally:
+            aclose = getattr(upstream, "aclose", None)
+            if aclose is not None:
+                await aclose()
+            if self._flights.get(flight.key) is flight:
+                del self._flights[flight.key]
+            async with flight.changed:
+                flight.done = True
+                flight.changed.notify_all()
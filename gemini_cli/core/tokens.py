@@ -0,0 +1,89 @@
+"""
+Token estimation helpers.
+Cheap local approximations used for quotas and context budgeting.
+"""
+
+# Gemini tokenizers average roughly four characters of English per token
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a text.
+
+    Args:
+        text: Text to estimate
+
+    Returns:
+        Approximate token count (at least 1 for non-empty text)
+    """
+    return chars_to_tokens(len(text)) if text else 0
+
+
+def chars_to_tokens(chars: int) -> int:
+    """
+    Convert a character count to an approximate token count.
+
+    Args:
+        chars: Number of characters
+
+    Returns:
+        Approximate token count
+    """
+    return (chars + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+# Fixed cost the API charges for each image or file part
+FILE_PART_TOKENS = 258
+
+
+def estimate_content_tokens(content) -> int:
+    """
+    Estimate the input tokens of request content.
+
+    Args:
+        content: Prompt string or list of parts (strings and file parts)
+
+    Returns:
+        Approximate token count
+    """
+    if isinstance(content, str):
+        return estimate_tokens(content)
+    total = 0
+    for part in content:
+        if isinstance(part, str):
+            total += estimate_tokens(part)
+        else:
+            total += FILE_PART_TOKENS
+    return total
+
+
+# Input token limits per model (from the models API)
+MODEL_INPUT_LIMITS = {
+    "gemini-2.0-flash-exp": 1_048_576,
+    "gemini-2.0-flash-thinking-exp": 32_767,
+    "gemini-1.5-pro": 2_097_152,
+    "gemini-1.5-flash": 1_048_576,
+    "gemini-1.5-flash-8b": 1_048_576,
+}
+
+# Conservative limit for models not listed above
+DEFAULT_INPUT_LIMIT = 32_768
+
+
+def context_budget(model: str, max_output_tokens: int = 0, cap: int = 0) -> int:
+    """
+    Get the tokens available for conversation context.
+
+    Args:
+        model: Model name
+        max_output_tokens: Tokens reserved for the response
+        cap: Optional upper bound (0 = model limit only)
+
+    Returns:
+        Input token budget
+    """
+    budget = MODEL_INPUT_LIMITS.get(model, DEFAULT_INPUT_LIMIT) - max_output_tokens
+    if cap:
+        budget = min(budget, cap)
+    return max(budget, 0)
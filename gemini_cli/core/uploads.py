@@ -0,0 +1,185 @@
+"""
+File upload management for the Gemini Files API.
+Deduplicates uploads by content hash and uploads new files in parallel.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from gemini_cli.core.cache import hash_file
+from gemini_cli.utils.files import FileHandler
+from gemini_cli.utils.locking import locked_json, read_json
+
+
+# Uploaded files live for 48 hours; assume that when the API gives no expiry
+DEFAULT_FILE_TTL = 47 * 3600
+
+# Don't reuse handles that expire before a request could finish
+EXPIRY_MARGIN = 10 * 60
+
+
+@dataclass
+class UploadResult:
+    """Outcome of preparing one attachment."""
+    path: Path
+    part: Any = None
+    seconds: float = 0.0
+    reused: bool = False
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the file can be attached."""
+        return self.error is None
+
+
+class UploadManager:
+    """Uploads attachments, reusing still-valid handles for known content."""
+
+    def __init__(
+        self,
+        index_file: Optional[Path] = None,
+        max_workers: int = 4,
+        uploader: Optional[Callable] = None
+    ):
+        """
+        Initialize upload manager.
+
+        Args:
+            index_file: JSON index of content hash -> uploaded handle
+                (None keeps the index in memory only)
+            max_workers: Maximum parallel uploads
+            uploader: Upload function (default: the SDK's upload_file)
+        """
+        self.index_file = Path(index_file) if index_file else None
+        self.max_workers = max_workers
+        self._uploader = uploader
+        self._memory_index: Dict[str, Dict] = {}
+
+    @property
+    def uploader(self) -> Callable:
+        if self._uploader is None:
+            from gemini_cli.core.client import load_sdk
+            self._uploader = load_sdk().upload_file
+        return self._uploader
+
+    def upload(self, files: List[Path]) -> List[UploadResult]:
+        """
+        Prepare attachments, uploading only content not already on the server.
+
+        Args:
+            files: List of file paths
+
+        Returns:
+            One UploadResult per file, in input order
+        """
+        results = [UploadResult(path=Path(f)) for f in files]
+        index = self._load_index()
+        now = time.time()
+
+        pending: Dict[str, List[UploadResult]] = {}
+        for result in results:
+            started = time.monotonic()
+            try:
+                digest = hash_file(result.path)
+            except OSError as e:
+                result.error = str(e)
+                continue
+
+            entry = index.get(digest)
+            if entry and entry.get("expires", 0) - EXPIRY_MARGIN > now:
+                result.part = {"file_data": {"mime_type": entry["mime_type"], "file_uri": entry["uri"]}}
+                result.reused = True
+                result.seconds = time.monotonic() - started
+            else:
+                # The same content attached twice is uploaded once
+                pending.setdefault(digest, []).append(result)
+
+        if pending:
+            uploads = [group[0] for group in pending.values()]
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(uploads))) as executor:
+                list(executor.map(self._upload_one, uploads))
+
+            for first, *duplicates in pending.values():
+                for duplicate in duplicates:
+                    duplicate.part, duplicate.error, duplicate.reused = first.part, first.error, True
+
+            self._save_index({
+                digest: self._index_entry(group[0].part)
+                for digest, group in pending.items()
+                if group[0].ok
+            })
+
+        return results
+
+    def _upload_one(self, result: UploadResult) -> None:
+        started = time.monotonic()
+        try:
+            result.part = self.uploader(path=str(result.path))
+        except Exception as e:
+            result.error = str(e)
+        result.seconds = time.monotonic() - started
+
+    @staticmethod
+    def _index_entry(handle) -> Dict:
+        expiration = getattr(handle, "expiration_time", None)
+        try:
+            expires = expiration.timestamp()
+        except (AttributeError, OSError, OverflowError):
+            expires = time.time() + DEFAULT_FILE_TTL
+        return {
+            "name": getattr(handle, "name", ""),
+            "uri": handle.uri,
+            "mime_type": getattr(handle, "mime_type", None) or "application/octet-stream",
+            "expires": expires,
+        }
+
+    def _load_index(self) -> Dict[str, Dict]:
+        if self.index_file is None:
+            return dict(self._memory_index)
+        return read_json(self.index_file)
+
+    def _save_index(self, entries: Dict[str, Dict]) -> None:
+        if not entries:
+            return
+        if self.index_file is None:
+            self._memory_index.update(entries)
+            return
+
+        now = time.time()
+        try:
+            with locked_json(self.index_file) as index:
+                index.update(entries)
+                # Drop handles the server has already deleted
+                for digest in [d for d, e in index.items() if e.get("expires", 0) < now]:
+                    del index[digest]
+        except OSError as e:
+            print(f"Warning: Could not update upload index: {e}")
+
+
+def format_upload_report(results: List[UploadResult]) -> List[str]:
+    """
+    Describe per-file upload outcomes.
+
+    Args:
+        results: Upload results
+
+    Returns:
+        One human-readable line per file
+    """
+    lines = []
+    for result in results:
+        if not result.ok:
+            lines.append(f"{result.path.name}: failed ({result.error})")
+        elif result.reused:
+            lines.append(f"{result.path.name}: reused existing upload")
+        else:
+            try:
+                size = FileHandler.format_file_size(result.path.stat().st_size)
+            except OSError:
+                size = "?"
+            lines.append(f"{result.path.name}: uploaded {size} in {result.seconds:.2f}s")
+    return lines
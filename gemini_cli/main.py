@@ -6,14 +6,19 @@ Handles command-line interface and argument parsing.
 import sys
 import argparse
 from pathlib import Path
+from typing import TYPE_CHECKING, Optional
 
 from gemini_cli import __version__
-from gemini_cli.core import Auth, Config
-from gemini_cli.ui import Display, ChatInterface
-from gemini_cli.utils import Clipboard, FileHandler, ConversationMemory
 
+if TYPE_CHECKING:
+    from gemini_cli.core import Auth, Config
+    from gemini_cli.ui import Display
 
-def setup_command(args, config: Config, auth: Auth, display: Display) -> int:
+# Heavy dependencies (rich, prompt_toolkit, the Gemini SDK) are imported inside
+# the command that needs them, so `--version`, `config` and `doctor` stay fast.
+
+
+def setup_command(args, config: "Config", auth: "Auth", display: "Display") -> int:
     """
     Run initial setup wizard.
     
@@ -114,7 +119,7 @@ def setup_command(args, config: Config, auth: Auth, display: Display) -> int:
     return 0
 
 
-def chat_command(args, client, config: Config, display: Display) -> int:
+def chat_command(args, client, config: "Config", display: "Display") -> int:
     """
     Start interactive chat session.
     
@@ -127,15 +132,31 @@ def chat_command(args, client, config: Config, display: Display) -> int:
     Returns:
         Exit code
     """
+    from gemini_cli.ui import ChatInterface
+    from gemini_cli.utils import Clipboard, FileHandler
+
     # Initialize components
     clipboard = Clipboard(use_termux_api=config.clipboard.use_termux_api)
-    memory = ConversationMemory(
-        data_dir=config.data_dir,
-        max_entries=config.history.max_entries
-    )
+    try:
+        memory = create_memory(config, session=args.session)
+        summarizer = create_summarizer(client, config)
+    except ValueError as e:
+        display.print_error(str(e))
+        return 1
     
     # Create chat interface
-    chat = ChatInterface(client, display, clipboard, memory)
+    chat = ChatInterface(
+        client,
+        display,
+        clipboard,
+        memory,
+        max_output_tokens=config.generation.max_output_tokens,
+        max_context_tokens=config.history.max_context_tokens,
+        exact_token_count=config.history.exact_token_count,
+        autosave=config.history.auto_save,
+        autosave_debounce=config.history.autosave_debounce,
+        summarizer=summarizer,
+    )
     
     # Handle file inputs
     if args.image or args.file:
@@ -172,7 +193,7 @@ def chat_command(args, client, config: Config, display: Display) -> int:
         return 1
 
 
-def ask_command(args, client, config: Config, display: Display) -> int:
+def ask_command(args, client, config: "Config", display: "Display") -> int:
     """
     Ask a single question.
     
@@ -185,6 +206,8 @@ def ask_command(args, client, config: Config, display: Display) -> int:
     Returns:
         Exit code
     """
+    from gemini_cli.utils import FileHandler
+
     question = args.question
     
     # Handle file inputs
@@ -202,25 +225,34 @@ def ask_command(args, client, config: Config, display: Display) -> int:
             continue
         valid_files.append(file_path)
     
+    if args.race:
+        return race_command(args, client, config, display, valid_files)
+    if args.compare:
+        return compare_command(args, client, config, display, valid_files)
+    
+    from gemini_cli.core.metrics import span, track
+
+    # One-shot generation (answered from the response cache when possible)
+    options = {
+        "files": valid_files,
+        "use_cache": not args.no_cache,
+        "refresh": args.refresh,
+    }
+    
     try:
-        if valid_files:
-            # With files
-            if args.stream:
-                for chunk in client.send_message_with_files(question, valid_files, stream=True):
-                    display.console.print(chunk, end="")
-                display.console.print()
-            else:
-                response = client.send_message_with_files(question, valid_files, stream=False)
-                display.print_markdown(response)
-        else:
-            # Text only
+        with track(getattr(client, "request_metrics", None), client.model_name):
             if args.stream:
-                for chunk in client.generate_content(question, stream=True):
-                    display.console.print(chunk, end="")
-                display.console.print()
+                display.print_stream(client.generate_content(question, stream=True, **options))
             else:
-                response = client.generate_content(question, stream=False)
-                display.print_markdown(response)
+                response = client.generate_content(question, stream=False, **options)
+                with span("render"):
+                    display.print_markdown(response)
+        
+        if args.debug:
+            from gemini_cli.core.uploads import format_upload_report
+
+            for line in format_upload_report(getattr(client, "last_uploads", [])):
+                display.print_info(line)
         
         return 0
     except Exception as e:
@@ -228,7 +260,106 @@ def ask_command(args, client, config: Config, display: Display) -> int:
         return 1
 
 
-def config_command(args, config: Config, display: Display) -> int:
+def race_command(args, client, config: "Config", display: "Display", files: list) -> int:
+    """
+    Race one question across several models (`ask --race`).
+    
+    Args:
+        args: Command arguments
+        client: Gemini client
+        config: Config manager
+        display: Display handler
+        files: Validated attachments
+        
+    Returns:
+        Exit code
+    """
+    from gemini_cli.core.async_client import AsyncGeminiClient
+    from gemini_cli.core.race import ModelRace, RaceStats, resolve_models
+
+    try:
+        models = resolve_models(args.race, client.MODELS)
+    except ValueError as e:
+        display.print_error(str(e))
+        return 1
+    
+    stats = RaceStats(config.cache_dir / "race.json")
+    async_client = AsyncGeminiClient.from_client(client, config.api.max_concurrency)
+    race = ModelRace(async_client, models, stats)
+    
+    renderer = display.stream_renderer()
+    
+    async def run() -> str:
+        parts = []
+        async for chunk in race.run(args.question, files=files):
+            if args.stream:
+                renderer.feed(chunk)
+            else:
+                parts.append(chunk)
+        return renderer.close() if args.stream else "".join(parts)
+    
+    try:
+        response = async_client.run(run())
+    except Exception as e:
+        renderer.close()
+        display.print_error(f"Error: {e}")
+        return 1
+    
+    if args.stream:
+        display.print("")
+    else:
+        display.print_markdown(response)
+    
+    if args.debug:
+        display.print_info(f"Winner: {race.winner} (first token after {race.ttft:.2f}s)")
+        for model, error in race.errors.items():
+            display.print_warning(f"{model}: {error}")
+        for row in stats.summary():
+            ttft = f"{row['mean_ttft']:.2f}s" if row["mean_ttft"] is not None else "-"
+            display.print_info(
+                f"{row['model']}: won {row['wins']}/{row['races']}, mean winning TTFT {ttft}"
+            )
+    
+    return 0
+
+
+def compare_command(args, client, config: "Config", display: "Display", files: list) -> int:
+    """
+    Compare several models on one question (`ask --compare`).
+    
+    Args:
+        args: Command arguments
+        client: Gemini client
+        config: Config manager
+        display: Display handler
+        files: Validated attachments
+        
+    Returns:
+        Exit code
+    """
+    from gemini_cli.core.async_client import AsyncGeminiClient
+    from gemini_cli.core.race import resolve_models
+    from gemini_cli.ui.compare import run_comparison
+
+    try:
+        models = resolve_models(args.compare, client.MODELS)
+    except ValueError as e:
+        display.print_error(str(e))
+        return 1
+    
+    runs = run_comparison(
+        AsyncGeminiClient.from_client(client, config.api.max_concurrency),
+        args.question,
+        models,
+        display.console,
+        files=files,
+        layout=args.layout,
+        theme=config.ui.theme,
+    )
+    return 1 if all(run.error for run in runs) else 0
+
+
+def config_command(args, config: "Config", display: "Display") -> int:
     """
     Manage configuration.
     
@@ -259,13 +390,17 @@ def config_command(args, config: Config, display: Display) -> int:
         
         try:
             section, key = args.key.split(".", 1)
-            config.set(section, key, args.value)
-            config.save()
-            display.print_success(f"Set {args.key} = {args.value}")
-            return 0
         except ValueError:
             display.print_error("Invalid key format. Use: section.key")
             return 1
+        try:
+            config.set(section, key, args.value)
+        except ValueError as e:
+            display.print_error(f"Invalid value for {args.key}: {e}")
+            return 1
+        config.save()
+        display.print_success(f"Set {args.key} = {config.get(section, key)}")
+        return 0
     
     elif args.config_action == "reset":
         config.reset()
@@ -275,7 +410,185 @@ def config_command(args, config: Config, display: Display) -> int:
     return 0
 
 
-def doctor_command(args, config: Config, auth: Auth, display: Display) -> int:
+def cache_command(args, config: "Config", display: "Display") -> int:
+    """
+    Show or clear the response cache.
+    
+    Args:
+        args: Command arguments
+        config: Config manager
+        display: Display handler
+        
+    Returns:
+        Exit code
+    """
+    from gemini_cli.core.cache import ResponseCache
+    from gemini_cli.utils.files import FileHandler
+
+    cache = ResponseCache(config.cache_dir / "responses")
+    
+    if args.cache_action == "clear":
+        removed = cache.clear()
+        display.print_success(f"Removed {removed} cached response(s)")
+        return 0
+    
+    stats = cache.stats()
+    lookups = stats["hits"] + stats["misses"]
+    hit_rate = f"{stats['hits'] / lookups:.0%}" if lookups else "n/a"
+    display.print_panel(
+        f"Enabled: {config.cache.enabled}\n"
+        f"Entries: {stats['entries']} ({FileHandler.format_file_size(stats['bytes'])})\n"
+        f"Hits: {stats['hits']} (API calls saved)\n"
+        f"Misses: {stats['misses']}\n"
+        f"Hit rate: {hit_rate}",
+        title="Response Cache"
+    )
+    return 0
+
+
+def history_command(args, config: "Config", display: "Display") -> int:
+    """
+    Search or export saved conversation history.
+    
+    Args:
+        args: Command arguments
+        config: Config manager
+        display: Display handler
+        
+    Returns:
+        Exit code
+    """
+    import time
+
+    if args.history_action == "export":
+        return history_export(args, config, display)
+    
+    query = " ".join(args.terms)
+    if not query.strip():
+        display.print_error("Nothing to search for")
+        return 1
+    
+    memory = create_memory(config)
+    try:
+        started = time.perf_counter()
+        results = memory.search(query, limit=args.limit, session=args.session)
+        elapsed = time.perf_counter() - started
+    finally:
+        memory.close()
+    
+    if not results:
+        display.print_info(f"No messages match: {query}")
+        return 0
+    
+    display.print_info(f"{len(results)} result(s) in {elapsed * 1000:.0f} ms ({memory.backend})")
+    for result in results:
+        display.print(f"\n{result['timestamp']}  {result['session']}  {result['role']}")
+        display.print(f"  {result['snippet']}")
+    return 0
+
+
+def history_export(args, config: "Config", display: "Display") -> int:
+    """
+    Stream saved history to a file or stdout.
+    
+    Args:
+        args: Command arguments
+        config: Config manager
+        display: Display handler
+        
+    Returns:
+        Exit code
+    """
+    import time
+    from gemini_cli.utils.export import parse_time
+
+    if len(args.terms) > 1:
+        display.print_error("history export takes one output file")
+        return 1
+    output = Path(args.terms[0]) if args.terms and args.terms[0] != "-" else None
+    try:
+        since = parse_time(args.since) if args.since else None
+        until = parse_time(args.until) if args.until else None
+    except ValueError as e:
+        display.print_error(str(e))
+        return 1
+    
+    memory = create_memory(config)
+    try:
+        started = time.perf_counter()
+        count = memory.export(
+            output,
+            fmt=args.format,
+            compression=args.compress,
+            session=args.session,
+            since=since,
+            until=until,
+        )
+        elapsed = time.perf_counter() - started
+    except (OSError, RuntimeError, ValueError) as e:
+        display.print_error(f"Export failed: {e}")
+        return 1
+    finally:
+        memory.close()
+    
+    # Nothing else goes to stdout when the export does
+    if output is not None:
+        display.print_success(f"Exported {count} message(s) to {output} in {elapsed:.2f}s")
+    return 0
+
+
+def stats_command(args, config: "Config", display: "Display") -> int:
+    """
+    Show request latency percentiles from the metrics log.
+    
+    Args:
+        args: Command arguments
+        config: Config manager
+        display: Display handler
+        
+    Returns:
+        Exit code
+    """
+    import time
+    from gemini_cli.core.metrics import format_ms, parse_window, summarize
+
+    log = create_metrics_log(config)
+    
+    if args.clear:
+        removed = log.clear()
+        display.print_success(f"Removed {removed} metrics file(s)")
+        return 0
+    
+    try:
+        since = time.time() - parse_window(args.since)
+    except ValueError as e:
+        display.print_error(str(e))
+        return 1
+    
+    records = [
+        record for record in log.read(since=since)
+        if (not args.model or record.get("model") == args.model)
+        and (not args.cmd or record.get("cmd") == args.cmd)
+    ]
+    if not records:
+        display.print_info(f"No requests recorded in the last {args.since}")
+        return 0
+    
+    display.print_info(f"{len(records)} request(s) in the last {args.since}, span: {args.span}")
+    for group in ("model", "command"):
+        rows = summarize(records, by=group, span_name=args.span)
+        display.print_table(
+            [group.title(), "Requests", "Errors", "p50", "p95", "p99"],
+            [
+                [row["group"], row["requests"], row["errors"],
+                 format_ms(row["p50"]), format_ms(row["p95"]), format_ms(row["p99"])]
+                for row in rows
+            ],
+        )
+    return 0
+
+
+def doctor_command(args, config: "Config", auth: "Auth", display: "Display") -> int:
     """
     Run diagnostics to check installation.
     
@@ -288,6 +601,8 @@ def doctor_command(args, config: Config, auth: Auth, display: Display) -> int:
     Returns:
         Exit code
     """
+    from gemini_cli.utils.clipboard import Clipboard
+
     display.print_panel("🔍 Running Diagnostics...", style="cyan")
     
     issues = []
@@ -328,6 +643,24 @@ def doctor_command(args, config: Config, auth: Auth, display: Display) -> int:
         else:
             display.print_warning(f"{name}: {path} (will be created)")
     
+    # Check API backend
+    display.print("\n[bold]5. API Backend[/bold]")
+    from importlib.util import find_spec
+    sdk_installed = find_spec("google") is not None and find_spec("google.generativeai") is not None
+    backend = config.api.backend
+    if backend == "auto":
+        backend = "sdk" if sdk_installed and not config.api.base_url else "rest"
+    if backend == "sdk" and not sdk_installed:
+        display.print_error("google-generativeai not installed")
+        issues.append("Install google-generativeai or set backend = \"rest\" in [api]")
+    elif backend == "sdk":
+        display.print_success("google-generativeai SDK")
+    else:
+        http = "HTTP/2" if find_spec("h2") is not None else "HTTP/1.1 (pip install 'httpx[http2]' for HTTP/2)"
+        display.print_success(f"REST over httpx, {http}")
+        if config.api.base_url:
+            display.print_warning(f"Custom endpoint: {config.api.base_url}")
+    
     # Summary
     if issues:
         display.print("\n[bold yellow]⚠ Issues Found:[/bold yellow]")
@@ -339,6 +672,383 @@ def doctor_command(args, config: Config, auth: Auth, display: Display) -> int:
         return 0
 
 
+def create_client(api_key: str, config: "Config"):
+    """
+    Create a GeminiClient from configuration.
+    
+    Args:
+        api_key: Google API key
+        config: Config manager
+        
+    Returns:
+        GeminiClient instance
+    """
+    from gemini_cli.core import GeminiClient
+
+    client = GeminiClient(
+        api_key=api_key,
+        model=config.api.model,
+        backend=config.api.backend,
+        base_url=config.api.base_url,
+        timeout=config.api.timeout,
+        **generation_settings(config),
+    )
+    client.resilience = create_resilience(config)
+    client.response_cache = create_response_cache(config)
+    client.rate_limiter = create_rate_limiter(config)
+    if config.api.coalesce:
+        from gemini_cli.core.singleflight import SingleFlight
+        client.inflight = SingleFlight()
+    client.uploads.index_file = config.cache_dir / "uploads.json"
+    return client
+
+
+def generation_settings(config: "Config") -> dict:
+    """Generation parameters from configuration."""
+    return {
+        "temperature": config.generation.temperature,
+        "top_p": config.generation.top_p,
+        "top_k": config.generation.top_k,
+        "max_output_tokens": config.generation.max_output_tokens,
+    }
+
+
+def connect_daemon(config: "Config", display: "Display"):
+    """
+    Connect to a running daemon and apply this invocation's model and
+    generation settings to the connection.
+    
+    Returns:
+        DaemonClient, or None to run in-process (no daemon, or it rejected
+        the settings)
+    """
+    from gemini_cli.core.daemon import DaemonClient, DaemonError
+
+    client = DaemonClient.connect(config.daemon_socket)
+    if client is None:
+        return None
+    try:
+        client.configure(config.api.model, generation_settings(config))
+    except (DaemonError, OSError) as e:
+        display.print_warning(f"Daemon could not apply settings ({e}); running in-process")
+        client.close()
+        return None
+    return client
+
+
+def create_memory(config: "Config", session: Optional[str] = None):
+    """Create conversation memory with the configured storage backend."""
+    from gemini_cli.utils.memory import ConversationMemory
+    from gemini_cli.utils.sessions import DEFAULT_SESSION
+
+    return ConversationMemory(
+        data_dir=config.data_dir,
+        max_entries=config.history.max_entries,
+        fsync_batch=config.history.fsync_batch,
+        backend=config.history.backend,
+        session=session or DEFAULT_SESSION,
+    )
+
+
+def create_summarizer(client, config: "Config"):
+    """
+    Create the rolling history summarizer, if enabled.
+
+    Raises:
+        ValueError: For an unknown summary model or invalid threshold
+    """
+    if not config.history.summarize:
+        return None
+    from gemini_cli.utils.summary import Summarizer, client_summarize
+
+    settings = config.history
+    return Summarizer(
+        client_summarize(client, settings.summary_model),
+        threshold=settings.summary_threshold,
+        model=settings.summary_model,
+    )
+
+
+def create_metrics_log(config: "Config"):
+    """
+    Open the per-request metrics log.
+    
+    Args:
+        config: Config manager
+        
+    Returns:
+        MetricsLog instance
+    """
+    from gemini_cli.core.metrics import MetricsLog
+
+    settings = config.metrics
+    return MetricsLog(
+        config.data_dir / "metrics.jsonl",
+        max_bytes=settings.max_size_kb * 1024,
+        backups=settings.backups,
+    )
+
+
+def create_metrics(config: "Config", command: str):
+    """
+    Create the per-request metrics collector for a command.
+    
+    Args:
+        config: Config manager
+        command: CLI command recorded with each request
+        
+    Returns:
+        Metrics instance, or None if metrics are disabled
+    """
+    if not config.metrics.enabled:
+        return None
+
+    from gemini_cli.core.metrics import Metrics
+
+    return Metrics(create_metrics_log(config), command=command)
+
+
+def create_rate_limiter(config: "Config"):
+    """
+    Create the shared RPM/TPM rate limiter from configuration.
+    
+    Args:
+        config: Config manager
+        
+    Returns:
+        RateLimiter instance, or None if rate limiting is disabled
+    """
+    settings = config.ratelimit
+    if not settings.enabled:
+        return None
+
+    from gemini_cli.core.ratelimit import RateLimiter
+
+    return RateLimiter(
+        config.cache_dir / "ratelimit.json",
+        rpm=settings.rpm,
+        tpm=settings.tpm,
+        model_limits=settings.models,
+    )
+
+
+def create_resilience(config: "Config"):
+    """
+    Create the retry/deadline/circuit-breaker layer from configuration.
+    
+    Args:
+        config: Config manager
+        
+    Returns:
+        Resilience instance
+    """
+    from gemini_cli.core.resilience import CircuitBreaker, Resilience, RetryPolicy
+
+    settings = config.resilience
+    return Resilience(
+        RetryPolicy(
+            max_retries=settings.max_retries,
+            backoff_base=settings.backoff_base,
+            backoff_max=settings.backoff_max,
+            connect_timeout=settings.connect_timeout,
+            read_timeout=config.api.timeout,
+            total_timeout=settings.total_timeout,
+        ),
+        CircuitBreaker(settings.breaker_threshold, settings.breaker_cooldown),
+        hedge=settings.hedge,
+        hedge_percentile=settings.hedge_percentile,
+    )
+
+
+def create_response_cache(config: "Config"):
+    """
+    Create the response cache if enabled.
+    
+    Args:
+        config: Config manager
+        
+    Returns:
+        ResponseCache instance or None when disabled
+    """
+    if not config.cache.enabled:
+        return None
+    
+    from gemini_cli.core.cache import ResponseCache
+
+    return ResponseCache(
+        config.cache_dir / "responses",
+        ttl=config.cache.ttl_hours * 3600,
+        max_size=int(config.cache.max_size_mb * 1024 * 1024),
+        sampled=config.cache.sampled,
+    )
+
+
+def create_display(config: "Config", rich: bool = True):
+    """
+    Create the display handler for a command.
+    
+    Args:
+        config: Config manager
+        rich: Whether the command needs Rich rendering. When False, the
+            plain-text display is used unless Rich is already loaded.
+        
+    Returns:
+        Display or PlainDisplay instance
+    """
+    ui = config.ui
+    options = {
+        "theme": ui.theme,
+        "stream_fps": ui.stream_fps,
+        "stream_flush_bytes": ui.stream_flush_bytes,
+    }
+    if rich or "rich" in sys.modules:
+        from gemini_cli.ui.display import Display
+        return Display(**options)
+    
+    from gemini_cli.ui.plain import PlainDisplay
+    return PlainDisplay(**options)
+
+
+def batch_command(args, client, config: "Config", display: "Display") -> int:
+    """
+    Run a JSONL file of prompts with bounded concurrency.
+    
+    Args:
+        args: Command arguments
+        client: Gemini client
+        config: Config manager
+        display: Display handler
+        
+    Returns:
+        Exit code
+    """
+    from gemini_cli.core.async_client import AsyncGeminiClient
+    from gemini_cli.core.batch import BatchRunner, load_completed, open_output, read_items
+
+    input_path = Path(args.input)
+    if not input_path.is_file():
+        display.print_error(f"Input file not found: {input_path}")
+        return 1
+    
+    workers = args.workers or config.api.max_concurrency
+    if workers < 1:
+        display.print_error(f"api.max_concurrency must be at least 1, got {workers}")
+        return 1
+    to_stdout = args.output == "-"
+    output_path = None if to_stdout else Path(
+        args.output or input_path.with_name(input_path.stem + ".results.jsonl")
+    )
+    
+    completed = {}
+    if output_path and not args.no_resume:
+        completed = load_completed(output_path)
+        if completed:
+            display.print_info(f"Resuming: {len(completed)} item(s) already done")
+    
+    output = sys.stdout if to_stdout else open_output(output_path, resume=not args.no_resume)
+    async_client = AsyncGeminiClient.from_client(client, max_concurrency=workers)
+    runner = BatchRunner(async_client, output, workers=workers)
+    
+    try:
+        stats = async_client.run(runner.run(read_items(input_path), skip=completed))
+    except ValueError as e:
+        display.print_error(f"Invalid input: {e}")
+        return 1
+    except KeyboardInterrupt:
+        display.print_warning("Batch interrupted; rerun the same command to resume")
+        return 130
+    finally:
+        if not to_stdout:
+            output.close()
+    
+    if stats.changed:
+        warning = (
+            f"{stats.changed} item(s) no longer match their earlier result "
+            "(input file changed) and were run again"
+        )
+        if to_stdout:
+            print(f"Warning: {warning}", file=sys.stderr)
+        else:
+            display.print_warning(warning)
+    summary = (
+        f"{stats.succeeded} succeeded, {stats.failed} failed, "
+        f"{stats.skipped} skipped in {stats.elapsed:.1f}s"
+    )
+    if to_stdout:
+        print(summary, file=sys.stderr)
+    else:
+        display.print_info(f"{summary} → {output_path}")
+    return 1 if stats.failed else 0
+
+
+def serve_command(args, client, config: "Config", display: "Display") -> int:
+    """
+    Run the resident daemon, or query/stop a running one.
+    
+    Args:
+        args: Command arguments
+        client: Gemini client to keep warm (None for --status/--stop)
+        config: Config manager
+        display: Display handler
+        
+    Returns:
+        Exit code
+    """
+    from gemini_cli.core.daemon import DaemonClient, DaemonError, GeminiDaemon
+
+    socket_path = Path(args.socket).expanduser() if args.socket else config.daemon_socket
+    
+    if args.status or args.stop:
+        daemon = DaemonClient.connect(socket_path)
+        if daemon is None:
+            display.print_warning(f"No daemon running on {socket_path}")
+            return 1
+        try:
+            if args.stop:
+                daemon.shutdown_daemon()
+                display.print_success(f"Stopped daemon (pid {daemon.daemon_pid})")
+            else:
+                display.print_info(
+                    f"Daemon running (pid {daemon.daemon_pid}, model {daemon.model_name}) "
+                    f"on {socket_path}"
+                )
+                if daemon.metrics:
+                    display.print_table(
+                        ["Metric", "Value"],
+                        [[name, value] for name, value in daemon.metrics.items()],
+                    )
+        finally:
+            daemon.close()
+        return 0
+    
+    try:
+        server = GeminiDaemon(client, socket_path)
+    except (DaemonError, OSError) as e:
+        display.print_error(str(e))
+        return 1
+    
+    display.print_info(f"Daemon listening on {socket_path} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    display.print_info("Daemon stopped")
+    return 0
+
+
+def positive_int(value: str) -> int:
+    """argparse type for counts that must be at least 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}") from None
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
 def main():
     """Main CLI entry point."""
     parser = argparse.ArgumentParser(
@@ -351,11 +1061,19 @@ Examples:
   gemini-termux chat                     # Start interactive chat
   gemini-termux ask "What is Termux?"    # Quick question
   gemini-termux chat --image photo.jpg   # Chat with image
+  gemini-termux chat --session myproject # Separate named conversation
+  gemini-termux serve &                  # Keep a warm client for fast ask/chat
+  gemini-termux batch prompts.jsonl -w 8 # Run many prompts concurrently
+  gemini-termux stats --since 7d         # Latency percentiles per model/command
+  gemini-termux history search termux    # Search saved conversations
+  gemini-termux history export chat.html # Export history (md/jsonl/html/csv)
         """
     )
     
     parser.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
     parser.add_argument("--debug", action="store_true", help="Enable debug mode")
+    parser.add_argument("--no-daemon", action="store_true",
+                        help="Run in-process even if a daemon is running")
     
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
     
@@ -366,6 +1084,8 @@ Examples:
     chat_parser = subparsers.add_parser("chat", help="Start interactive chat")
     chat_parser.add_argument("--image", "-i", action="append", help="Image file to analyze")
     chat_parser.add_argument("--file", "-f", action="append", help="File to include")
+    chat_parser.add_argument("--session", "-S", metavar="NAME",
+                             help="Named conversation to open or create (default: default)")
     
     # Ask command
     ask_parser = subparsers.add_parser("ask", help="Ask a single question")
@@ -373,6 +1093,18 @@ Examples:
     ask_parser.add_argument("--image", "-i", action="append", help="Image file to analyze")
     ask_parser.add_argument("--file", "-f", action="append", help="File to include")
     ask_parser.add_argument("--stream", "-s", action="store_true", help="Stream response")
+    multi_group = ask_parser.add_mutually_exclusive_group()
+    multi_group.add_argument("--race", metavar="MODELS",
+                             help="Send to several models (comma-separated), keep the first to answer")
+    multi_group.add_argument("--compare", metavar="MODELS",
+                             help="Answer with several models (comma-separated) side by side")
+    ask_parser.add_argument("--layout", choices=["auto", "side", "stacked"], default="auto",
+                            help="Panel layout for --compare")
+    cache_group = ask_parser.add_mutually_exclusive_group()
+    cache_group.add_argument("--no-cache", action="store_true",
+                             help="Bypass the response cache")
+    cache_group.add_argument("--refresh", action="store_true",
+                             help="Ignore cached answer and store a fresh one")
     
     # Config command
     config_parser = subparsers.add_parser("config", help="Manage configuration")
@@ -384,25 +1116,117 @@ Examples:
     # Doctor command
     subparsers.add_parser("doctor", help="Run diagnostics")
     
+    # Cache command
+    cache_parser = subparsers.add_parser("cache", help="Manage the response cache")
+    cache_parser.add_argument("cache_action", choices=["stats", "clear"],
+                              help="Cache action")
+    
+    # History command
+    history_parser = subparsers.add_parser("history", help="Search or export saved conversation history")
+    history_parser.add_argument("history_action", choices=["search", "export"], help="History action")
+    history_parser.add_argument("terms", nargs="*", metavar="ARG",
+                                help="search: words every result must contain; "
+                                     "export: output file (default: stdout)")
+    history_parser.add_argument("--limit", "-n", type=int, default=20,
+                                help="Maximum search results (default: 20)")
+    history_parser.add_argument("--session", "-S", metavar="NAME",
+                                help="Only this session (default: all sessions)")
+    history_parser.add_argument("--format", "-f", choices=["md", "jsonl", "html", "csv"],
+                                help="Export format (default: from the file suffix, else md)")
+    history_parser.add_argument("--compress", "-z", choices=["gzip", "zstd"],
+                                help="Compress the export (default: from a .gz/.zst suffix)")
+    history_parser.add_argument("--since", metavar="TIME",
+                                help="Export messages from TIME on (2024-05-01, 2024-05-01T18:30 or 7d)")
+    history_parser.add_argument("--until", metavar="TIME",
+                                help="Export messages before TIME")
+    
+    # Batch command
+    batch_parser = subparsers.add_parser("batch", help="Run prompts from a JSONL file")
+    batch_parser.add_argument("input", help="JSONL file of prompts")
+    batch_parser.add_argument("--output", "-o",
+                              help="Results JSONL file (default: <input>.results.jsonl, '-' for stdout)")
+    batch_parser.add_argument("--workers", "-w", type=positive_int,
+                              help="Concurrent requests (default: api.max_concurrency)")
+    batch_parser.add_argument("--no-resume", action="store_true",
+                              help="Start over instead of skipping completed items")
+    
+    # Stats command
+    stats_parser = subparsers.add_parser("stats", help="Show request latency percentiles")
+    stats_parser.add_argument("--since", default="24h",
+                              help="Time window, e.g. 30m, 24h, 7d (default: 24h)")
+    stats_parser.add_argument("--span", default="total",
+                              help="Timing to report: total, ttft, stream, render, upload, "
+                                   "generate, config or init (default: total)")
+    stats_parser.add_argument("--model", help="Only requests to this model")
+    stats_parser.add_argument("--command", dest="cmd", help="Only requests from this command")
+    stats_parser.add_argument("--clear", action="store_true", help="Delete recorded metrics")
+    
+    # Serve command
+    serve_parser = subparsers.add_parser("serve", help="Run resident daemon for fast ask/chat")
+    serve_parser.add_argument("--socket", help="Unix socket path")
+    serve_group = serve_parser.add_mutually_exclusive_group()
+    serve_group.add_argument("--status", action="store_true", help="Show daemon status")
+    serve_group.add_argument("--stop", action="store_true", help="Stop the running daemon")
+    
     args = parser.parse_args()
     
+    if not args.command:
+        parser.print_help()
+        return 0
+    
+    import time
+    from gemini_cli.core import Auth, Config
+
     # Initialize core components
+    started = time.perf_counter()
     config = Config()
+    config_time = time.perf_counter() - started
     auth = Auth(config.config_dir)
-    display = Display(theme=config.ui.theme if hasattr(config.ui, "theme") else "monokai")
     
     # Handle commands
     if args.command == "setup":
-        return setup_command(args, config, auth, display)
+        return setup_command(args, config, auth, create_display(config))
     
     elif args.command == "doctor":
-        return doctor_command(args, config, auth, display)
+        return doctor_command(args, config, auth, create_display(config, rich=False))
     
     elif args.command == "config":
-        return config_command(args, config, display)
+        return config_command(args, config, create_display(config, rich=False))
+    
+    elif args.command == "cache":
+        return cache_command(args, config, create_display(config, rich=False))
+    
+    elif args.command == "stats":
+        return stats_command(args, config, create_display(config, rich=False))
+    
+    elif args.command == "history":
+        return history_command(args, config, create_display(config, rich=False))
     
     # Commands that require API key
-    elif args.command in ["chat", "ask"]:
+    elif args.command in ["chat", "ask", "serve", "batch"]:
+        display = create_display(config, rich=args.command != "serve")
+        
+        if args.command == "serve" and (args.status or args.stop):
+            return serve_command(args, None, config, display)
+        
+        metrics = create_metrics(config, args.command)
+        if metrics is not None:
+            metrics.startup["config"] = config_time
+        
+        # Forward to a running daemon when possible
+        # (racing and comparing need concurrent requests on a local client)
+        forward = not (args.command == "ask" and (args.race or args.compare))
+        if args.command in ["chat", "ask"] and forward and config.daemon.enabled and not args.no_daemon:
+            client = connect_daemon(config, display)
+            if client is not None:
+                client.request_metrics = metrics
+                try:
+                    if args.command == "chat":
+                        return chat_command(args, client, config, display)
+                    return ask_command(args, client, config, display)
+                finally:
+                    client.close()
+        
         api_key = auth.get_api_key()
         if not api_key:
             display.print_error("API key not configured")
@@ -411,28 +1235,26 @@ Examples:
         
         # Initialize client
         try:
-            from gemini_cli.core import GeminiClient
-
-            client = GeminiClient(
-                api_key=api_key,
-                model=config.api.model,
-                temperature=config.generation.temperature,
-                top_p=config.generation.top_p,
-                top_k=config.generation.top_k,
-                max_output_tokens=config.generation.max_output_tokens,
-            )
+            started = time.perf_counter()
+            client = create_client(api_key, config)
         except Exception as e:
             display.print_error(f"Failed to initialize client: {e}")
             return 1
+        client.request_metrics = metrics
+        if metrics is not None:
+            metrics.startup["init"] = time.perf_counter() - started
         
         if args.command == "chat":
             return chat_command(args, client, config, display)
         elif args.command == "ask":
             return ask_command(args, client, config, display)
+        elif args.command == "serve":
+            return serve_command(args, client, config, display)
+        elif args.command == "batch":
+            return batch_command(args, client, config, display)
     
-    else:
-        parser.print_help()
-        return 0
+    parser.print_help()
+    return 0
 
 
 if __name__ == "__main__":
@@ -1,6 +1,18 @@
 """User interface components."""
 
-from gemini_cli.ui.display import Display
-from gemini_cli.ui.chat import ChatInterface
+from importlib import import_module
 
-__all__ = ["Display", "ChatInterface"]
+__all__ = ["Display", "ChatInterface", "PlainDisplay"]
+
+_LAZY_EXPORTS = {
+    "Display": "gemini_cli.ui.display",
+    "ChatInterface": "gemini_cli.ui.chat",
+    "PlainDisplay": "gemini_cli.ui.plain",
+}
+
+
+def __getattr__(name: str):
+    """Lazily import UI components so Rich/prompt_toolkit load only when used."""
+    if name in _LAZY_EXPORTS:
+        return getattr(import_module(_LAZY_EXPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
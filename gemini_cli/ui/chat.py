@@ -3,18 +3,33 @@ Interactive chat interface using prompt_toolkit.
 Provides a rich terminal-based chat experience.
 """
 
+import re
+import shlex
+import signal
+import threading
+import time
+
 from prompt_toolkit import PromptSession
 from prompt_toolkit.history import FileHistory
 from prompt_toolkit.auto_suggest import AutoSuggestFromHistory
 from prompt_toolkit.completion import WordCompleter
 from pathlib import Path
-from typing import Optional, List
+from typing import Dict, Optional, List
 from datetime import datetime
 
+from rich.markup import escape
+
 from gemini_cli.ui.display import Display
 from gemini_cli.core.client import GeminiClient
+from gemini_cli.core.metrics import span, track
+from gemini_cli.core.tokens import context_budget, estimate_tokens
+from gemini_cli.utils.autosave import AutoSaver
 from gemini_cli.utils.clipboard import Clipboard
 from gemini_cli.utils.memory import ConversationMemory
+from gemini_cli.utils.summary import Summarizer
+
+# Signals that end the chat like /exit (history is flushed first)
+EXIT_SIGNALS = [getattr(signal, name) for name in ("SIGTERM", "SIGHUP") if hasattr(signal, name)]
 
 
 class ChatInterface:
@@ -25,10 +40,16 @@ class ChatInterface:
         "/exit": "Exit chat",
         "/quit": "Exit chat",
         "/clear": "Clear conversation history",
-        "/history": "Show conversation history",
+        "/history": "Show conversation history (e.g., /history 50)",
+        "/search": "Search all saved history (e.g., /search sqlite wal)",
+        "/sessions": "List named sessions",
+        "/switch": "Open another session, creating it if new (e.g., /switch myproject)",
         "/copy": "Copy last response to clipboard",
-        "/save": "Save conversation to file",
+        "/save": "Export conversation (e.g., /save chat.html, /save all.jsonl.gz --all --since 7d)",
+        "/autosave": "Show background history writer stats",
+        "/summary": "Show the rolling summary of older turns and the tokens it saves",
         "/model": "Switch model (e.g., /model 1.5-pro)",
+        "/compare": "Compare models on a prompt (e.g., /compare 1.5-flash,1.5-pro Why?)",
         "/help": "Show this help message",
     }
     
@@ -38,7 +59,13 @@ class ChatInterface:
         display: Display,
         clipboard: Clipboard,
         memory: ConversationMemory,
-        history_file: Optional[Path] = None
+        history_file: Optional[Path] = None,
+        max_output_tokens: int = 8192,
+        max_context_tokens: int = 0,
+        exact_token_count: bool = False,
+        autosave: bool = True,
+        autosave_debounce: float = 1.0,
+        summarizer: Optional[Summarizer] = None
     ):
         """
         Initialize chat interface.
@@ -49,11 +76,27 @@ class ChatInterface:
             clipboard: Clipboard handler
             memory: Conversation memory
             history_file: Optional file for command history
+            max_output_tokens: Tokens reserved for each response
+            max_context_tokens: Optional cap on context tokens (0 = model limit)
+            exact_token_count: Verify context size with the API's token counter
+            autosave: Save history after each response (otherwise on exit)
+            autosave_debounce: Seconds a background writer collects saves
+                before writing (0 = save on the chat thread)
+            summarizer: Optional rolling summarizer replacing older turns
+                once the context grows past its threshold
         """
         self.client = client
         self.display = display
         self.clipboard = clipboard
         self.memory = memory
+        self.max_output_tokens = max_output_tokens
+        self.max_context_tokens = max_context_tokens
+        self.exact_token_count = exact_token_count
+        self.autosave = autosave
+        self.autosave_debounce = autosave_debounce
+        self.autosaver: Optional[AutoSaver] = None
+        self.summarizer = summarizer
+        self.context_tokens = 0
         
         # Setup prompt session with history
         if history_file is None:
@@ -82,18 +125,52 @@ class ChatInterface:
             show_timestamps: Whether to show message timestamps
         """
         self.running = True
+        if self.autosave and self.autosave_debounce > 0:
+            self.autosaver = AutoSaver(self.memory.save, self.autosave_debounce)
+        previous = self._exit_on_signals()
+        try:
+            self._loop(stream, show_timestamps)
+        finally:
+            # Flush history writes, also when ended by a signal
+            if self.autosaver is not None:
+                self.autosaver.close()
+            self.memory.close()
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+        self.display.print("\n[green]Goodbye! 👋[/green]")
+    
+    def _exit_on_signals(self) -> Dict:
+        """
+        Turn SIGTERM/SIGHUP (e.g. the Termux session closing) into SystemExit.
+        
+        Returns:
+            Previous handlers by signal number
+        """
+        if threading.current_thread() is not threading.main_thread():
+            return {}
         
+        def exit_chat(signum, frame):
+            raise SystemExit(128 + signum)
+        
+        previous = {}
+        for signum in EXIT_SIGNALS:
+            previous[signum] = signal.signal(signum, exit_chat)
+        return previous
+    
+    def _loop(self, stream: bool, show_timestamps: bool) -> None:
+        """Run the prompt loop until /exit or end of input."""
         # Welcome message
         self.display.print_panel(
             "🤖 Gemini Chat Interface\n"
             "Type your message and press Enter\n"
-            "Type /help for available commands",
+            "Type /help for available commands\n"
+            f"Session: {self.memory.session}",
             title="Welcome",
             style="green"
         )
         
         # Start chat session
-        self.client.start_chat(history=self.memory.get_context_for_api())
+        self._start_session()
         
         # Main loop
         while self.running:
@@ -114,30 +191,42 @@ class ChatInterface:
                     timestamp = datetime.now().strftime("%H:%M:%S")
                     self.display.print(f"[dim]({timestamp})[/dim]")
                 
+                # Keep the session's context within the token budget
+                self._fit_context(user_input)
+                
                 # Add to memory
                 self.memory.add_message("user", user_input)
                 
                 # Get response
                 self.display.print("\n[Gemini] ", style="bold cyan", end="")
                 
-                if stream:
-                    # Streaming response
-                    self.last_response = ""
-                    for chunk in self.client.send_message(user_input, stream=True):
-                        self.display.console.print(chunk, end="")
-                        self.last_response += chunk
-                    self.display.console.print()  # New line
-                else:
-                    # Non-streaming response
-                    with self.display.spinner("Thinking..."):
-                        self.last_response = self.client.send_message(user_input, stream=False)
-                    self.display.print_markdown(self.last_response)
+                with track(getattr(self.client, "request_metrics", None), self.client.model_name):
+                    if stream:
+                        # Streaming response (coalesced into frames)
+                        self.last_response = self.display.print_stream(
+                            self.client.send_message(user_input, stream=True)
+                        )
+                    else:
+                        # Non-streaming response
+                        with self.display.spinner("Thinking..."):
+                            self.last_response = self.client.send_message(user_input, stream=False)
+                        with span("render"):
+                            self.display.print_markdown(self.last_response)
                 
                 # Add response to memory
                 self.memory.add_message("model", self.last_response)
+                self.context_tokens += (
+                    self.memory.message_tokens(self.memory.history[-2])
+                    + self.memory.message_tokens(self.memory.history[-1])
+                )
+                if self.memory.summary_saved:
+                    self.display.print(f"[dim](summary saved ~{self.memory.summary_saved:,} tokens)[/dim]")
                 
-                # Auto-save history
-                self.memory.save()
+                # Auto-save history (off the chat thread when debounced)
+                if self.autosaver is not None:
+                    self.autosaver.request()
+                elif self.autosave:
+                    self.memory.save()
                 
             except KeyboardInterrupt:
                 self.display.print("\n\n[yellow]Use /exit to quit[/yellow]")
@@ -147,8 +236,44 @@ class ChatInterface:
             except Exception as e:
                 self.display.print_error(f"An error occurred: {str(e)}")
                 continue
+    
+    def _context_budget(self) -> int:
+        """Token budget for history under the current model."""
+        return context_budget(self.client.model_name, self.max_output_tokens, self.max_context_tokens)
+    
+    def _start_session(self, reserve: int = 0) -> None:
+        """
+        Start a chat session with as much recent history as fits the budget.
         
-        self.display.print("\n[green]Goodbye! 👋[/green]")
+        Args:
+            reserve: Tokens to keep free for the next message
+        """
+        counter = getattr(self.client, "count_tokens", None) if self.exact_token_count else None
+        context = self.memory.get_context_for_api(
+            max_tokens=max(self._context_budget() - reserve, 0),
+            counter=counter,
+            summarizer=self.summarizer
+        )
+        if self.summarizer is not None and self.summarizer.last_error:
+            self.display.print_warning(f"Could not summarize older turns: {self.summarizer.last_error}")
+        self.client.start_chat(history=context)
+        self.context_tokens = sum(estimate_tokens(msg["content"]) for msg in context)
+    
+    def _fit_context(self, message: str) -> None:
+        """
+        Restart the session with trimmed history if the next turn would
+        exceed the token budget (or summarized history, past the
+        summarizer's threshold).
+        
+        Args:
+            message: Message about to be sent
+        """
+        needed = estimate_tokens(message)
+        limit = self._context_budget()
+        if self.summarizer is not None:
+            limit = min(limit, self.summarizer.threshold)
+        if self.context_tokens + needed > limit:
+            self._start_session(reserve=needed)
     
     def _handle_command(self, command: str) -> None:
         """
@@ -167,21 +292,40 @@ class ChatInterface:
         elif cmd == "/clear":
             self.memory.clear()
             self.client.clear_history()
+            self.context_tokens = 0
             self.display.clear()
             self.display.print_success("Conversation cleared")
         
         elif cmd == "/history":
-            self._show_history()
+            self._show_history(int(args) if args.strip().isdigit() else 20)
+        
+        elif cmd == "/search":
+            self._search_history(args)
+        
+        elif cmd == "/sessions":
+            self._show_sessions()
+        
+        elif cmd == "/switch":
+            self._switch_session(args.strip())
         
         elif cmd == "/copy":
             self._copy_last_response()
         
         elif cmd == "/save":
-            self._save_conversation()
+            self._save_conversation(args)
+        
+        elif cmd == "/autosave":
+            self._show_autosave()
+        
+        elif cmd == "/summary":
+            self._show_summary()
         
         elif cmd == "/model":
             self._switch_model(args)
         
+        elif cmd == "/compare":
+            self._compare(args)
+        
         elif cmd == "/help":
             self._show_help()
         
@@ -189,9 +333,14 @@ class ChatInterface:
             self.display.print_error(f"Unknown command: {cmd}")
             self.display.print_info("Type /help for available commands")
     
-    def _show_history(self) -> None:
-        """Display conversation history."""
-        history = self.memory.get_history(limit=20)
+    def _show_history(self, limit: int = 20) -> None:
+        """
+        Display conversation history.
+        
+        Args:
+            limit: Number of recent messages to show
+        """
+        history = self.memory.get_history(limit=limit)
         
         if not history:
             self.display.print_warning("No conversation history")
@@ -212,6 +361,117 @@ class ChatInterface:
         
         self.display.rule()
     
+    def _search_history(self, query: str) -> None:
+        """
+        Show ranked snippets of saved messages matching the query.
+        
+        Args:
+            query: Search terms
+        """
+        if not query.strip():
+            self.display.print_warning("Usage: /search <terms>")
+            return
+        
+        started = time.perf_counter()
+        results = self.memory.search(query, limit=20)
+        elapsed = time.perf_counter() - started
+        if not results:
+            self.display.print_warning(f"No messages match: {query}")
+            return
+        
+        self.display.rule(f"{len(results)} result(s) for '{escape(query)}' ({elapsed * 1000:.0f} ms)")
+        for result in results:
+            role = "You" if result["role"] == "user" else "Gemini"
+            style = "green" if result["role"] == "user" else "cyan"
+            # Matches come back as **term**; show them bold without interpreting the text as markup
+            snippet = re.sub(r"\*\*(.+?)\*\*", r"[bold yellow]\1[/bold yellow]", escape(result["snippet"]))
+            where = f" [dim]in {escape(result['session'])}[/dim]" if result["session"] != self.memory.session else ""
+            self.display.print(f"\n[bold {style}]{role}[/bold {style}] [dim]({result['timestamp']})[/dim]{where}")
+            self.display.print(snippet)
+        self.display.rule()
+    
+    def _show_sessions(self) -> None:
+        """List sessions from the index (their history is not loaded)."""
+        sessions = self.memory.sessions.list()
+        if not sessions:
+            self.display.print_warning("No sessions yet")
+            return
+        
+        self.display.print_table(
+            ["", "Session", "Messages", "Tokens", "Last active"],
+            [
+                [
+                    "*" if entry["name"] == self.memory.session else "",
+                    entry["name"],
+                    entry.get("messages", 0),
+                    entry.get("tokens", 0),
+                    entry.get("last_active", "")[:16].replace("T", " "),
+                ]
+                for entry in sessions
+            ],
+        )
+    
+    def _switch_session(self, name: str) -> None:
+        """
+        Save the current session and continue in another.
+        
+        Args:
+            name: Session name (created if new)
+        """
+        if not name:
+            self.display.print_info(f"Current session: {self.memory.session} (use /switch <name>)")
+            return
+        
+        try:
+            self.memory.switch(name)
+        except ValueError as e:
+            self.display.print_error(str(e))
+            return
+        
+        self.last_response = ""
+        self._start_session()
+        count = len(self.memory.history)
+        self.display.print_success(f"Switched to session '{name}' ({count} recent message(s) loaded)")
+    
+    def _show_autosave(self) -> None:
+        """Show the background history writer's queue depth and write latency."""
+        if self.autosaver is None:
+            mode = "after each response" if self.autosave else "on exit"
+            self.display.print_info(f"History is saved on the chat thread, {mode}")
+            return
+        
+        stats = self.autosaver.stats()
+        self.display.print_info(
+            f"Autosave: {stats['saves']} write(s) for {stats['requests']} request(s) "
+            f"({stats['coalesced']} coalesced, {stats['errors']} failed), "
+            f"queue depth {stats['queue_depth']}; write latency "
+            f"last {stats['last_write_ms']:.1f}ms, avg {stats['avg_write_ms']:.1f}ms, "
+            f"max {stats['max_write_ms']:.1f}ms"
+        )
+    
+    def _show_summary(self) -> None:
+        """Show the rolling summary and how many tokens it saves per turn."""
+        if self.summarizer is None:
+            self.display.print_info("Summarization is off (set summarize = true under [history])")
+            return
+        
+        summary = self.memory.summary
+        if not summary.text:
+            self.display.print_info(
+                f"No summary yet: older turns are summarized once the context "
+                f"exceeds {self.summarizer.threshold:,} tokens"
+            )
+            return
+        
+        self.display.print_panel(escape(summary.text), title="Summary of earlier turns", style="cyan")
+        stats = self.summarizer.stats
+        self.display.print_info(
+            f"{summary.messages} message(s) (~{summary.source_tokens:,} tokens) summarized in "
+            f"~{summary.tokens:,} tokens by {summary.model or 'unknown model'}; "
+            f"saving ~{self.memory.summary_saved:,} tokens per turn now; "
+            f"{stats['updates']} update(s), {stats['errors']} failed this run"
+        )
+    
     def _copy_last_response(self) -> None:
         """Copy last response to clipboard."""
         if not self.last_response:
@@ -226,15 +486,55 @@ class ChatInterface:
             fallback_file = self.clipboard.fallback_file
             self.display.print_warning(f"Saved to {fallback_file} (copy manually)")
     
-    def _save_conversation(self) -> None:
-        """Save conversation to file."""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_file = Path.home() / f"gemini_conversation_{timestamp}.md"
+    def _save_conversation(self, args: str = "") -> None:
+        """
+        Export the conversation to a file.
         
-        if self.memory.export_to_file(output_file):
-            self.display.print_success(f"Conversation saved to {output_file}")
-        else:
-            self.display.print_error("Failed to save conversation")
+        Args:
+            args: "[FILE] [--format F] [--all] [--since TIME] [--until TIME]";
+                the format and compression follow FILE's suffix (chat.html,
+                chat.jsonl.gz, chat.csv.zst) unless --format is given
+        """
+        from gemini_cli.utils.export import parse_time
+        
+        output = None
+        all_sessions = False
+        options = {"--format": None, "--since": None, "--until": None}
+        try:
+            words = iter(shlex.split(args))
+            for word in words:
+                if word == "--all":
+                    all_sessions = True
+                elif word in options:
+                    options[word] = next(words, None)
+                    if options[word] is None:
+                        raise ValueError(f"{word} needs a value")
+                elif word.startswith("--"):
+                    raise ValueError(f"Unknown option: {word}")
+                else:
+                    output = Path(word).expanduser()
+            since = parse_time(options["--since"]) if options["--since"] else None
+            until = parse_time(options["--until"]) if options["--until"] else None
+        except ValueError as e:
+            self.display.print_error(str(e))
+            return
+        
+        if output is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            output = Path.home() / f"gemini_conversation_{timestamp}.{options['--format'] or 'md'}"
+        
+        try:
+            count = self.memory.export(
+                output,
+                fmt=options["--format"],
+                session=None if all_sessions else self.memory.session,
+                since=since,
+                until=until,
+            )
+        except (OSError, RuntimeError, ValueError) as e:
+            self.display.print_error(f"Failed to save conversation: {e}")
+            return
+        self.display.print_success(f"Saved {count} message(s) to {output}")
     
     def _switch_model(self, model_arg: str) -> None:
         """
@@ -272,10 +572,43 @@ class ChatInterface:
         
         try:
             self.client.set_model(model)
-            self.display.print_success(f"Switched to model: {model}")
+            self.display.print_success(f"Switched to model: {model} (conversation kept)")
         except Exception as e:
             self.display.print_error(f"Failed to switch model: {e}")
     
+    def _compare(self, args: str) -> None:
+        """
+        Answer a one-shot prompt with several models side by side.
+        
+        Args:
+            args: "<models> <prompt>", models comma-separated
+        """
+        from gemini_cli.core.async_client import AsyncGeminiClient
+        from gemini_cli.core.race import resolve_models
+        from gemini_cli.ui.compare import run_comparison
+        
+        parts = args.split(maxsplit=1)
+        if len(parts) < 2:
+            self.display.print_error("Usage: /compare <model,model,...> <prompt>")
+            return
+        if not hasattr(self.client, "get_model"):
+            self.display.print_error("/compare is not available through the daemon (use --no-daemon)")
+            return
+        
+        try:
+            models = resolve_models(parts[0], GeminiClient.MODELS)
+        except ValueError as e:
+            self.display.print_error(str(e))
+            return
+        
+        run_comparison(
+            AsyncGeminiClient.from_client(self.client),
+            parts[1],
+            models,
+            self.display.console,
+            theme=self.display.theme,
+        )
+    
     def _show_models(self) -> None:
         """Show available models."""
         self.display.rule("Available Models")
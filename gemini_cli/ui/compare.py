@@ -0,0 +1,113 @@
+"""
+Live side-by-side rendering of a multi-model comparison.
+"""
+
+from typing import List, Optional
+
+from rich import box
+from rich.columns import Columns
+from rich.console import Console, Group
+from rich.live import Live
+from rich.markdown import Markdown
+from rich.panel import Panel
+from rich.text import Text
+
+from gemini_cli.core.compare import ModelRun, compare_models
+
+
+# Narrowest useful panel when placing models side by side
+MIN_COLUMN_WIDTH = 40
+
+# Live refresh rate while streams arrive
+REFRESH_PER_SECOND = 8
+
+
+def format_run_stats(run: ModelRun) -> str:
+    """
+    Summarize a run's timings for a panel subtitle.
+
+    Args:
+        run: Model run
+
+    Returns:
+        e.g. "TTFT 0.41s · 3.2s · 57 tok/s · 1,204 chars"
+    """
+    if run.error:
+        return f"failed after {run.elapsed:.1f}s"
+    ttft = f"TTFT {run.ttft:.2f}s" if run.ttft is not None else "waiting"
+    speed = run.tokens_per_second
+    rate = f"{speed:.0f} tok/s" if speed is not None else "- tok/s"
+    return f"{ttft} · {run.elapsed:.1f}s · {rate} · {run.chars:,} chars"
+
+
+class CompareView:
+    """Renders ModelRuns as panels, side by side or stacked."""
+
+    def __init__(self, runs: List[ModelRun], layout: str = "auto", theme: str = "monokai", width: int = 80):
+        """
+        Initialize comparison view.
+
+        Args:
+            runs: Runs to render (updated in place while streaming)
+            layout: "side", "stacked" or "auto" (side by side when wide enough)
+            theme: Code theme for markdown
+            width: Terminal width
+        """
+        self.runs = runs
+        self.theme = theme
+        if layout == "auto":
+            layout = "side" if width >= MIN_COLUMN_WIDTH * len(runs) else "stacked"
+        self.layout = layout
+        self.width = width
+
+    def _panel(self, run: ModelRun) -> Panel:
+        if run.error:
+            body, style = Text(run.error, style="red"), "red"
+        else:
+            body = Markdown(run.text, code_theme=self.theme) if run.chunks else Text("…", style="dim")
+            style = "green" if run.done else "yellow"
+        return Panel(
+            body,
+            title=f"[bold]{run.model}[/bold]",
+            subtitle=format_run_stats(run),
+            border_style=style,
+            box=box.ROUNDED,
+        )
+
+    def __rich__(self):
+        panels = [self._panel(run) for run in self.runs]
+        if self.layout == "side":
+            column_width = self.width // len(panels) - 1
+            return Columns(panels, width=column_width, equal=True)
+        return Group(*panels)
+
+
+def run_comparison(
+    client,
+    prompt: str,
+    models: List[str],
+    console: Console,
+    files: Optional[list] = None,
+    layout: str = "auto",
+    theme: str = "monokai"
+) -> List[ModelRun]:
+    """
+    Compare models live in the terminal.
+
+    Args:
+        client: AsyncGeminiClient
+        prompt: Prompt to send
+        models: Models to compare
+        console: Rich console to render on
+        files: Optional attachments
+        layout: "side", "stacked" or "auto"
+        theme: Code theme for markdown
+
+    Returns:
+        Completed runs, in model order
+    """
+    runs = [ModelRun(model) for model in models]
+    view = CompareView(runs, layout=layout, theme=theme, width=console.width)
+    with Live(view, console=console, refresh_per_second=REFRESH_PER_SECOND, vertical_overflow="visible"):
+        client.run(compare_models(client, prompt, models, files=files, runs=runs))
+    return runs
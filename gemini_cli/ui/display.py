@@ -10,31 +10,70 @@ from rich.syntax import Syntax
 from rich.table import Table
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich import box
-from typing import Optional
+from typing import Iterable, Optional
+
+from gemini_cli.ui.stream import StreamRenderer
 
 
 class Display:
     """Handles all terminal output and formatting."""
     
-    def __init__(self, theme: str = "monokai"):
+    def __init__(self, theme: str = "monokai", stream_fps: float = 20.0, stream_flush_bytes: int = 512):
         """
         Initialize display handler.
         
         Args:
             theme: Syntax highlighting theme
+            stream_fps: Maximum redraws per second for streamed responses
+            stream_flush_bytes: Pending characters that force an early redraw
         """
         self.console = Console()
         self.theme = theme
+        self.stream_fps = stream_fps
+        self.stream_flush_bytes = stream_flush_bytes
     
-    def print(self, text: str, style: Optional[str] = None) -> None:
+    def print(self, text: str, style: Optional[str] = None, end: str = "\n") -> None:
         """
         Print text with optional styling.
         
         Args:
             text: Text to print
             style: Rich style string
+            end: Line terminator
+        """
+        self.console.print(text, style=style, end=end)
+    
+    def write(self, text: str) -> None:
+        """
+        Write raw text (no markup, highlighting or wrapping).
+        
+        Args:
+            text: Text to write
+        """
+        self.console.out(text, end="", highlight=False)
+    
+    def stream_renderer(self) -> StreamRenderer:
+        """
+        Create a frame-rate-limited renderer for a streamed response.
+        
+        Returns:
+            StreamRenderer writing to this display
+        """
+        return StreamRenderer(self.write, fps=self.stream_fps, flush_bytes=self.stream_flush_bytes)
+    
+    def print_stream(self, chunks: Iterable[str]) -> str:
+        """
+        Print a streamed response as it arrives.
+        
+        Args:
+            chunks: Streamed text chunks
+            
+        Returns:
+            The complete response
         """
-        self.console.print(text, style=style)
+        text = self.stream_renderer().render(chunks)
+        self.console.print()
+        return text
     
     def print_markdown(self, text: str) -> None:
         """
@@ -0,0 +1,208 @@
+"""
+Plain-text display fallback.
+Mirrors the Display API without importing Rich, for fast non-interactive commands.
+"""
+
+import re
+import sys
+from typing import Iterable, Optional, TextIO
+
+from gemini_cli.ui.stream import StreamRenderer
+
+
+# One Rich style: an attribute or colour, optionally negated or a background
+_STYLE = (
+    r"(?:not |on )?(?:bold|dim|italic|underline|strike|blink|reverse|conceal|"
+    r"(?:bright_)?(?:black|red|green|yellow|blue|magenta|cyan|white)|#[0-9a-fA-F]{6})"
+)
+
+# Rich console markup such as [bold], [/bold yellow], [dim] or [/]; other
+# bracketed text ("[x]", "[docs](url)", "arr[i]") is left alone
+MARKUP_PATTERN = re.compile(rf"(?<!\\)\[(?:/|/?{_STYLE}(?: {_STYLE})*)\]")
+
+# Brackets escaped with rich.markup.escape()
+ESCAPED_PATTERN = re.compile(r"\\(\[[a-z#/@][^[]*?\])")
+
+
+class PlainDisplay:
+    """Handles terminal output as plain text (no Rich dependency)."""
+
+    def __init__(
+        self,
+        theme: str = "monokai",
+        stream: Optional[TextIO] = None,
+        stream_fps: float = 20.0,
+        stream_flush_bytes: int = 512
+    ):
+        """
+        Initialize plain display handler.
+
+        Args:
+            theme: Syntax highlighting theme (unused, kept for API parity)
+            stream: Output stream (default: sys.stdout)
+            stream_fps: Maximum writes per second for streamed responses
+            stream_flush_bytes: Pending characters that force an early write
+        """
+        self.theme = theme
+        self.stream = stream or sys.stdout
+        self.stream_fps = stream_fps
+        self.stream_flush_bytes = stream_flush_bytes
+
+    @staticmethod
+    def strip_markup(text: str) -> str:
+        """
+        Remove Rich style tags from text, as Rich would when rendering it.
+
+        Only known style tags are removed, and escaped brackets are
+        unescaped; any other bracketed text is kept.
+
+        Args:
+            text: Text possibly containing markup
+
+        Returns:
+            Text without markup
+        """
+        return ESCAPED_PATTERN.sub(r"\1", MARKUP_PATTERN.sub("", str(text)))
+
+    def print(self, text: str = "", style: Optional[str] = None, end: str = "\n") -> None:
+        """
+        Print text, ignoring styling.
+
+        Args:
+            text: Text to print
+            style: Rich style string (ignored)
+            end: Line terminator
+        """
+        self.stream.write(self.strip_markup(text) + end)
+
+    def write(self, text: str) -> None:
+        """
+        Write raw text and flush.
+
+        Args:
+            text: Text to write
+        """
+        self.stream.write(text)
+        self.stream.flush()
+
+    def stream_renderer(self) -> StreamRenderer:
+        """
+        Create a frame-rate-limited renderer for a streamed response.
+
+        Returns:
+            StreamRenderer writing to this display
+        """
+        return StreamRenderer(self.write, fps=self.stream_fps, flush_bytes=self.stream_flush_bytes)
+
+    def print_stream(self, chunks: Iterable[str]) -> str:
+        """
+        Print a streamed response as it arrives.
+
+        Args:
+            chunks: Streamed text chunks
+
+        Returns:
+            The complete response
+        """
+        text = self.stream_renderer().render(chunks)
+        self.stream.write("\n")
+        return text
+
+    def print_markdown(self, text: str) -> None:
+        """
+        Print markdown source as-is (it is not console markup).
+
+        Args:
+            text: Markdown text
+        """
+        self.stream.write(text + "\n")
+
+    def print_code(self, code: str, language: str = "python") -> None:
+        """
+        Print code without highlighting.
+
+        Args:
+            code: Code to print
+            language: Programming language (ignored)
+        """
+        self.stream.write(code + "\n")
+
+    def print_panel(
+        self,
+        text: str,
+        title: Optional[str] = None,
+        style: str = "cyan"
+    ) -> None:
+        """
+        Print text under an optional title.
+
+        Args:
+            text: Text to display
+            title: Optional panel title
+            style: Panel style (ignored)
+        """
+        if title:
+            self.rule(title)
+        self.print(text)
+
+    def print_table(self, headers: list, rows: list) -> None:
+        """
+        Print rows as aligned columns.
+
+        Args:
+            headers: List of column headers
+            rows: List of row data
+        """
+        cells = [[str(h) for h in headers]] + [[str(c) for c in row] for row in rows]
+        widths = [max(len(row[i]) for row in cells) for i in range(len(headers))]
+        for row in cells:
+            self.print("  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip())
+
+    def print_error(self, message: str) -> None:
+        """
+        Print an error message.
+
+        Args:
+            message: Error message
+        """
+        self.print(f"✗ Error: {message}")
+
+    def print_success(self, message: str) -> None:
+        """
+        Print a success message.
+
+        Args:
+            message: Success message
+        """
+        self.print(f"✓ Success: {message}")
+
+    def print_warning(self, message: str) -> None:
+        """
+        Print a warning message.
+
+        Args:
+            message: Warning message
+        """
+        self.print(f"⚠ Warning: {message}")
+
+    def print_info(self, message: str) -> None:
+        """
+        Print an info message.
+
+        Args:
+            message: Info message
+        """
+        self.print(f"ℹ Info: {message}")
+
+    def clear(self) -> None:
+        """Clearing is a no-op for plain output."""
+
+    def rule(self, title: Optional[str] = None, style: str = "dim") -> None:
+        """
+        Print a horizontal rule.
+
+        Args:
+            title: Optional title for the rule
+            style: Rule style (ignored)
+        """
+        self.print(f"── {title} ──" if title else "─" * 40)
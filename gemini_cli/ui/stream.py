@@ -0,0 +1,115 @@
+"""
+Frame-rate-limited rendering of streamed responses.
+Coalesces chunks from the client and writes them to the terminal at most
+`fps` times per second (or once `flush_bytes` have accumulated), so slow
+terminals and SSH sessions don't fall behind the network. All writes
+happen on the caller's thread: a frame is written by the first chunk that
+arrives once it is due, or by close().
+"""
+
+import threading
+import time
+from typing import Callable, Iterable, List
+
+from gemini_cli.core.metrics import current_request
+
+
+class StreamRenderer:
+    """Buffers streamed chunks and flushes them in frames."""
+
+    def __init__(
+        self,
+        write: Callable[[str], None],
+        fps: float = 20.0,
+        flush_bytes: int = 512,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize stream renderer.
+
+        Args:
+            write: Writes raw text to the terminal (e.g. Display.write)
+            fps: Maximum flushes per second (0 = flush every chunk)
+            flush_bytes: Flush early once this many characters are pending
+            clock: Time source (for tests)
+        """
+        self._write = write
+        self.interval = 1.0 / fps if fps > 0 else 0.0
+        self.flush_bytes = flush_bytes
+        self._clock = clock
+        self._parts: List[str] = []
+        self._pending: List[str] = []
+        self._pending_size = 0
+        self._last_flush = 0.0
+        self._lock = threading.Lock()
+        self.flushes = 0
+        # Time spent writing, reported as the request's "render" span
+        self.render_time = 0.0
+        self._record = current_request()
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far."""
+        return "".join(self._parts)
+
+    def feed(self, chunk: str) -> None:
+        """
+        Add a chunk, flushing if a frame is due.
+
+        Args:
+            chunk: Streamed text
+        """
+        if not chunk:
+            return
+        with self._lock:
+            self._parts.append(chunk)
+            self._pending.append(chunk)
+            self._pending_size += len(chunk)
+            due = self._clock() >= self._last_flush + self.interval
+            if due or self._pending_size >= self.flush_bytes:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        """Write pending chunks now."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if self._pending:
+            started = time.perf_counter()
+            self._write("".join(self._pending))
+            self.render_time += time.perf_counter() - started
+            self._pending = []
+            self._pending_size = 0
+            self.flushes += 1
+        self._last_flush = self._clock()
+
+    def close(self) -> str:
+        """
+        Flush remaining output.
+
+        Returns:
+            The complete text
+        """
+        self.flush()
+        if self._record is not None:
+            self._record.add_time("render", self.render_time)
+            self._record = None
+        return self.text
+
+    def render(self, chunks: Iterable[str]) -> str:
+        """
+        Render a whole stream.
+
+        Args:
+            chunks: Streamed text chunks
+
+        Returns:
+            The complete text
+        """
+        try:
+            for chunk in chunks:
+                self.feed(chunk)
+        finally:
+            self.close()
+        return self.text
@@ -0,0 +1,172 @@
+"""
+Background autosave for conversation history.
+A writer thread takes save requests from a queue, coalesces the ones that
+arrive within a debounce window into a single save, and reports queue
+depth and write latency; the chat loop never waits for disk I/O.
+"""
+
+import queue
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+# Seconds to wait for more save requests before writing
+DEBOUNCE = 1.0
+
+# Queue items besides save requests (which are sequence numbers)
+_FLUSH = "flush"
+_STOP = "stop"
+
+
+class AutoSaver:
+    """Debounced background writer around a save function."""
+
+    def __init__(
+        self,
+        save: Callable[[], bool],
+        debounce: float = DEBOUNCE,
+        on_write: Optional[Callable[[float, bool], None]] = None
+    ):
+        """
+        Start the writer thread.
+
+        Args:
+            save: Persists everything not yet saved; returns False on failure
+                (e.g. ConversationMemory.save)
+            debounce: Seconds to collect further requests into one save
+            on_write: Called after each save with its duration in seconds
+                and whether it succeeded (on the writer thread)
+        """
+        self._save = save
+        self.debounce = debounce
+        self.on_write = on_write
+        self._queue: "queue.Queue" = queue.Queue()
+        self._changed = threading.Condition()
+        self._requested = 0  # sequence number of the last request
+        self._written = 0  # last request covered by a finished save
+        self._last_ok = True
+        self._closed = False
+        self._stats = {"requests": 0, "saves": 0, "coalesced": 0, "errors": 0}
+        self._latency = {"last": 0.0, "total": 0.0, "max": 0.0}
+        self._thread = threading.Thread(target=self._run, name="history-autosave", daemon=True)
+        self._thread.start()
+
+    def request(self) -> None:
+        """Ask for a save soon (returns immediately)."""
+        with self._changed:
+            if self._closed:
+                return
+            self._requested += 1
+            self._stats["requests"] += 1
+            # Queued under the lock so a later flush is queued behind it
+            self._queue.put(self._requested)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Save now and wait for every earlier request to be written.
+
+        Args:
+            timeout: Maximum seconds to wait (None = no limit)
+
+        Returns:
+            True if everything requested was saved successfully in time
+        """
+        with self._changed:
+            target = self._requested
+            if self._written >= target:
+                return self._last_ok
+            if not self._thread.is_alive():
+                return False
+            self._queue.put(_FLUSH)
+            done = self._changed.wait_for(lambda: self._written >= target, timeout)
+            return done and self._last_ok
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """
+        Write outstanding requests and stop the writer thread.
+
+        Args:
+            timeout: Maximum seconds to wait for the final save
+
+        Returns:
+            True if the final save succeeded in time
+        """
+        with self._changed:
+            if self._closed:
+                return self._last_ok
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join(timeout)
+        return not self._thread.is_alive() and self._last_ok
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get writer metrics.
+
+        Returns:
+            requests, saves, coalesced (requests merged into another save),
+            errors, queue_depth (requests not yet written) and the last,
+            average and maximum write latency in milliseconds
+        """
+        with self._changed:
+            saves = self._stats["saves"]
+            return {
+                **self._stats,
+                "queue_depth": self._requested - self._written,
+                "last_write_ms": self._latency["last"] * 1000,
+                "avg_write_ms": self._latency["total"] / saves * 1000 if saves else 0.0,
+                "max_write_ms": self._latency["max"] * 1000,
+            }
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            stopping = item == _STOP
+            if item not in (_FLUSH, _STOP):
+                # Collect requests until the window closes or a flush arrives
+                deadline = time.monotonic() + self.debounce
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                    if item in (_FLUSH, _STOP):
+                        stopping = item == _STOP
+                        break
+            # Requests queued meanwhile are covered by this save as well
+            while True:
+                try:
+                    stopping = self._queue.get_nowait() == _STOP or stopping
+                except queue.Empty:
+                    break
+            self._write()
+
+    def _write(self) -> None:
+        # Every request made before the save starts is covered by it
+        with self._changed:
+            target = self._requested
+        started = time.perf_counter()
+        try:
+            ok = bool(self._save())
+        except Exception:
+            ok = False
+        elapsed = time.perf_counter() - started
+
+        with self._changed:
+            covered = target - self._written
+            self._written = target
+            self._last_ok = ok
+            self._stats["saves"] += 1
+            self._stats["coalesced"] += max(covered - 1, 0)
+            if not ok:
+                self._stats["errors"] += 1
+            self._latency["last"] = elapsed
+            self._latency["total"] += elapsed
+            self._latency["max"] = max(self._latency["max"], elapsed)
+            self._changed.notify_all()
+        if self.on_write is not None:
+            self.on_write(elapsed, ok)
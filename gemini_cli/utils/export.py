@@ -0,0 +1,263 @@
+"""
+Streaming conversation export.
+Writes stored messages to Markdown, JSONL, HTML or CSV one message at a
+time through a buffered (optionally gzip- or zstd-compressed) stream, so
+exporting millions of messages takes constant memory.
+"""
+
+import csv
+import gzip
+import html
+import io
+import json
+import sys
+import time
+from contextlib import ExitStack
+from datetime import datetime
+from importlib import import_module
+from importlib.util import find_spec
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, Optional
+
+from gemini_cli.core.metrics import parse_window
+from gemini_cli.utils.messages import parse_timestamp
+
+FORMATS = ("md", "jsonl", "html", "csv")
+COMPRESSIONS = ("gzip", "zstd")
+
+# File suffixes that select a format or compression
+SUFFIX_FORMATS = {".md": "md", ".markdown": "md", ".jsonl": "jsonl", ".html": "html", ".htm": "html", ".csv": "csv"}
+SUFFIX_COMPRESSIONS = {".gz": "gzip", ".zst": "zstd", ".zstd": "zstd"}
+
+# Bytes collected before each write to the file
+BUFFER_SIZE = 256 * 1024
+
+CSV_FIELDS = ["session", "timestamp", "role", "content", "tokens"]
+
+HTML_HEAD = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>Gemini Conversation History</title>
+<style>
+body { font-family: sans-serif; max-width: 50em; margin: auto; padding: 1em; }
+section { border-left: 4px solid #0a7; margin: 1em 0; padding: 0 1em; }
+section.model { border-color: #07a; }
+h2 { font-size: 1em; margin-bottom: 0; }
+time, .session { color: #777; font-weight: normal; }
+pre { white-space: pre-wrap; font-family: inherit; }
+</style>
+</head>
+<body>
+<h1>Gemini Conversation History</h1>
+"""
+
+
+def detect_format(path: Optional[Path]) -> str:
+    """Format implied by a file name (Markdown if there is no known suffix)."""
+    suffixes = [s.lower() for s in Path(path).suffixes] if path else []
+    if suffixes and suffixes[-1] in SUFFIX_COMPRESSIONS:
+        suffixes.pop()
+    return SUFFIX_FORMATS.get(suffixes[-1], "md") if suffixes else "md"
+
+
+def detect_compression(path: Optional[Path]) -> Optional[str]:
+    """Compression implied by a file name (.gz or .zst), if any."""
+    return SUFFIX_COMPRESSIONS.get(Path(path).suffix.lower()) if path else None
+
+
+def parse_time(value: str) -> float:
+    """
+    Parse a --since/--until value.
+
+    Args:
+        value: ISO date or date-time ("2024-05-01", "2024-05-01T18:30"),
+            or a window back from now ("30m", "24h", "7d")
+
+    Returns:
+        Epoch seconds
+
+    Raises:
+        ValueError: If the value is neither
+    """
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        pass
+    try:
+        return time.time() - parse_window(value)
+    except ValueError:
+        raise ValueError(f"Invalid time: {value} (use e.g. 2024-05-01, 2024-05-01T18:30 or 7d)") from None
+
+
+def filter_messages(
+    messages: Iterable[Dict],
+    since: Optional[float] = None,
+    until: Optional[float] = None
+) -> Iterator[Dict]:
+    """
+    Keep messages whose timestamp falls in [since, until).
+
+    Args:
+        messages: Stored messages
+        since: Epoch seconds (None = no lower bound)
+        until: Epoch seconds (None = no upper bound)
+
+    Yields:
+        Matching messages
+    """
+    if since is None and until is None:
+        yield from messages
+        return
+    for message in messages:
+        ts = parse_timestamp(message.get("timestamp"))
+        if (since is None or ts >= since) and (until is None or ts < until):
+            yield message
+
+
+def _markdown(messages: Iterable[Dict]) -> Iterator[str]:
+    yield "# Gemini Conversation History\n\n"
+    session = None
+    for message in messages:
+        if message.get("session") and message["session"] != session:
+            session = message["session"]
+            yield f"# Session: {session}\n\n"
+        timestamp = message.get("timestamp", "")
+        heading = f"## {message['role'].upper()}" + (f" ({timestamp})" if timestamp else "")
+        # One string per message keeps the number of writes down
+        yield f"{heading}\n\n{message['content']}\n\n---\n\n"
+
+
+def _jsonl(messages: Iterable[Dict]) -> Iterator[str]:
+    for message in messages:
+        yield json.dumps(dict(message), ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def _html(messages: Iterable[Dict]) -> Iterator[str]:
+    yield HTML_HEAD
+    escape = html.escape
+    for message in messages:
+        role = message["role"]
+        session = message.get("session")
+        timestamp = message.get("timestamp", "")
+        yield (
+            f'<section class="{escape(role)}"><h2>{"You" if role == "user" else "Gemini"}'
+            + (f' <span class="session">[{escape(session)}]</span>' if session else "")
+            + (f' <time datetime="{escape(timestamp)}">{escape(timestamp)}</time>' if timestamp else "")
+            + f"</h2>\n<pre>{escape(message['content'])}</pre></section>\n"
+        )
+    yield "</body>\n</html>\n"
+
+
+def _csv(messages: Iterable[Dict]) -> Iterator[str]:
+    line = io.StringIO()
+    writer = csv.writer(line)
+    writer.writerow(CSV_FIELDS)
+    for message in messages:
+        writer.writerow(["" if message.get(field) is None else message[field] for field in CSV_FIELDS])
+        yield line.getvalue()
+        line.seek(0)
+        line.truncate()
+    yield line.getvalue()
+
+
+WRITERS = {"md": _markdown, "jsonl": _jsonl, "html": _html, "csv": _csv}
+
+
+def _stdlib_zstd() -> bool:
+    """Whether Python ships compression.zstd (3.14+)."""
+    return find_spec("compression") is not None and find_spec("compression.zstd") is not None
+
+
+def zstd_available() -> bool:
+    """Whether zstd exports are possible."""
+    return _stdlib_zstd() or find_spec("zstandard") is not None
+
+
+def _compressor(compression: str) -> Callable[[BinaryIO], BinaryIO]:
+    """
+    Get a function wrapping a binary file in a compressing stream.
+
+    Zstandard comes from Python 3.14's compression.zstd or the optional
+    zstandard package.
+
+    Raises:
+        RuntimeError: If zstd is requested but unavailable
+    """
+    if compression == "gzip":
+        return lambda raw: gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6)
+    if _stdlib_zstd():
+        zstd_file = import_module("compression.zstd").ZstdFile
+        return lambda raw: zstd_file(raw, "wb")
+    if find_spec("zstandard") is None:
+        raise RuntimeError(
+            "Missing dependency: zstandard. Install it with `pip install zstandard`, "
+            "or use gzip (.gz) instead."
+        )
+    compressor = import_module("zstandard").ZstdCompressor()
+    return lambda raw: compressor.stream_writer(raw, closefd=False)
+
+
+def export_messages(
+    messages: Iterable[Dict],
+    output: Optional[Path] = None,
+    fmt: str = "md",
+    compression: Optional[str] = None
+) -> int:
+    """
+    Stream messages to a file.
+
+    Args:
+        messages: Messages (role, content, timestamp, and optionally tokens
+            and session), e.g. ConversationMemory.stored_messages()
+        output: Output file (None = stdout)
+        fmt: "md", "jsonl", "html" or "csv"
+        compression: None, "gzip" or "zstd"
+
+    Returns:
+        Number of messages written
+
+    Raises:
+        ValueError: For an unknown format or compression
+        RuntimeError: If zstd is requested but unavailable
+        OSError: If the file cannot be written
+    """
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown export format: {fmt}. Available: {', '.join(FORMATS)}")
+    if compression is not None and compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression: {compression}. Available: {', '.join(COMPRESSIONS)}")
+    compress = _compressor(compression) if compression else None
+
+    count = 0
+
+    def counted():
+        nonlocal count
+        for message in messages:
+            count += 1
+            yield message
+
+    with ExitStack() as stack:
+        if output is None:
+            sys.stdout.flush()
+            binary = sys.stdout.buffer
+        else:
+            binary = stack.enter_context(open(output, "wb", buffering=BUFFER_SIZE))
+        buffered = None
+        if compress is not None:
+            # Closed (finishing the compressed stream) before the file is
+            compressor = stack.enter_context(compress(binary))
+            # The compressor gets large blocks instead of every small write
+            buffered = io.BufferedWriter(compressor, buffer_size=BUFFER_SIZE)
+        text = io.TextIOWrapper(buffered or binary, encoding="utf-8", newline="")
+        try:
+            for chunk in WRITERS[fmt](counted()):
+                text.write(chunk)
+            text.flush()
+        finally:
+            # Leave the underlying streams to the exit stack (and stdout open)
+            text.detach()
+            if buffered is not None:
+                buffered.flush()
+                buffered.detach()
+    return count
@@ -0,0 +1,240 @@
+"""
+SQLite conversation store.
+Keeps every message in a WAL-mode database indexed by session and time,
+with an FTS5 full-text index so history can be searched without loading
+it into memory.
+"""
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from gemini_cli.utils.history_log import make_snippet, search_terms
+from gemini_cli.utils.sessions import DEFAULT_SESSION
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    session TEXT NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    tokens INTEGER
+);
+CREATE INDEX IF NOT EXISTS messages_session_time ON messages (session, timestamp);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    content, content='messages', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts (rowid, content) VALUES (new.id, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, content) VALUES ('delete', old.id, old.content);
+END;
+"""
+
+
+class HistoryDB:
+    """Message store with the same interface as HistoryLog, plus indexed search."""
+
+    def __init__(self, path: Path, session: str = DEFAULT_SESSION):
+        """
+        Open (or create) the database.
+
+        Args:
+            path: SQLite file
+            session: Session that tail() and clear() apply to
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.session = session
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # With WAL, NORMAL syncs at checkpoints rather than on every commit
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        try:
+            self._db.executescript(FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5: fall back to LIKE scans
+            self.fts = False
+
+    def append(self, messages: Iterable[Dict]) -> int:
+        """
+        Insert messages into the current session.
+
+        Args:
+            messages: Messages (role, content, timestamp, tokens; a
+                "session" key overrides the current session)
+
+        Returns:
+            Number of messages written
+        """
+        rows = (
+            (
+                message.get("session") or self.session,
+                message.get("role", ""),
+                str(message.get("content", "")),
+                message.get("timestamp", ""),
+                message.get("tokens"),
+            )
+            for message in messages
+        )
+        with self._lock, self._db:
+            cursor = self._db.executemany(
+                "INSERT INTO messages (session, role, content, timestamp, tokens) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+        return cursor.rowcount
+
+    def tail(self, count: int) -> List[Dict]:
+        """
+        Get the newest messages of the current session.
+
+        Args:
+            count: Maximum number of messages
+
+        Returns:
+            Messages, oldest first
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT role, content, timestamp, tokens FROM messages WHERE session = ? "
+                "ORDER BY timestamp DESC, id DESC LIMIT ?",
+                (self.session, count),
+            ).fetchall()
+        return [self._message(row) for row in reversed(rows)]
+
+    def messages(self, session: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Iterate over stored messages, oldest first, without loading them all.
+
+        Args:
+            session: Only this session (None = every session)
+
+        Yields:
+            Messages with their session
+        """
+        query = "SELECT role, content, timestamp, tokens, session FROM messages"
+        params = ()
+        if session is not None:
+            query += " WHERE session = ?"
+            params = (session,)
+        # Stream from a read-only connection of its own: the shared one may be
+        # writing from another thread (e.g. the autosaver) between rows
+        reader = sqlite3.connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True)
+        try:
+            for row in reader.execute(query + " ORDER BY id", params):
+                message = self._message(row)
+                message["session"] = row[4]
+                yield message
+        finally:
+            reader.close()
+
+    def search(self, query: str, limit: int = 20, session: Optional[str] = None) -> List[Dict]:
+        """
+        Full-text search over message content.
+
+        Args:
+            query: Search terms (all must match; punctuation is ignored)
+            limit: Maximum results
+            session: Only this session (None = every session)
+
+        Returns:
+            Results (session, role, timestamp, snippet, score), best first
+        """
+        terms = search_terms(query)
+        if not terms:
+            return []
+        where = ""
+        params: list = []
+        if session is not None:
+            where = " AND m.session = ?"
+            params.append(session)
+
+        with self._lock:
+            if self.fts:
+                match = " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+                rows = self._db.execute(
+                    "SELECT m.session, m.role, m.timestamp, "
+                    "snippet(messages_fts, 0, '**', '**', '…', 16), bm25(messages_fts) "
+                    "FROM messages_fts JOIN messages m ON m.id = messages_fts.rowid "
+                    f"WHERE messages_fts MATCH ?{where} ORDER BY bm25(messages_fts) LIMIT ?",
+                    [match, *params, limit],
+                ).fetchall()
+                return [
+                    {
+                        "session": session_name,
+                        "role": role,
+                        "timestamp": timestamp,
+                        "snippet": " ".join(snippet.split()),
+                        # bm25() is lower for better matches
+                        "score": -score,
+                    }
+                    for session_name, role, timestamp, snippet, score in rows
+                ]
+
+            likes = " AND ".join("m.content LIKE ?" for _ in terms)
+            rows = self._db.execute(
+                f"SELECT m.session, m.role, m.timestamp, m.content FROM messages m "
+                f"WHERE {likes}{where} ORDER BY m.id DESC LIMIT ?",
+                [*(f"%{term}%" for term in terms), *params, limit],
+            ).fetchall()
+        return [
+            {
+                "session": session_name,
+                "role": role,
+                "timestamp": timestamp,
+                "snippet": make_snippet(content, terms),
+                "score": 0.0,
+            }
+            for session_name, role, timestamp, content in rows
+        ]
+
+    def count(self, session: Optional[str] = None) -> int:
+        """Number of stored messages (in one session, or all)."""
+        with self._lock:
+            if session is None:
+                return self._db.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+            return self._db.execute(
+                "SELECT COUNT(*) FROM messages WHERE session = ?", (session,)
+            ).fetchone()[0]
+
+    def clear(self) -> None:
+        """Delete the current session's messages."""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM messages WHERE session = ?", (self.session,))
+
+    def needs_compaction(self, keep: int) -> bool:
+        """The database keeps every message; only the loaded tail is bounded."""
+        return False
+
+    def compact(self, keep: int) -> int:
+        """Nothing to compact (see needs_compaction)."""
+        return 0
+
+    def sync(self) -> None:
+        """Commits are already durable up to the WAL checkpoint."""
+
+    def close(self) -> None:
+        """Checkpoint the WAL and close the connection."""
+        with self._lock:
+            try:
+                self._db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            except sqlite3.Error:
+                pass
+            self._db.close()
+
+    @staticmethod
+    def _message(row) -> Dict:
+        role, content, timestamp, tokens = row[:4]
+        message = {"role": role, "content": content, "timestamp": timestamp}
+        if tokens is not None:
+            message["tokens"] = tokens
+        return message
@@ -0,0 +1,352 @@
+"""
+Append-only JSONL conversation log.
+One message per line: a turn costs one small append instead of rewriting
+the whole history, fsyncs are batched, and the file is trimmed to the
+newest messages by an occasional compaction.
+"""
+
+import heapq
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+# Appended messages between fsyncs
+FSYNC_BATCH = 16
+
+# Bytes read per step when scanning the file backwards
+TAIL_BLOCK = 64 * 1024
+
+# Characters of context around the first match in a search snippet
+SNIPPET_CONTEXT = 60
+
+
+def search_terms(query: str) -> List[str]:
+    """Split a search query into lowercase terms."""
+    return [term for term in re.findall(r"\w+", query.lower()) if term]
+
+
+def make_snippet(text: str, terms: Sequence[str], highlight: Tuple[str, str] = ("**", "**")) -> str:
+    """
+    Cut a window of text around the first matching term and mark the matches.
+
+    Args:
+        text: Message content
+        terms: Lowercase search terms
+        highlight: Strings placed before and after each match
+
+    Returns:
+        One-line snippet
+    """
+    lowered = text.lower()
+    hits = [i for i in (lowered.find(term) for term in terms) if i >= 0]
+    first = min(hits) if hits else 0
+    start = max(0, first - SNIPPET_CONTEXT)
+    end = min(len(text), first + 2 * SNIPPET_CONTEXT)
+    window = " ".join(text[start:end].split())
+    if terms:
+        pattern = re.compile("|".join(re.escape(term) for term in terms), re.IGNORECASE)
+        window = pattern.sub(lambda m: f"{highlight[0]}{m.group(0)}{highlight[1]}", window)
+    return ("…" if start else "") + window + ("…" if end < len(text) else "")
+
+
+class HistoryLog:
+    """JSONL message log shared safely by concurrent processes."""
+
+    def __init__(self, path: Path, fsync_batch: int = FSYNC_BATCH):
+        """
+        Initialize history log.
+
+        Args:
+            path: JSONL file (created on first append)
+            fsync_batch: Appended messages between fsyncs (1 = every message)
+        """
+        self.path = Path(path)
+        self.lock_path = self.path.with_name(self.path.name + ".lock")
+        self.fsync_batch = max(1, fsync_batch)
+        # Lines in the file, when known (None until a full scan or compaction)
+        self.lines: Optional[int] = None if self.path.exists() else 0
+        self._file = None
+        self._inode = None
+        self._unsynced = 0
+        self._mutex = threading.Lock()
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold the in-process mutex and the cross-process file lock."""
+        with self._mutex:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.lock_path, "a") as lock:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _handle(self):
+        """Append handle, reopened if another process compacted the file."""
+        try:
+            inode = os.stat(self.path).st_ino
+        except FileNotFoundError:
+            inode = None
+        if self._file is None or inode != self._inode:
+            self._close_file()
+            self._file = open(self.path, "ab")
+            self._inode = os.fstat(self._file.fileno()).st_ino
+            if self._file.tell() and not self._ends_with_newline():
+                # Terminate a line cut off by a crash so it can't swallow the next one
+                self._file.write(b"\n")
+        return self._file
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            if self._unsynced:
+                self._fsync()
+            self._file.close()
+            self._file = None
+
+    def _fsync(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def append(self, messages: Iterable[Dict]) -> int:
+        """
+        Append messages, one JSON line each.
+
+        Lines reach the OS immediately; they are fsynced once `fsync_batch`
+        messages have accumulated (or on sync()/close()).
+
+        Args:
+            messages: Messages to append
+
+        Returns:
+            Number of messages written
+        """
+        data = b"".join(
+            json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+            for message in messages
+        )
+        if not data:
+            return 0
+        count = data.count(b"\n")
+        with self._locked():
+            f = self._handle()
+            f.write(data)
+            f.flush()
+            self._unsynced += count
+            if self._unsynced >= self.fsync_batch:
+                self._fsync()
+            if self.lines is not None:
+                self.lines += count
+        return count
+
+    def sync(self) -> None:
+        """Fsync appended messages that are not on disk yet."""
+        with self._mutex:
+            if self._file is not None and self._unsynced:
+                self._fsync()
+
+    def close(self) -> None:
+        """Fsync and close the append handle."""
+        with self._mutex:
+            self._close_file()
+
+    def clear(self) -> None:
+        """Delete every message."""
+        with self._locked():
+            self._close_file()
+            with open(self.path, "wb") as f:
+                os.fsync(f.fileno())
+            self.lines = 0
+
+    def needs_compaction(self, keep: int) -> bool:
+        """Whether the file has grown past twice `keep` messages (or is unscanned)."""
+        return self.lines is None or self.lines > 2 * keep
+
+    def messages(self) -> Iterator[Dict]:
+        """
+        Iterate over every message in the file, oldest first.
+
+        Reads one line at a time, so memory use does not grow with the file.
+
+        Yields:
+            Messages (corrupt lines are skipped)
+        """
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(message, dict):
+                    yield message
+
+    def search(self, query: str, limit: int = 20) -> List[Dict]:
+        """
+        Find messages containing all query terms by scanning the file.
+
+        Args:
+            query: Search terms
+            limit: Maximum results
+
+        Returns:
+            Results (role, timestamp, snippet, score), best first; the
+            score is the number of term occurrences, newer messages win ties
+        """
+        terms = search_terms(query)
+        if not terms:
+            return []
+        best = []
+        for position, message in enumerate(self.messages()):
+            content = str(message.get("content", ""))
+            lowered = content.lower()
+            counts = [lowered.count(term) for term in terms]
+            if not all(counts):
+                continue
+            # Positions are unique, so entries never compare past them
+            entry = (sum(counts), position, content, message)
+            if len(best) < limit:
+                heapq.heappush(best, entry)
+            elif entry[:2] > best[0][:2]:
+                heapq.heapreplace(best, entry)
+        return [
+            {
+                "session": message.get("session", ""),
+                "role": message.get("role", ""),
+                "timestamp": message.get("timestamp", ""),
+                "snippet": make_snippet(content, terms),
+                "score": float(score),
+            }
+            for score, _, content, message in sorted(best, reverse=True)
+        ]
+
+    def tail(self, count: int) -> List[Dict]:
+        """
+        Read the newest messages without reading the whole file.
+
+        The file is scanned backwards in blocks until `count` complete
+        lines are found. Blank or corrupt lines (e.g. a write cut off by
+        a crash) are skipped.
+
+        Args:
+            count: Maximum number of messages
+
+        Returns:
+            Messages, oldest first
+        """
+        data, lines, complete = self._tail_bytes(count)
+        if complete:
+            self.lines = lines
+        if not data:
+            return []
+        try:
+            # One parse for the whole tail is several times faster than one per line
+            messages = json.loads("[" + data.decode("utf-8").rstrip("\n").replace("\n", ",") + "]")
+        except ValueError:
+            pass
+        else:
+            if all(isinstance(message, dict) for message in messages):
+                return messages
+        messages = []
+        for line in data.split(b"\n"):
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(message, dict):
+                messages.append(message)
+        return messages
+
+    def _tail_bytes(self, count: int) -> Tuple[bytes, int, bool]:
+        """
+        Get the last `count` lines as raw bytes.
+
+        Returns:
+            (data, lines, complete): the lines, how many there are, and
+            whether they are the whole file
+        """
+        if count <= 0:
+            return b"", 0, False
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return b"", 0, True
+        with f:
+            position = f.seek(0, os.SEEK_END)
+            blocks = []
+            newlines = 0
+            block = TAIL_BLOCK
+            while position > 0:
+                step = min(block, position)
+                position -= step
+                f.seek(position)
+                blocks.append(f.read(step))
+                newlines += blocks[-1].count(b"\n")
+                # One extra line: the first may be cut off at the block edge
+                if newlines > count:
+                    break
+                # Few seeks for a long tail, little over-read for a short one
+                block *= 2
+        data = blocks[0] if len(blocks) == 1 else b"".join(reversed(blocks))
+        if position > 0:
+            data = data[data.index(b"\n") + 1:]
+        lines = data.count(b"\n") + (not data.endswith(b"\n") and bool(data))
+        if lines <= count:
+            return data, lines, position == 0
+        start = len(data)
+        if data.endswith(b"\n"):
+            start -= 1
+        for _ in range(count):
+            start = data.rindex(b"\n", 0, start)
+        return data[start + 1:], count, False
+
+    def compact(self, keep: int) -> int:
+        """
+        Rewrite the file with only the newest `keep` messages.
+
+        The new file is written next to the old one and swapped in
+        atomically, so a crash leaves one or the other intact.
+
+        Args:
+            keep: Messages to keep
+
+        Returns:
+            Bytes reclaimed
+        """
+        with self._locked():
+            data, lines, complete = self._tail_bytes(keep)
+            if complete:
+                self.lines = lines
+                return 0
+            if data and not data.endswith(b"\n"):
+                data += b"\n"
+            temp = self.path.with_name(self.path.name + ".tmp")
+            with open(temp, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            before = self.path.stat().st_size
+            os.replace(temp, self.path)
+            self._close_file()
+            self.lines = lines
+            return max(0, before - len(data))
@@ -0,0 +1,70 @@
+"""
+Cross-process file locking helpers.
+Used for small JSON state files shared by concurrent gemini-termux processes.
+"""
+
+import json
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+
+@contextmanager
+def locked_json(path: Path) -> Iterator[Dict[str, Any]]:
+    """
+    Read-modify-write a JSON object under an exclusive lock.
+
+    The yielded dict is written back when the block exits without error.
+    An unreadable or corrupt file starts out as an empty dict.
+
+    Args:
+        path: JSON state file (created if missing)
+
+    Yields:
+        Mutable state dict
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a+", encoding="utf-8") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            f.seek(0)
+            try:
+                state = json.loads(f.read() or "{}")
+            except ValueError:
+                state = {}
+            if not isinstance(state, dict):
+                state = {}
+
+            yield state
+
+            f.seek(0)
+            f.truncate()
+            json.dump(state, f, ensure_ascii=False)
+            f.flush()
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def read_json(path: Path) -> Dict[str, Any]:
+    """
+    Read a JSON state file without locking.
+
+    Args:
+        path: JSON state file
+
+    Returns:
+        State dict (empty if missing or corrupt)
+    """
+    try:
+        state = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return state if isinstance(state, dict) else {}
@@ -4,34 +4,158 @@ Handles saving and loading chat sessions.
 """
 
 import json
+import threading
+import time
+from collections import deque
 from pathlib import Path
-from typing import List, Dict, Optional
-from datetime import datetime
+from typing import TYPE_CHECKING, Callable, Iterator, List, Dict, Optional, Sequence, Tuple
+
+from gemini_cli.core.tokens import estimate_tokens
+from gemini_cli.utils.history_log import FSYNC_BATCH, HistoryLog
+from gemini_cli.utils.messages import Message, MessageBuffer, parse_timestamp
+from gemini_cli.utils.sessions import DEFAULT_SESSION, SessionIndex, validate_session_name
+from gemini_cli.utils.summary import Summary
+
+if TYPE_CHECKING:
+    from gemini_cli.utils.summary import Summarizer
+
+
+# Storage backends for conversation history
+BACKENDS = ["jsonl", "sqlite"]
+
+
+# Attempts to shrink the context when the API count exceeds the budget
+EXACT_COUNT_ATTEMPTS = 3
+
+# Marks a clear() among pending messages (applied in order by save())
+CLEAR = object()
 
 
 class ConversationMemory:
     """Manages conversation history storage and retrieval."""
     
-    def __init__(self, data_dir: Optional[Path] = None, max_entries: int = 1000):
+    def __init__(
+        self,
+        data_dir: Optional[Path] = None,
+        max_entries: int = 1000,
+        fsync_batch: int = FSYNC_BATCH,
+        backend: str = "jsonl",
+        session: str = DEFAULT_SESSION
+    ):
         """
         Initialize conversation memory.
         
         Args:
             data_dir: Directory for storing history
-            max_entries: Maximum number of messages to keep
+            max_entries: Maximum number of messages to keep (in memory;
+                also on disk for the "jsonl" backend)
+            fsync_batch: Saved messages between fsyncs of the history log
+            backend: "jsonl" (append-only log) or "sqlite" (every message
+                kept in a database with full-text search)
+            session: Named conversation to open
+        
+        Raises:
+            ValueError: For an unknown backend or invalid session name
         """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown history backend: {backend}. Available: {BACKENDS}")
         if data_dir is None:
             data_dir = Path.home() / ".local" / "share" / "gemini-cli"
         
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
         
-        self.history_file = self.data_dir / "history.json"
+        self.backend = backend
         self.max_entries = max_entries
-        self.history = []
+        self.fsync_batch = fsync_batch
+        # Loaded messages: a ring of compact records, oldest overwritten first
+        self.history = MessageBuffer(max_entries)
+        self.log = None
+        
+        # Per-session metadata; listing sessions never opens their history
+        self.sessions = SessionIndex(self.data_dir / "sessions.json")
+        
+        # Messages added since the last save (and CLEAR markers); save() may
+        # run on an autosave thread while the chat thread appends
+        self._pending: deque = deque()
+        self._save_lock = threading.RLock()
+        self._compaction: Optional[threading.Thread] = None
+        
+        # Rolling summary of the session's older turns (loaded on first use)
+        self._summary: Optional[Summary] = None
+        # Tokens the summary saved in the last context built
+        self.summary_saved = 0
+        
+        self.session = validate_session_name(session)
+        self._open()
+    
+    def _session_file(self, session: str) -> Path:
+        """JSONL log of a session (the default one keeps the original path)."""
+        if session == DEFAULT_SESSION:
+            return self.data_dir / "history.jsonl"
+        return self.data_dir / "sessions" / f"{session}.jsonl"
+    
+    def _summary_file(self, session: str) -> Path:
+        """Cached rolling summary of a session."""
+        return self.data_dir / "summaries" / f"{session}.json"
+    
+    @property
+    def summary(self) -> Summary:
+        """Rolling summary of the current session's older turns (may be empty)."""
+        if self._summary is None:
+            self._summary = Summary.load(self._summary_file(self.session))
+        return self._summary
+    
+    def _open(self) -> None:
+        """Open the current session's store and load its recent messages."""
+        if self.backend == "sqlite":
+            from gemini_cli.utils.history_db import HistoryDB
+            
+            self.history_file = self.data_dir / "history.db"
+            if self.log is None:
+                created = not self.history_file.exists()
+                self.log = HistoryDB(self.history_file, session=self.session)
+                if created:
+                    self._migrate()
+            self.log.session = self.session
+            stored = self.log.messages(self.session)
+        else:
+            self.history_file = self._session_file(self.session)
+            created = not self.history_file.exists()
+            self.log = HistoryLog(self.history_file, fsync_batch=self.fsync_batch)
+            if created and self.session == DEFAULT_SESSION:
+                self._migrate()
+            stored = self.log.messages()
         
+        self.sessions.ensure(self.session, stored)
         self.load()
     
+    def switch(self, session: str) -> None:
+        """
+        Save the current session and open another (created if new).
+        
+        Only the new session's recent messages are read.
+        
+        Args:
+            session: Session name
+            
+        Raises:
+            ValueError: If the name is invalid
+        """
+        validate_session_name(session)
+        if session == self.session:
+            return
+        with self._save_lock:
+            if self.backend == "sqlite":
+                self.save()
+            else:
+                self.close()
+            self.session = session
+            self.history = MessageBuffer(self.max_entries)
+            self._summary = None
+            self.summary_saved = 0
+            self._open()
+    
     def add_message(self, role: str, content: str, timestamp: Optional[str] = None) -> None:
         """
         Add a message to history.
@@ -41,22 +165,14 @@ class ConversationMemory:
             content: Message content
             timestamp: Optional timestamp (generated if not provided)
         """
-        if timestamp is None:
-            timestamp = datetime.now().isoformat()
-        
-        message = {
-            "role": role,
-            "content": content,
-            "timestamp": timestamp
-        }
+        ts = time.time() if timestamp is None else parse_timestamp(timestamp)
+        message = Message(role, content, ts, estimate_tokens(content))
         
+        # The ring drops the oldest message once max_entries are loaded
         self.history.append(message)
-        
-        # Trim if exceeds max entries
-        if len(self.history) > self.max_entries:
-            self.history = self.history[-self.max_entries:]
+        self._pending.append(message)
     
-    def get_history(self, limit: Optional[int] = None) -> List[Dict[str, str]]:
+    def get_history(self, limit: Optional[int] = None) -> Sequence[Message]:
         """
         Get conversation history.
         
@@ -64,34 +180,72 @@ class ConversationMemory:
             limit: Optional limit on number of messages
             
         Returns:
-            List of messages
+            View of the messages, oldest first (not a copy; it is only
+            valid until the next message is added)
         """
         if limit:
             return self.history[-limit:]
-        return self.history.copy()
+        return self.history[:]
     
     def clear(self) -> None:
-        """Clear all conversation history."""
-        self.history = []
+        """Clear all conversation history (on disk at the next save)."""
+        self.history.clear()
+        self._pending.append(CLEAR)
+        self._summary = Summary()
+        self.summary_saved = 0
+        self._summary_file(self.session).unlink(missing_ok=True)
     
     def save(self) -> bool:
         """
-        Save history to file.
+        Append messages added since the last save to the history log.
+        
+        Only new messages are written, so a save costs the same however
+        long the history is. When the log grows past twice `max_entries`
+        it is compacted on a background thread. Safe to call from another
+        thread while messages are being added.
         
         Returns:
             True if successful, False otherwise
         """
-        try:
-            with open(self.history_file, "w", encoding="utf-8") as f:
-                json.dump(self.history, f, indent=2, ensure_ascii=False)
+        with self._save_lock:
+            # popleft() is atomic, so messages added meanwhile wait for the next save
+            batch: List[Message] = []
+            cleared = False
+            while self._pending:
+                item = self._pending.popleft()
+                if item is CLEAR:
+                    batch = []
+                    cleared = True
+                else:
+                    batch.append(item)
+            try:
+                if cleared:
+                    self.log.clear()
+                    self.sessions.reset(self.session)
+                    cleared = False
+                if batch:
+                    pending = [message.to_dict() for message in batch]
+                    self.log.append(pending)
+                    batch = []
+                    self.sessions.record(self.session, pending)
+            except Exception as e:
+                print(f"Error saving history: {e}")
+                return False
+            finally:
+                # Keep whatever was not written for the next attempt
+                self._pending.extendleft(reversed(batch))
+                if cleared:
+                    self._pending.appendleft(CLEAR)
+            
+            if self.log.needs_compaction(self.max_entries):
+                self._compact_in_background()
             return True
-        except Exception as e:
-            print(f"Error saving history: {e}")
-            return False
     
     def load(self) -> bool:
         """
-        Load history from file.
+        Load the newest `max_entries` messages from the history log.
+        
+        Only the end of the file is read.
         
         Returns:
             True if successful, False otherwise
@@ -100,21 +254,177 @@ class ConversationMemory:
             return False
         
         try:
-            with open(self.history_file, "r", encoding="utf-8") as f:
-                self.history = json.load(f)
-            
-            # Trim if exceeds max entries
-            if len(self.history) > self.max_entries:
-                self.history = self.history[-self.max_entries:]
-            
+            self.history = MessageBuffer(self.max_entries, Message.from_dicts(self.log.tail(self.max_entries)))
+            self._pending.clear()
             return True
         except Exception as e:
             print(f"Error loading history: {e}")
             return False
     
+    def close(self) -> None:
+        """Save, finish any pending compaction and fsync the history log."""
+        with self._save_lock:
+            self.save()
+            if self._compaction is not None:
+                self._compaction.join()
+            if self.log.needs_compaction(self.max_entries):
+                self._compact_log(self.log, self.session)
+            self.log.close()
+    
+    def _compact_in_background(self) -> None:
+        """Trim the log to `max_entries` messages without blocking the caller."""
+        if self._compaction is not None and self._compaction.is_alive():
+            return
+        
+        self._compaction = threading.Thread(
+            target=self._compact_log,
+            args=(self.log, self.session),
+            name="history-compaction",
+            daemon=True
+        )
+        self._compaction.start()
+    
+    def _compact_log(self, log, session: str) -> None:
+        """Trim a session's log and set its index totals to what is left."""
+        try:
+            if log.compact(self.max_entries):
+                self.sessions.recount(session, log.tail(self.max_entries))
+        except OSError as e:
+            print(f"Error compacting history: {e}")
+    
+    def search(self, query: str, limit: int = 20, session: Optional[str] = None) -> List[Dict]:
+        """
+        Search stored history (not just the loaded messages).
+        
+        Args:
+            query: Search terms; messages must contain all of them
+            limit: Maximum results
+            session: Only this session (None = every session)
+            
+        Returns:
+            Results with session, role, timestamp, snippet and score, best first
+        """
+        self.save()
+        if self.backend == "sqlite":
+            return self.log.search(query, limit=limit, session=session)
+        
+        results = []
+        for name in self._session_names(session):
+            for result in HistoryLog(self._session_file(name)).search(query, limit=limit):
+                result["session"] = name
+                results.append(result)
+        results.sort(key=lambda result: result["score"], reverse=True)
+        return results[:limit]
+    
+    def _session_names(self, session: Optional[str] = None) -> List[str]:
+        """The given session, or every indexed session (plus the open one)."""
+        if session:
+            return [session]
+        return sorted({s["name"] for s in self.sessions.list()} | {self.session})
+    
+    def stored_messages(self, session: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Iterate over saved messages (not just the loaded ones), oldest first.
+        
+        Unsaved messages are saved first. Messages are read one at a time,
+        so memory use does not grow with the history.
+        
+        Args:
+            session: Only this session (None = every session, one after
+                another for "jsonl", in insertion order for "sqlite")
+            
+        Returns:
+            Iterator of messages with their session
+        """
+        self.save()
+        if self.backend == "sqlite":
+            return self.log.messages(session)
+        
+        def messages():
+            for name in self._session_names(session):
+                for message in HistoryLog(self._session_file(name)).messages():
+                    message["session"] = name
+                    yield message
+        return messages()
+    
+    def _migrate(self) -> None:
+        """Import history from an older storage format into a new store, once."""
+        jsonl = self.data_dir / "history.jsonl"
+        if self.backend == "sqlite" and jsonl.exists():
+            try:
+                self.log.append(
+                    {**message, "session": DEFAULT_SESSION} for message in HistoryLog(jsonl).messages()
+                )
+                for path in sorted((self.data_dir / "sessions").glob("*.jsonl")):
+                    self.log.append(
+                        {**message, "session": path.stem} for message in HistoryLog(path).messages()
+                    )
+            except Exception as e:
+                print(f"Error importing history: {e}")
+            return
+        
+        legacy = self.data_dir / "history.json"
+        if not legacy.exists():
+            return
+        try:
+            with open(legacy, "r", encoding="utf-8") as f:
+                messages = json.load(f)
+            if isinstance(messages, list):
+                if self.backend == "jsonl":
+                    messages = messages[-self.max_entries:]
+                # It was the one conversation there was: the default session
+                self.log.append(
+                    {**m, "session": DEFAULT_SESSION} if self.backend == "sqlite" else m
+                    for m in messages if isinstance(m, dict)
+                )
+                self.log.sync()
+            legacy.replace(legacy.with_name("history.json.bak"))
+        except (OSError, ValueError) as e:
+            print(f"Error migrating history: {e}")
+    
+    def export(
+        self,
+        output: Optional[Path] = None,
+        fmt: Optional[str] = None,
+        compression: Optional[str] = None,
+        session: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None
+    ) -> int:
+        """
+        Stream saved history to a file, in constant memory.
+        
+        Args:
+            output: Output file (None = stdout)
+            fmt: "md", "jsonl", "html" or "csv" (None = from the file suffix)
+            compression: "gzip" or "zstd" (None = from a .gz/.zst suffix)
+            session: Only this session (None = every session)
+            since: Only messages at or after this epoch time
+            until: Only messages before this epoch time
+            
+        Returns:
+            Number of messages exported
+            
+        Raises:
+            ValueError: For an unknown format or compression
+            RuntimeError: If zstd is requested but unavailable
+            OSError: If the file cannot be written
+        """
+        from gemini_cli.utils.export import (
+            detect_compression, detect_format, export_messages, filter_messages
+        )
+        
+        messages = filter_messages(self.stored_messages(session), since, until)
+        return export_messages(
+            messages,
+            output,
+            fmt=fmt or detect_format(output),
+            compression=compression or detect_compression(output),
+        )
+    
     def export_to_file(self, output_path: Path) -> bool:
         """
-        Export conversation to a text file.
+        Export the current session to a file (format from its suffix).
         
         Args:
             output_path: Path to save conversation
@@ -123,39 +433,162 @@ class ConversationMemory:
             True if successful, False otherwise
         """
         try:
-            with open(output_path, "w", encoding="utf-8") as f:
-                f.write("# Gemini Conversation History\n\n")
-                
-                for msg in self.history:
-                    timestamp = msg.get("timestamp", "")
-                    role = msg["role"].upper()
-                    content = msg["content"]
-                    
-                    f.write(f"## {role}")
-                    if timestamp:
-                        f.write(f" ({timestamp})")
-                    f.write("\n\n")
-                    f.write(content)
-                    f.write("\n\n---\n\n")
-            
+            self.export(Path(output_path), session=self.session)
             return True
-        except Exception as e:
+        except (OSError, RuntimeError, ValueError) as e:
             print(f"Error exporting conversation: {e}")
             return False
     
-    def get_context_for_api(self, limit: int = 10) -> List[Dict[str, str]]:
+    @staticmethod
+    def message_tokens(message: Message) -> int:
+        """
+        Get a message's estimated token count, caching it on the message.
+        
+        Args:
+            message: History message
+            
+        Returns:
+            Estimated tokens
+        """
+        if message.tokens is None:
+            message.tokens = estimate_tokens(message.content)
+        return message.tokens
+    
+    def get_context_for_api(
+        self,
+        max_tokens: Optional[int] = None,
+        limit: Optional[int] = None,
+        counter: Optional[Callable[[List[Dict[str, str]]], int]] = None,
+        summarizer: Optional["Summarizer"] = None
+    ) -> List[Dict[str, str]]:
         """
         Get recent history formatted for API.
         
+        Selects the most recent messages whose estimated tokens fit in
+        `max_tokens`. The context always starts with a user message.
+        
+        With a summarizer, turns covered by the session's rolling summary
+        are replaced by it, and once the context would exceed the
+        summarizer's threshold the oldest remaining turns are folded into
+        the summary first; `summary_saved` then holds the tokens saved.
+        
         Args:
-            limit: Number of recent messages to include
+            max_tokens: Token budget for the context (None = no budget)
+            limit: Optional limit on number of messages
+            counter: Optional exact token counter (e.g. GeminiClient.count_tokens);
+                the selection is shrunk until the exact count fits the budget
+            summarizer: Optional rolling summarizer
             
         Returns:
             List of messages in API format
         """
-        recent = self.history[-limit:] if len(self.history) > limit else self.history
+        recent = self.history[-limit:] if limit else self.history
+        
+        start = len(recent)
+        if max_tokens is None:
+            start = 0
+        else:
+            used = 0
+            while start > 0:
+                used += self.message_tokens(recent[start - 1])
+                if used > max_tokens:
+                    break
+                start -= 1
+        
+        prefix: List[Dict[str, str]] = []
+        self.summary_saved = 0
+        if summarizer is not None:
+            prefix, start = self._compact(recent, start, max_tokens, summarizer)
+        
+        context = self._api_messages(recent[start:])
+        if counter is None or max_tokens is None or not context:
+            return prefix + context
+        
+        for _ in range(EXACT_COUNT_ATTEMPTS):
+            exact = counter(prefix + context)
+            if exact <= max_tokens or not context:
+                break
+            # Drop the oldest messages in proportion to the overshoot
+            drop = max(1, int(len(context) * (1 - max_tokens / exact)))
+            context = self._api_messages(context[drop:])
+        return prefix + context
+    
+    def _compact(
+        self,
+        recent: Sequence[Message],
+        start: int,
+        max_tokens: Optional[int],
+        summarizer: "Summarizer"
+    ) -> Tuple[List[Dict[str, str]], int]:
+        """
+        Replace the older part of the selected context by the rolling summary.
+        
+        Only turns the summary doesn't cover yet are sent to the summarizer,
+        so each update costs about one threshold's worth of tokens however
+        long the session gets. If summarizing fails, the previous summary
+        is used and the error is left in `summarizer.last_error`.
+        
+        Args:
+            recent: Candidate messages
+            start: First message selected by the token budget
+            max_tokens: Token budget for the context
+            summarizer: Rolling summarizer
+            
+        Returns:
+            (summary messages for the API, first message to send verbatim)
+        """
+        window = recent[start:]
+        tokens = [self.message_tokens(message) for message in window]
+        summary = self.summary
         
+        first = 0
+        while first < len(window) and summary.covers(window[first]):
+            first += 1
+        
+        threshold = summarizer.threshold if max_tokens is None else min(summarizer.threshold, max_tokens)
+        pending = sum(tokens[first:])
+        if summary.tokens + pending > threshold:
+            # Keep the newest turns verbatim, starting at a user message and
+            # never past the latest one
+            last_user = first
+            for i in range(len(window) - 1, first - 1, -1):
+                if window[i]["role"] == "user":
+                    last_user = i
+                    break
+            cut = first
+            kept = pending
+            while cut < last_user and (kept > summarizer.keep_tokens or window[cut]["role"] != "user"):
+                kept -= tokens[cut]
+                cut += 1
+            if cut > first:
+                try:
+                    summary = summarizer.update(summary, window[first:cut], pending - kept)
+                except Exception:
+                    pass
+                else:
+                    self._summary = summary
+                    summary.save(self._summary_file(self.session))
+                    first = cut
+        
+        prefix = summary.api_messages()
+        if not prefix:
+            return [], start
+        sent = summary.tokens + sum(tokens[first:])
+        if max_tokens is not None:
+            # Only a summary larger than the room kept for it gets here
+            while sent > max_tokens and first < len(window):
+                sent -= tokens[first]
+                first += 1
+        self.summary_saved = max(sum(tokens) - sent, 0)
+        return prefix, start + first
+    
+    @staticmethod
+    def _api_messages(messages: Sequence) -> List[Dict[str, str]]:
+        """Format messages for the API, skipping leading model replies."""
+        start = 0
+        while start < len(messages) and messages[start]["role"] != "user":
+            start += 1
         return [
             {"role": msg["role"], "content": msg["content"]}
-            for msg in recent
+            for msg in messages[start:]
         ]
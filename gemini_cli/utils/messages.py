@@ -0,0 +1,251 @@
+"""
+Compact in-memory message records.
+A fixed-capacity ring buffer of __slots__ records: appending past the
+capacity overwrites the oldest message in O(1), and slices are views
+rather than copies.
+"""
+
+import gc
+import sys
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+FIELDS = ("role", "content", "tokens", "timestamp")
+
+
+def parse_timestamp(value) -> float:
+    """
+    Convert a stored timestamp to epoch seconds.
+
+    Args:
+        value: ISO 8601 string (naive ones are local time), epoch number,
+            or empty
+
+    Returns:
+        Epoch seconds (0.0 if missing or unreadable)
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not value:
+        return 0.0
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def format_timestamp(ts: float) -> str:
+    """Epoch seconds as the local ISO 8601 string used in stored history."""
+    return datetime.fromtimestamp(ts).isoformat() if ts else ""
+
+
+class Message:
+    """
+    One conversation message.
+
+    Supports the dict-style access (message["role"], message.get(...)) of
+    the plain dicts history used to hold; "timestamp" reads as an ISO
+    string, formatted on demand from the epoch float.
+    """
+
+    __slots__ = ("role", "content", "ts", "tokens")
+
+    def __init__(self, role: str, content: str, ts: float = 0.0, tokens: Optional[int] = None):
+        # Interned, so every record shares the same few role strings
+        self.role = sys.intern(role)
+        self.content = content
+        self.ts = ts
+        self.tokens = tokens
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Message":
+        """Create a record from a stored message dict."""
+        return cls(
+            data.get("role", ""),
+            data.get("content", ""),
+            parse_timestamp(data.get("timestamp")),
+            data.get("tokens"),
+        )
+
+    @classmethod
+    def from_dicts(cls, messages: Iterable[Dict]) -> List["Message"]:
+        """Create records from stored message dicts (the bulk form of from_dict)."""
+        parse = parse_timestamp
+        # Records hold only strings and numbers, so they can't form cycles;
+        # collections triggered by allocating thousands of them find nothing
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return [
+                cls(data.get("role", ""), data.get("content", ""), parse(data.get("timestamp")), data.get("tokens"))
+                for data in messages
+            ]
+        finally:
+            if enabled:
+                gc.enable()
+
+    def to_dict(self) -> Dict:
+        """Get the stored form (ISO timestamp)."""
+        data = {"role": self.role, "content": self.content, "timestamp": format_timestamp(self.ts)}
+        if self.tokens is not None:
+            data["tokens"] = self.tokens
+        return data
+
+    @property
+    def timestamp(self) -> str:
+        return format_timestamp(self.ts)
+
+    def get(self, key: str, default=None):
+        value = getattr(self, key) if key in FIELDS else None
+        return default if value is None else value
+
+    def __getitem__(self, key: str):
+        if key not in FIELDS:
+            raise KeyError(key)
+        value = getattr(self, key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value) -> None:
+        if key == "timestamp":
+            self.ts = parse_timestamp(value)
+        elif key in ("role", "content", "tokens"):
+            setattr(self, key, value)
+        else:
+            raise KeyError(key)
+
+    def __delitem__(self, key: str) -> None:
+        if key != "tokens":
+            raise KeyError(key)
+        self.tokens = None
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Message):
+            return (self.role, self.content, self.ts, self.tokens) == (
+                other.role, other.content, other.ts, other.tokens
+            )
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"Message(role={self.role!r}, content={self.content[:30]!r}, ts={self.ts})"
+
+
+class _Messages(ABC):
+    """Read-only sequence behaviour shared by buffers and views."""
+
+    __slots__ = ()
+
+    @abstractmethod
+    def _at(self, index: int) -> Message:
+        """Message at a position already checked to be in range."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of messages."""
+
+    @abstractmethod
+    def _view(self, start: int, stop: int) -> "MessageView":
+        """Window over positions start..stop (already clamped)."""
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self._at(i) for i in range(start, stop, step)]
+            return self._view(start, max(start, stop))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("message index out of range")
+        return self._at(index)
+
+    def __iter__(self) -> Iterator[Message]:
+        for i in range(len(self)):
+            yield self._at(i)
+
+    def __reversed__(self) -> Iterator[Message]:
+        for i in range(len(self) - 1, -1, -1):
+            yield self._at(i)
+
+    def __eq__(self, other) -> bool:
+        try:
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        except TypeError:
+            return NotImplemented
+
+
+class MessageView(_Messages):
+    """Window onto a MessageBuffer without copying (valid until the buffer changes)."""
+
+    __slots__ = ("_buffer", "_start", "_stop")
+
+    def __init__(self, buffer: "MessageBuffer", start: int, stop: int):
+        self._buffer = buffer
+        self._start = start
+        self._stop = stop
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    def _at(self, index: int) -> Message:
+        return self._buffer._at(self._start + index)
+
+    def _view(self, start: int, stop: int) -> "MessageView":
+        return MessageView(self._buffer, self._start + start, self._start + stop)
+
+    def __repr__(self) -> str:
+        return f"MessageView({list(self)!r})"
+
+
+class MessageBuffer(_Messages):
+    """Fixed-capacity ring buffer of Message records, oldest first."""
+
+    __slots__ = ("capacity", "_slots", "_head", "_count")
+
+    def __init__(self, capacity: int, messages: Iterable[Message] = ()):
+        """
+        Initialize message buffer.
+
+        Args:
+            capacity: Maximum messages kept; older ones are overwritten
+            messages: Initial messages (only the newest `capacity` are kept)
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        initial = list(messages)[-capacity:]
+        self._count = len(initial)
+        self._slots: list = initial + [None] * (capacity - self._count)
+        self._head = 0  # slot of the oldest message
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _at(self, index: int) -> Message:
+        return self._slots[(self._head + index) % self.capacity]
+
+    def _view(self, start: int, stop: int) -> MessageView:
+        return MessageView(self, start, stop)
+
+    def append(self, message: Message) -> None:
+        """Add a message, overwriting the oldest when full (O(1))."""
+        if self._count < self.capacity:
+            self._slots[(self._head + self._count) % self.capacity] = message
+            self._count += 1
+        else:
+            self._slots[self._head] = message
+            self._head = (self._head + 1) % self.capacity
+
+    def clear(self) -> None:
+        """Remove every message."""
+        self._slots = [None] * self.capacity
+        self._head = 0
+        self._count = 0
+
+    def __repr__(self) -> str:
+        return f"MessageBuffer(capacity={self.capacity}, messages={self._count})"
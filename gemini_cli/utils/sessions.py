@@ -0,0 +1,133 @@
+"""
+Index of named conversation sessions.
+A small JSON file with per-session metadata (message count, token total,
+last activity), so sessions can be listed without opening their history.
+"""
+
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from gemini_cli.core.tokens import estimate_tokens
+from gemini_cli.utils.locking import locked_json, read_json
+
+# Session used when none is named (stored in the original history file)
+DEFAULT_SESSION = "default"
+
+SESSION_NAME = re.compile(r"^[A-Za-z0-9_][A-Za-z0-9_.-]{0,63}$")
+
+
+def validate_session_name(name: str) -> str:
+    """
+    Check that a session name is usable as a file name.
+
+    Args:
+        name: Session name
+
+    Returns:
+        The name
+
+    Raises:
+        ValueError: If the name is empty, too long or has other characters
+            than letters, digits, '_', '-' and '.'
+    """
+    if not SESSION_NAME.match(name or ""):
+        raise ValueError(
+            f"Invalid session name: {name!r} (use up to 64 letters, digits, '_', '-' or '.')"
+        )
+    return name
+
+
+class SessionIndex:
+    """Per-session metadata shared by all gemini-termux processes."""
+
+    def __init__(self, path: Path):
+        """
+        Initialize session index.
+
+        Args:
+            path: Index JSON file
+        """
+        self.path = Path(path)
+
+    def list(self) -> List[Dict]:
+        """
+        Get every session, most recently active first.
+
+        Returns:
+            Entries with name, messages, tokens, created and last_active
+        """
+        sessions = [{"name": name, **entry} for name, entry in read_json(self.path).items()]
+        return sorted(sessions, key=lambda s: s.get("last_active", ""), reverse=True)
+
+    def get(self, name: str) -> Optional[Dict]:
+        """Get one session's entry, or None if it is not indexed."""
+        entry = read_json(self.path).get(name)
+        return {"name": name, **entry} if entry is not None else None
+
+    def record(self, name: str, messages: Iterable[Dict]) -> None:
+        """
+        Count newly saved messages towards a session.
+
+        Args:
+            name: Session name
+            messages: Messages just saved (with optional cached "tokens")
+        """
+        added = 0
+        tokens = 0
+        last_active = None
+        for message in messages:
+            added += 1
+            tokens += message.get("tokens") or estimate_tokens(message.get("content", ""))
+            last_active = message.get("timestamp") or last_active
+        with locked_json(self.path) as index:
+            entry = index.setdefault(name, self._new_entry())
+            entry["messages"] += added
+            entry["tokens"] += tokens
+            entry["last_active"] = last_active or datetime.now().isoformat()
+
+    def recount(self, name: str, messages: Iterable[Dict]) -> None:
+        """
+        Replace a session's totals with those of its stored messages.
+
+        Args:
+            name: Session name
+            messages: Every message the session still stores (e.g. after
+                its history was trimmed)
+        """
+        count = 0
+        tokens = 0
+        for message in messages:
+            count += 1
+            tokens += message.get("tokens") or estimate_tokens(message.get("content", ""))
+        with locked_json(self.path) as index:
+            entry = index.setdefault(name, self._new_entry())
+            entry["messages"] = count
+            entry["tokens"] = tokens
+
+    def reset(self, name: str) -> None:
+        """Zero a session's totals (after its history is cleared)."""
+        with locked_json(self.path) as index:
+            created = index.get(name, {}).get("created")
+            index[name] = self._new_entry()
+            if created:
+                index[name]["created"] = created
+
+    def ensure(self, name: str, messages: Iterable[Dict] = ()) -> None:
+        """
+        Add a session to the index if it is missing.
+
+        Args:
+            name: Session name
+            messages: Its stored messages, counted when the entry is created
+                (e.g. history kept from before sessions were indexed)
+        """
+        if name in read_json(self.path):
+            return
+        self.record(name, messages)
+
+    @staticmethod
+    def _new_entry() -> Dict:
+        now = datetime.now().isoformat()
+        return {"messages": 0, "tokens": 0, "created": now, "last_active": now}
@@ -0,0 +1,221 @@
+"""
+Rolling conversation summaries.
+Once the history resent with every chat turn grows past a token threshold,
+its older turns are replaced by a summary written by a cheap model. Each
+update summarizes the previous summary plus only the newly retired turns.
+"""
+
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+from gemini_cli.core.tokens import estimate_tokens
+
+SUMMARY_MODEL = "gemini-1.5-flash-8b"
+
+# Context tokens (summary included) that trigger a compaction
+THRESHOLD = 8000
+
+# Share of the threshold kept as verbatim recent turns after a compaction
+KEEP = 0.5
+
+# Length the model is asked to keep the summary within
+MAX_WORDS = 400
+
+PROMPT = """You keep a running summary of a conversation between a user and an AI assistant.
+Update the summary with the new messages below. Keep every fact, decision, name, number,
+file or code identifier and open question a later turn might refer to; drop greetings and
+filler. Write plain text of at most {words} words and reply with the summary only.
+
+Current summary:
+{summary}
+
+New messages:
+{messages}
+"""
+
+# How the summary is placed at the start of the chat history
+SUMMARY_INTRO = "Summary of our conversation so far:\n\n"
+SUMMARY_ACK = "Understood. I'll continue from this summary."
+
+
+@dataclass
+class Summary:
+    """Summary of a session's older messages."""
+    text: str = ""
+    until: float = 0.0  # timestamp of the newest summarized message
+    messages: int = 0  # messages summarized
+    source_tokens: int = 0  # their estimated tokens
+    model: str = ""
+    updated: float = 0.0
+
+    def api_messages(self) -> List[Dict[str, str]]:
+        """The summary as a user/model exchange for the chat history (empty if none)."""
+        if not self.text:
+            return []
+        return [
+            {"role": "user", "content": SUMMARY_INTRO + self.text},
+            {"role": "model", "content": SUMMARY_ACK},
+        ]
+
+    @property
+    def tokens(self) -> int:
+        """Estimated tokens the summary adds to each turn."""
+        return sum(estimate_tokens(msg["content"]) for msg in self.api_messages())
+
+    def covers(self, message) -> bool:
+        """Whether a message (with an epoch `ts`) is part of the summary."""
+        return bool(self.text) and message.ts <= self.until
+
+    @classmethod
+    def load(cls, path: Path) -> "Summary":
+        """
+        Read a cached summary.
+
+        Returns:
+            The summary (empty if the file is missing or unreadable)
+        """
+        try:
+            data = json.loads(Path(path).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return cls()
+        if not isinstance(data, dict):
+            return cls()
+        known = {f.name for f in fields(cls)}
+        return cls(**{key: value for key, value in data.items() if key in known})
+
+    def save(self, path: Path) -> bool:
+        """
+        Write the summary atomically.
+
+        Returns:
+            True if written
+        """
+        path = Path(path)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(asdict(self), f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Warning: Could not save conversation summary: {e}")
+            return False
+        return True
+
+
+def format_transcript(messages: Sequence) -> str:
+    """Messages as "User: ..." / "Gemini: ..." paragraphs."""
+    return "\n\n".join(
+        f"{'User' if msg['role'] == 'user' else 'Gemini'}: {msg['content']}" for msg in messages
+    )
+
+
+class Summarizer:
+    """Folds retired turns into a rolling summary."""
+
+    def __init__(
+        self,
+        summarize: Callable[[str], str],
+        threshold: int = THRESHOLD,
+        keep: float = KEEP,
+        model: str = SUMMARY_MODEL
+    ):
+        """
+        Initialize summarizer.
+
+        Args:
+            summarize: Returns the model's answer to a prompt (e.g. from
+                client_summarize)
+            threshold: Context tokens, summary included, above which older
+                turns are summarized
+            keep: Share of the threshold left as verbatim recent turns
+            model: Model name recorded with each summary
+        """
+        if threshold < 1:
+            raise ValueError("summary threshold must be at least 1 token")
+        self.summarize = summarize
+        self.threshold = threshold
+        self.keep = keep
+        self.model = model
+        self.last_error: Optional[str] = None
+        self.stats = {"updates": 0, "errors": 0, "summarized_tokens": 0}
+
+    @property
+    def keep_tokens(self) -> int:
+        """Verbatim tokens left after a compaction."""
+        return int(self.threshold * self.keep)
+
+    def update(self, summary: Summary, messages: Sequence, tokens: int) -> Summary:
+        """
+        Fold messages into a summary.
+
+        Args:
+            summary: Current summary (may be empty)
+            messages: Messages newer than the summary, oldest first (with
+                role, content and an epoch `ts`)
+            tokens: Their estimated tokens
+
+        Returns:
+            New summary covering the old one and `messages`
+
+        Raises:
+            ValueError: If the model returns an empty summary
+            Exception: Whatever the summarize function raises
+        """
+        prompt = PROMPT.format(
+            words=MAX_WORDS,
+            summary=summary.text or "(none yet)",
+            messages=format_transcript(messages),
+        )
+        try:
+            text = (self.summarize(prompt) or "").strip()
+            if not text:
+                raise ValueError("The model returned an empty summary")
+        except Exception as e:
+            self.stats["errors"] += 1
+            self.last_error = str(e)
+            raise
+        self.last_error = None
+        self.stats["updates"] += 1
+        self.stats["summarized_tokens"] += tokens
+        return Summary(
+            text=text,
+            until=messages[-1].ts,
+            messages=summary.messages + len(messages),
+            source_tokens=summary.source_tokens + tokens,
+            model=self.model,
+            updated=time.time(),
+        )
+
+
+def client_summarize(client, model: str = SUMMARY_MODEL) -> Callable[[str], str]:
+    """
+    Get a summarize function backed by a Gemini client.
+
+    Requests run on a fork of the client switched to `model`, so the chat
+    keeps its own model and session. Clients that can't fork (the daemon's)
+    send `model` with each one-shot request instead.
+
+    Args:
+        client: GeminiClient (or DaemonClient)
+        model: Summary model
+
+    Returns:
+        Function from prompt to summary text
+
+    Raises:
+        ValueError: For an unknown model
+    """
+    fork = getattr(client, "fork", None)
+    if fork is None:
+        if model not in client.MODELS:
+            raise ValueError(f"Unknown model: {model}. Available: {client.MODELS}")
+        return lambda prompt: client.generate_content(prompt, stream=False, model=model)
+    worker = fork()
+    if model != worker.model_name:
+        worker.set_model(model)
+    return lambda prompt: worker.generate_content(prompt, stream=False)
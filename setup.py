@@ -31,7 +31,7 @@ setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     url="https://github.com/Alex72-py/gemini-cli-termux",
-    packages=find_packages(exclude=["tests", "docs"]),
+    packages=find_packages(exclude=["tests", "tests.*", "benchmarks", "benchmarks.*", "docs"]),
     classifiers=[
         "Development Status :: 5 - Production/Stable",
         "Intended Audience :: Developers",
@@ -47,6 +47,8 @@ setup(
     python_requires=">=3.11",
     install_requires=requirements,
     extras_require={
+        # HTTP/2 for the REST backend
+        "http2": ["httpx[http2]>=0.27.0"],
         "dev": [
             "pytest>=7.4.0",
             "pytest-asyncio>=0.21.0",
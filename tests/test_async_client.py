@@ -0,0 +1,102 @@
+"""Tests for AsyncGeminiClient concurrency behaviour."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from gemini_cli.core.async_client import AsyncGeminiClient
+
+
+class SlowStream:
+    """Async response that yields words with a delay between them."""
+
+    def __init__(self, text, delay, tracker):
+        self.words = text.split()
+        self.delay = delay
+        self.tracker = tracker
+
+    async def __aiter__(self):
+        self.tracker["active"] += 1
+        self.tracker["peak"] = max(self.tracker["peak"], self.tracker["active"])
+        try:
+            for word in self.words:
+                await asyncio.sleep(self.delay)
+                yield SimpleNamespace(text=word + " ")
+        finally:
+            self.tracker["active"] -= 1
+
+
+class StubModel:
+    """Model stand-in exposing the SDK's async generation call."""
+
+    def __init__(self, delay=0.01):
+        self.delay = delay
+        self.tracker = {"active": 0, "peak": 0}
+
+    async def generate_content_async(self, prompt, stream=False):
+        return SlowStream(prompt, self.delay, self.tracker)
+
+
+class StubChat:
+    def __init__(self, model):
+        self.model = model
+        self.turns = []
+
+    async def send_message_async(self, content, stream=False):
+        self.turns.append(content)
+        return SlowStream(content, self.model.delay, self.model.tracker)
+
+
+class StubClient:
+    model_name = "stub"
+
+    def __init__(self):
+        self.model = StubModel()
+        self.chat_session = None
+
+    def get_model(self, model=None, generation_config=None):
+        return self.model
+
+    def start_chat(self, history=None):
+        self.chat_session = StubChat(self.model)
+
+
+def test_generate_content_streams_chunks():
+    client = AsyncGeminiClient.from_client(StubClient())
+
+    async def run():
+        return [chunk async for chunk in client.generate_content("a b c")]
+
+    assert asyncio.run(run()) == ["a ", "b ", "c "]
+
+
+def test_concurrency_limit_is_respected():
+    stub = StubClient()
+    client = AsyncGeminiClient.from_client(stub, max_concurrency=3)
+
+    results = asyncio.run(client.generate_many([f"p{i} x" for i in range(10)]))
+
+    assert results == [f"p{i} x " for i in range(10)]
+    assert stub.model.tracker["peak"] == 3
+    assert client.in_flight == 0
+
+
+def test_chat_turns_are_serialized():
+    stub = StubClient()
+    client = AsyncGeminiClient.from_client(stub, max_concurrency=4)
+
+    async def turn(message):
+        return "".join([chunk async for chunk in client.send_message(message)])
+
+    async def run():
+        return await asyncio.gather(turn("first turn"), turn("second turn"))
+
+    assert asyncio.run(run()) == ["first turn ", "second turn "]
+    assert stub.chat_session.turns == ["first turn", "second turn"]
+    assert stub.model.tracker["peak"] == 1
+
+
+def test_invalid_concurrency_rejected():
+    with pytest.raises(ValueError):
+        AsyncGeminiClient.from_client(StubClient(), max_concurrency=0)
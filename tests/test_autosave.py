@@ -0,0 +1,71 @@
+"""Tests for the debounced background history writer."""
+
+import threading
+import time
+
+from gemini_cli.utils.autosave import AutoSaver
+from gemini_cli.utils.memory import ConversationMemory
+
+
+def test_requests_within_the_window_are_coalesced():
+    saves = []
+    writes = []
+    saver = AutoSaver(lambda: saves.append(time.monotonic()) or True, debounce=0.2,
+                      on_write=lambda seconds, ok: writes.append(ok))
+    for _ in range(5):
+        saver.request()
+    assert saver.stats()["queue_depth"] == 5
+
+    assert saver.flush(timeout=5)
+    stats = saver.stats()
+    assert len(saves) == 1 and writes == [True]
+    assert (stats["requests"], stats["saves"], stats["coalesced"], stats["queue_depth"]) == (5, 1, 4, 0)
+    assert stats["max_write_ms"] >= stats["last_write_ms"] >= 0
+    saver.close()
+
+
+def test_flush_and_close_skip_the_debounce_window():
+    started = threading.Event()
+    saved = []
+
+    def slow_save():
+        started.set()
+        time.sleep(0.05)
+        saved.append(True)
+        return True
+
+    saver = AutoSaver(slow_save, debounce=30)
+    assert saver.flush(timeout=1)  # nothing requested
+    saver.request()
+    begun = time.monotonic()
+    assert saver.flush(timeout=5) and saved == [True]
+    saver.request()
+    assert saver.close(timeout=5) and saved == [True, True]
+    assert time.monotonic() - begun < 5
+
+    saver.request()  # ignored once closed
+    assert saver.stats()["requests"] == 2
+
+
+def test_failed_saves_are_reported():
+    saver = AutoSaver(lambda: False, debounce=0)
+    saver.request()
+    assert not saver.flush(timeout=5)
+    assert saver.stats()["errors"] == 1
+    saver.close()
+
+
+def test_memory_saves_safely_while_messages_are_added(tmp_path):
+    memory = ConversationMemory(data_dir=tmp_path, max_entries=5000)
+    saver = AutoSaver(memory.save, debounce=0.001)
+    for i in range(1000):
+        memory.add_message("user", f"message {i}")
+        saver.request()
+        if i == 499:
+            memory.clear()
+    assert saver.close(timeout=10)
+    memory.close()
+
+    stored = [m["content"] for m in memory.log.messages()]
+    assert stored == [f"message {i}" for i in range(500, 1000)]
+    assert memory.sessions.get("default")["messages"] == 500
@@ -74,6 +74,23 @@ class TestConfig:
         
         config.set("api", "model", "gemini-1.5-pro")
         assert config.get("api", "model") == "gemini-1.5-pro"
+    
+    def test_set_converts_strings_to_setting_types(self, tmp_path):
+        """Test that `config set` strings become bools and numbers."""
+        config = Config(config_dir=tmp_path)
+        
+        config.set("daemon", "enabled", "false")
+        config.set("api", "max_concurrency", "4")
+        config.set("resilience", "total_timeout", "90")
+        assert config.daemon.enabled is False
+        assert config.api.max_concurrency == 4
+        assert config.resilience.total_timeout == 90.0
+        with pytest.raises(ValueError):
+            config.set("cache", "enabled", "maybe")
+        
+        # Strings saved before values were converted are read as their type
+        config._config["metrics"] = {"enabled": "off", "backups": "2"}
+        assert config.metrics.enabled is False and config.metrics.backups == 2
 
 
 class TestFileHandler:
@@ -0,0 +1,119 @@
+"""Tests for JSONL batch generation and resume."""
+
+import asyncio
+import io
+import json
+
+import pytest
+
+from gemini_cli.core.batch import BatchItem, BatchRunner, load_completed, open_output, read_items
+
+
+class StubAsyncClient:
+    """AsyncGeminiClient stand-in; longer prompts take longer."""
+
+    model_name = "stub-model"
+
+    def __init__(self):
+        self.calls = []
+
+    async def generate_text(self, prompt, files=None, model=None, generation_config=None):
+        self.calls.append((prompt, model, generation_config))
+        await asyncio.sleep(0.01 * len(prompt))
+        if prompt == "boom":
+            raise RuntimeError("429 quota")
+        return prompt.upper()
+
+
+def _write_input(path, lines):
+    path.write_text("\n".join(json.dumps(line) for line in lines) + "\n", encoding="utf-8")
+    return path
+
+
+def test_read_items_accepts_strings_and_objects(tmp_path):
+    input_path = _write_input(tmp_path / "in.jsonl", [
+        "plain prompt",
+        {"prompt": "with model", "model": "gemini-1.5-flash", "id": "x1",
+         "generation_config": {"temperature": 0.1}, "files": ["a.png"]},
+    ])
+
+    items = list(read_items(input_path))
+
+    assert [item.index for item in items] == [0, 1]
+    assert items[0].prompt == "plain prompt"
+    assert items[1].model == "gemini-1.5-flash"
+    assert items[1].generation_config == {"temperature": 0.1}
+    assert items[1].files == ["a.png"]
+
+
+def test_read_items_rejects_missing_prompt(tmp_path):
+    input_path = _write_input(tmp_path / "in.jsonl", [{"model": "x"}])
+    with pytest.raises(ValueError, match="Line 1"):
+        list(read_items(input_path))
+
+
+def test_results_stream_in_completion_order(tmp_path):
+    input_path = _write_input(tmp_path / "in.jsonl", ["long prompt", "hi", "boom"])
+    output = io.StringIO()
+    runner = BatchRunner(StubAsyncClient(), output, workers=3)
+
+    stats = asyncio.run(runner.run(read_items(input_path)))
+
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [r["index"] for r in records] == [1, 2, 0]
+    assert records[0]["response"] == "HI"
+    assert records[1]["error"] == "429 quota"
+    assert records[2]["model"] == "stub-model"
+    assert (stats.succeeded, stats.failed, stats.total) == (2, 1, 3)
+
+
+def test_resume_skips_completed_and_retries_failures(tmp_path):
+    input_path = _write_input(tmp_path / "in.jsonl", ["a", "b", "c"])
+    output_path = tmp_path / "out.jsonl"
+    done = BatchItem(index=0, prompt="a").fingerprint
+    output_path.write_text(
+        json.dumps({"index": 0, "input": done, "response": "A"}) + "\n"
+        + json.dumps({"index": 1, "error": "timeout"}) + "\n"
+        + '{"index": 2, "resp',  # torn line from a killed run
+        encoding="utf-8",
+    )
+
+    completed = load_completed(output_path)
+    assert completed == {0: done}
+
+    client = StubAsyncClient()
+    with open_output(output_path) as output:
+        runner = BatchRunner(client, output, workers=2)
+        stats = asyncio.run(runner.run(read_items(input_path), skip=completed))
+
+    assert sorted(call[0] for call in client.calls) == ["b", "c"]
+    assert stats.skipped == 1 and stats.changed == 0
+    assert load_completed(output_path).keys() == {0, 1, 2}
+
+
+def test_resume_reruns_items_whose_input_line_changed(tmp_path):
+    input_path = _write_input(tmp_path / "in.jsonl", ["a", "b", "c"])
+    output_path = tmp_path / "out.jsonl"
+    with open_output(output_path) as output:
+        asyncio.run(BatchRunner(StubAsyncClient(), output).run(read_items(input_path)))
+
+    # Reordered and edited between runs
+    _write_input(input_path, ["b", "a", {"prompt": "c", "model": "other"}])
+    client = StubAsyncClient()
+    with open_output(output_path) as output:
+        runner = BatchRunner(client, output)
+        stats = asyncio.run(runner.run(read_items(input_path), skip=load_completed(output_path)))
+
+    assert sorted(call[0] for call in client.calls) == ["a", "b", "c"]
+    assert (stats.skipped, stats.changed) == (0, 3)
+
+
+def test_workers_must_be_positive():
+    import argparse
+
+    from gemini_cli.main import positive_int
+
+    assert positive_int("3") == 3
+    for value in ("0", "-1", "x"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            positive_int(value)
@@ -0,0 +1,56 @@
+"""Tests for the benchmark runner's baseline comparison."""
+
+from contextlib import contextmanager
+
+import pytest
+
+from benchmarks.runner import REGISTRY, Benchmark, compare, format_report, load_baseline, measure, save_baseline
+
+
+def test_compare_flags_regressions():
+    baseline = {"a": {"median": 1.0}, "b": {"median": 1.0}, "c": {"median": 1.0}}
+    results = {"a": {"median": 1.1}, "b": {"median": 1.5}, "c": {"median": 0.5}, "d": {"median": 2.0}}
+
+    rows = {row["name"]: row for row in compare(results, baseline, threshold=0.2, thresholds={"b": 0.6})}
+
+    assert rows["a"]["status"] == "ok"
+    assert rows["b"]["status"] == "ok"  # per-benchmark threshold
+    assert rows["c"]["status"] == "improved"
+    assert rows["d"]["status"] == "new"
+    assert compare({"a": {"median": 1.3}}, baseline)[0]["status"] == "regressed"
+
+    report = format_report(compare({"a": {"median": 1.3}}, baseline))
+    assert "REGRESSED" in report and "+30%" in report
+    assert report.endswith("1 benchmark(s), 1 regression(s)")
+
+
+def test_baseline_roundtrip_merges(tmp_path):
+    path = tmp_path / "baseline.json"
+    save_baseline(path, {"a": {"median": 1.0}})
+    save_baseline(path, {"b": {"median": 2.0}})
+
+    stored = load_baseline(path)
+    assert set(stored["results"]) == {"a", "b"}
+    assert stored["meta"]["python"]
+    assert load_baseline(tmp_path / "missing.json") == {"meta": {}, "results": {}}
+
+
+def test_suite_benchmark_runs():
+    from benchmarks import suite  # noqa: F401
+
+    assert {"startup.doctor", "memory.save_100k", "render.markdown_large", "e2e.ask"} <= set(REGISTRY)
+    result = measure(REGISTRY["config.load"], repeat=2)
+    assert result["samples"] == 2 and 0 < result["min"] <= result["median"] <= result["max"]
+
+
+def test_memory_is_measured_and_compared():
+    baseline = {"a": {"median": 1.0, "bytes": 1000}}
+    row = compare({"a": {"median": 1.0, "bytes": 1500}}, baseline, threshold=0.2)[0]
+    assert row["status"] == "regressed" and row["memory_change"] == pytest.approx(0.5)
+    assert compare({"a": {"median": 1.0, "bytes": 500}}, baseline)[0]["status"] == "improved"
+    assert "1000 B (+0%)" in format_report(compare({"a": {"median": 1.0, "bytes": 1000}}, baseline))
+
+    def setup(scratch):
+        yield lambda: [bytearray(1 << 20)]
+    result = measure(Benchmark("kept", contextmanager(setup), repeat=1, memory=True))
+    assert result["bytes"] >= 1 << 20 and result["peak_bytes"] >= result["bytes"]
@@ -0,0 +1,174 @@
+"""Tests for the persistent response cache."""
+
+import os
+import threading
+import time
+
+from gemini_cli.core.cache import ResponseCache
+
+
+def test_key_depends_on_inputs_and_attachment_bytes(tmp_path):
+    first = tmp_path / "a.txt"
+    second = tmp_path / "b.txt"
+    first.write_text("same bytes")
+    second.write_text("same bytes")
+
+    base = ResponseCache.make_key("m", {"temperature": 0.5}, "hi")
+    assert base == ResponseCache.make_key("m", {"temperature": 0.5}, "hi")
+    assert base != ResponseCache.make_key("m2", {"temperature": 0.5}, "hi")
+    assert base != ResponseCache.make_key("m", {"temperature": 0.6}, "hi")
+    assert base != ResponseCache.make_key("m", {"temperature": 0.5}, "hi!")
+
+    # Renamed file with identical content hits the same entry
+    assert (ResponseCache.make_key("m", {}, "hi", [first])
+            == ResponseCache.make_key("m", {}, "hi", [second]))
+    second.write_text("other bytes")
+    assert (ResponseCache.make_key("m", {}, "hi", [first])
+            != ResponseCache.make_key("m", {}, "hi", [second]))
+
+
+def test_put_get_and_counters(tmp_path):
+    cache = ResponseCache(tmp_path)
+    key = cache.make_key("m", {}, "hello")
+
+    assert cache.get(key) is None
+    cache.put(key, ["Hel", "lo"])
+    assert cache.get(key) == ["Hel", "lo"]
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+    # Counters stay in memory until close, then add up across processes
+    assert not cache.stats_file.exists()
+    cache.close()
+    other = ResponseCache(tmp_path)
+    other.get(key)
+    other.close()
+    assert ResponseCache(tmp_path).stats()["hits"] == 2
+
+
+def test_expired_entries_miss(tmp_path):
+    cache = ResponseCache(tmp_path, ttl=60)
+    key = cache.make_key("m", {}, "old")
+    cache.put(key, ["stale"])
+
+    cache.ttl = 0.001
+    time.sleep(0.01)
+    assert cache.get(key) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_record_only_stores_completed_streams(tmp_path):
+    cache = ResponseCache(tmp_path)
+    key = cache.make_key("m", {}, "stream")
+
+    partial = cache.record(key, iter(["a", "b", "c"]))
+    assert next(partial) == "a"
+    partial.close()
+    assert cache.stats()["entries"] == 0
+
+    assert list(cache.record(key, iter(["a", "b"]))) == ["a", "b"]
+    assert cache.get(key) == ["a", "b"]
+
+
+def test_lru_eviction_respects_max_size(tmp_path):
+    cache = ResponseCache(tmp_path, max_size=10**9)
+    keys = [cache.make_key("m", {}, str(i)) for i in range(3)]
+    for age, key in zip([300, 200, 100], keys):
+        cache.put(key, ["x" * 100])
+        path = cache._entry_path(key)
+        stamp = time.time() - age
+        os.utime(path, (stamp, stamp))
+
+    # Reading the oldest entry makes it most recently used
+    assert cache.get(keys[0]) is not None
+
+    # Entry sizes vary by a byte or two with the timestamp; keep room for two
+    cache.max_size = sum(cache._entry_path(k).stat().st_size for k in (keys[0], keys[2]))
+    assert cache.evict() == 1
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[2]) is not None
+
+
+def test_put_scans_entries_only_when_over_max_size(tmp_path, monkeypatch):
+    cache = ResponseCache(tmp_path, max_size=10**9)
+    cache.put(cache.make_key("m", {}, "first"), ["x" * 100])
+
+    scans = []
+    entries = cache._entries
+    monkeypatch.setattr(cache, "_entries", lambda: scans.append(1) or entries())
+    for i in range(5):
+        cache.put(cache.make_key("m", {}, str(i)), ["x" * 100])
+    assert scans == []
+
+    cache.max_size = 500
+    cache.put(cache.make_key("m", {}, "last"), ["x" * 100])
+    assert scans == [1]
+    assert cache.stats()["bytes"] <= 500
+    cache.close()
+
+
+def test_concurrent_puts_of_one_key_never_install_a_partial_entry(tmp_path, capsys):
+    cache = ResponseCache(tmp_path)
+    key = cache.make_key("m", {}, "same")
+    chunks = ["x" * 1000] * 200
+    barrier = threading.Barrier(8)
+
+    def store():
+        barrier.wait()
+        for _ in range(5):
+            cache.put(key, chunks)
+
+    threads = [threading.Thread(target=store) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert "Could not write" not in capsys.readouterr().out
+    assert cache.get(key) == chunks
+    assert list(tmp_path.glob("??/*.tmp")) == []
+    cache.close()
+
+
+def test_open_caches_are_closed_at_exit_without_being_kept_alive(tmp_path):
+    import gc
+    import weakref
+    from gemini_cli.core import cache as cache_module
+
+    cache = ResponseCache(tmp_path)
+    cache.get(cache.make_key("m", {}, "miss"))
+    cache_module._close_caches()
+    assert ResponseCache(tmp_path).stats()["misses"] == 1
+
+    ref = weakref.ref(cache)
+    del cache
+    gc.collect()
+    assert ref() is None
+
+
+def test_only_deterministic_requests_are_cached_by_default(tmp_path):
+    from gemini_cli.core.client import GeminiClient
+    from gemini_cli.core.fake import FakeTransport
+
+    transport = FakeTransport()
+    client = GeminiClient("key", model="gemini-1.5-flash", backend="rest", transport=transport, temperature=0.9)
+    client.response_cache = ResponseCache(tmp_path)
+    client.generate_content("hello", stream=False)
+    client.generate_content("hello", stream=False)
+    assert transport.api.stats["requests"] == 2
+    assert client.response_cache.stats()["entries"] == 0
+
+    client.update_generation_config(temperature=0)
+    client.generate_content("hello", stream=False)
+    client.generate_content("hello", stream=False)
+    assert transport.api.stats["requests"] == 3
+
+    client.update_generation_config(temperature=0.9)
+    client.response_cache.sampled = True
+    client.generate_content("hello", stream=False)
+    client.generate_content("hello", stream=False)
+    assert transport.api.stats["requests"] == 4
+    client.response_cache.close()
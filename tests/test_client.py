@@ -0,0 +1,81 @@
+"""Tests for GeminiClient model pooling and model switching."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from gemini_cli.core import client as client_module
+from gemini_cli.core.client import GeminiClient
+
+
+class FakeChatSession:
+    def __init__(self, model, history):
+        self.model = model
+        self.history = list(history)
+
+
+class FakeGenerativeModel:
+    """Stand-in for genai.GenerativeModel that counts constructions."""
+
+    created = 0
+
+    def __init__(self, model_name, generation_config):
+        FakeGenerativeModel.created += 1
+        self.model_name = model_name
+        self.generation_config = generation_config
+
+    def start_chat(self, history=None):
+        return FakeChatSession(self, history or [])
+
+
+@pytest.fixture
+def client(monkeypatch):
+    fake_genai = SimpleNamespace(configure=lambda api_key: None, GenerativeModel=FakeGenerativeModel)
+    monkeypatch.setattr(client_module, "GENAI_AVAILABLE", True)
+    monkeypatch.setattr(client_module, "genai", fake_genai)
+    FakeGenerativeModel.created = 0
+    return GeminiClient("key", model="gemini-1.5-flash", temperature=0.5)
+
+
+def test_switching_models_reuses_pooled_instances(client):
+    flash = client.model
+    client.set_model("gemini-1.5-pro")
+    client.set_model("gemini-1.5-flash")
+    client.set_model("gemini-1.5-pro")
+
+    assert client.model is not flash
+    assert client.get_model("gemini-1.5-flash") is flash
+    assert FakeGenerativeModel.created == 2
+
+
+def test_set_model_keeps_conversation(client):
+    client.start_chat(history=[{"role": "user", "content": "hi"}])
+    client.chat_session.history.append("model reply")
+
+    client.set_model("gemini-1.5-pro")
+
+    assert client.chat_session.model.model_name == "gemini-1.5-pro"
+    assert client.chat_session.history == [{"role": "user", "parts": ["hi"]}, "model reply"]
+
+
+def test_generation_config_updates_are_pooled(client):
+    client.start_chat()
+    client.update_generation_config(temperature=0.1)
+    assert client.model.generation_config["temperature"] == 0.1
+    assert client.chat_session is not None
+
+    client.update_generation_config(temperature=0.5)
+    client.update_generation_config(temperature=0.1)
+    assert FakeGenerativeModel.created == 2
+
+    # Per-request overrides share the pool too
+    assert client.get_model(generation_config={"temperature": 0.5}) is client.get_model(
+        generation_config={"temperature": 0.5}
+    )
+
+
+def test_pool_is_bounded(client, monkeypatch):
+    monkeypatch.setattr(client_module, "MODEL_POOL_SIZE", 2)
+    for temperature in (0.1, 0.2, 0.3):
+        client.get_model(generation_config={"temperature": temperature})
+    assert len(client._model_pool) == 2
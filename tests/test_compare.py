@@ -0,0 +1,83 @@
+"""Tests for concurrent multi-model comparison."""
+
+import asyncio
+import io
+import time
+from types import SimpleNamespace
+
+from rich.console import Console
+
+from gemini_cli.core.async_client import AsyncGeminiClient
+from gemini_cli.core.compare import ModelRun, compare_models
+from gemini_cli.ui.compare import CompareView, format_run_stats
+
+
+class TimedModel:
+    def __init__(self, name, delay, fail=False):
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+
+    async def generate_content_async(self, prompt, stream=False):
+        return self._stream()
+
+    async def _stream(self):
+        for i in range(3):
+            await asyncio.sleep(self.delay)
+            if self.fail:
+                raise RuntimeError("quota exceeded")
+            yield SimpleNamespace(text=f"{self.name} part {i}. ")
+
+
+class CompareClient:
+    model_name = "gemini-1.5-flash"
+
+    def __init__(self, delays, failing=()):
+        self.models = {name: TimedModel(name, delay, name in failing) for name, delay in delays.items()}
+
+    def get_model(self, model=None, generation_config=None):
+        return self.models[model]
+
+
+def test_models_run_concurrently():
+    delays = {"gemini-1.5-flash": 0.02, "gemini-1.5-pro": 0.08, "gemini-2.0-flash-exp": 0.05}
+    client = AsyncGeminiClient.from_client(CompareClient(delays))
+
+    started = time.monotonic()
+    runs = asyncio.run(compare_models(client, "q", list(delays)))
+    wall = time.monotonic() - started
+
+    # Close to the slowest model (3 x 0.08s), far below the sum
+    assert wall < 0.45
+    assert [run.model for run in runs] == list(delays)
+    assert all(run.done and not run.error for run in runs)
+    assert runs[0].text == "gemini-1.5-flash part 0. gemini-1.5-flash part 1. gemini-1.5-flash part 2. "
+    assert runs[0].ttft < runs[1].ttft
+    assert runs[1].tokens == (len(runs[1].text) + 3) // 4
+
+
+def test_failure_is_reported_per_model():
+    delays = {"gemini-1.5-flash": 0.0, "gemini-1.5-pro": 0.0}
+    client = AsyncGeminiClient.from_client(CompareClient(delays, failing={"gemini-1.5-pro"}))
+
+    runs = asyncio.run(compare_models(client, "q", list(delays)))
+
+    assert runs[0].error is None
+    assert runs[1].error == "quota exceeded"
+    assert format_run_stats(runs[1]).startswith("failed after")
+
+
+def test_view_layouts():
+    runs = [ModelRun("gemini-1.5-flash"), ModelRun("gemini-1.5-pro")]
+    runs[0].started = runs[0].first_token_at = time.monotonic()
+    runs[0].finished_at = runs[0].started + 1
+    runs[0].chunks, runs[0].chars = ["**hello**"], 9
+
+    assert CompareView(runs, width=120).layout == "side"
+    assert CompareView(runs, width=60).layout == "stacked"
+
+    console = Console(file=io.StringIO(), width=120, record=True)
+    console.print(CompareView(runs, width=120))
+    output = console.export_text()
+    assert "gemini-1.5-flash" in output and "gemini-1.5-pro" in output
+    assert "hello" in output and "9 chars" in output
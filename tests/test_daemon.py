@@ -0,0 +1,206 @@
+"""Tests for the resident daemon and its thin client."""
+
+import threading
+import time
+
+import pytest
+
+from gemini_cli.core.daemon import DaemonClient, DaemonError, GeminiDaemon, is_daemon_running
+
+
+class EchoClient:
+    """Minimal GeminiClient stand-in that echoes prompts word by word."""
+
+    MODELS = ["echo-1", "echo-2", "gemini-1.5-flash-8b"]
+    # Slow generations that were stopped before finishing
+    stopped = []
+
+    def __init__(self):
+        self.model_name = "echo-1"
+        self.history = []
+
+    def fork(self):
+        return EchoClient()
+
+    def start_chat(self, history=None):
+        self.history = list(history or [])
+
+    def send_message(self, message, stream=False):
+        self.history.append({"role": "user", "content": message})
+        if message == "slow":
+            yield from self._slow()
+        for word in message.split():
+            yield word + " "
+
+    def _slow(self):
+        finished = False
+        try:
+            for i in range(100):
+                time.sleep(0.02)
+                yield f"{i} "
+            finished = True
+        finally:
+            if not finished:
+                EchoClient.stopped.append(self.model_name)
+
+    def send_message_with_files(self, message, files, stream=False):
+        yield f"{message} ({len(files)} files)"
+
+    def generate_content(self, prompt, stream=False, files=None, use_cache=True, refresh=False):
+        if prompt == "fail":
+            raise RuntimeError("quota exceeded")
+        if prompt == "model?":
+            yield self.model_name
+        for word in prompt.split():
+            yield word.upper() + " "
+
+    def get_history(self):
+        return self.history
+
+    def clear_history(self):
+        self.history = []
+
+    def set_model(self, model):
+        if model not in self.MODELS:
+            raise ValueError(f"Unknown model: {model}")
+        self.model_name = model
+
+    def update_generation_config(self, **kwargs):
+        self.generation_config = dict(getattr(self, "generation_config", {}), **kwargs)
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    """Run a daemon on a temporary socket."""
+    server = GeminiDaemon(EchoClient(), tmp_path / "daemon.sock")
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join(timeout=5)
+
+
+def test_connect_returns_none_without_daemon(tmp_path):
+    assert DaemonClient.connect(tmp_path / "missing.sock") is None
+    assert not is_daemon_running(tmp_path / "missing.sock")
+
+
+def test_generate_content_streams_chunks(daemon):
+    client = DaemonClient.connect(daemon.socket_path)
+    try:
+        assert list(client.generate_content("hello world", stream=True)) == ["HELLO ", "WORLD "]
+        assert client.generate_content("hi", stream=False) == "HI "
+    finally:
+        client.close()
+
+
+def test_errors_are_raised_and_connection_stays_usable(daemon):
+    client = DaemonClient.connect(daemon.socket_path)
+    try:
+        with pytest.raises(DaemonError, match="quota exceeded"):
+            list(client.generate_content("fail", stream=True))
+        with pytest.raises(DaemonError, match="Unknown model"):
+            client.set_model("nope")
+        assert client.generate_content("ok", stream=False) == "OK "
+    finally:
+        client.close()
+
+
+def test_each_connection_has_its_own_chat_session(daemon):
+    first = DaemonClient.connect(daemon.socket_path)
+    second = DaemonClient.connect(daemon.socket_path)
+    try:
+        first.start_chat(history=[{"role": "user", "content": "earlier"}])
+        assert first.send_message("a b", stream=False) == "a b "
+        assert len(first.get_history()) == 2
+        assert second.get_history() == []
+
+        second.set_model("echo-2")
+        assert second.model_name == "echo-2"
+        assert first.model_name == "echo-1"
+    finally:
+        first.close()
+        second.close()
+
+
+def test_configure_applies_the_callers_settings(daemon):
+    client = DaemonClient.connect(daemon.socket_path)
+    try:
+        client.configure("echo-2", {"temperature": 0.2})
+        assert client.model_name == "echo-2"
+        with pytest.raises(DaemonError, match="Unknown model"):
+            client.configure("missing")
+    finally:
+        client.close()
+    assert daemon.client.model_name == "echo-1"
+
+
+def test_summaries_run_on_the_summary_model(daemon):
+    from gemini_cli.utils.summary import client_summarize
+
+    client = DaemonClient.connect(daemon.socket_path)
+    try:
+        assert client.generate_content("model?", model="echo-2").startswith("echo-2")
+        assert client_summarize(client)("model?").startswith("gemini-1.5-flash-8b")
+        assert client.generate_content("model?").startswith("echo-1")
+        with pytest.raises(ValueError):
+            client_summarize(client, "missing")
+    finally:
+        client.close()
+
+
+def test_abandoned_stream_keeps_protocol_in_sync(daemon):
+    client = DaemonClient.connect(daemon.socket_path)
+    try:
+        chunks = client.generate_content("one two three", stream=True)
+        assert next(chunks) == "ONE "
+        chunks.close()
+        assert client.generate_content("next", stream=False) == "NEXT "
+    finally:
+        client.close()
+
+
+def test_stopping_early_hangs_up_instead_of_waiting(daemon):
+    client = DaemonClient.connect(daemon.socket_path)
+    try:
+        client.configure("echo-2", {"temperature": 0.2})
+        client.start_chat(history=[{"role": "user", "content": "earlier"}])
+        assert client.send_message("a b", stream=False) == "a b "
+
+        started = time.monotonic()
+        chunks = client.send_message("slow", stream=True)
+        assert next(chunks) == "0 "
+        chunks.close()
+        assert time.monotonic() - started < 1.0
+
+        # A fresh connection with the same model and chat, minus the unfinished turn
+        assert client.model_name == "echo-2"
+        assert client.generate_content("model?", stream=False).startswith("echo-2")
+        assert [m["content"] for m in client.get_history()] == ["earlier", "a b", "a b "]
+        deadline = time.monotonic() + 1
+        while not EchoClient.stopped and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert EchoClient.stopped == ["echo-2"]
+    finally:
+        client.close()
+
+
+def test_socket_is_owner_only(daemon):
+    assert daemon.socket_path.stat().st_mode & 0o777 == 0o600
+
+
+def test_second_daemon_refuses_live_socket(daemon):
+    with pytest.raises(DaemonError, match="already running"):
+        GeminiDaemon(EchoClient(), daemon.socket_path)
+
+
+def test_stale_socket_is_replaced(tmp_path):
+    stale = tmp_path / "daemon.sock"
+    stale.write_text("")
+    server = GeminiDaemon(EchoClient(), stale)
+    try:
+        assert (stale.stat().st_mode & 0o777) == 0o600
+    finally:
+        server.server_close()
+    assert not stale.exists()
@@ -0,0 +1,90 @@
+"""Tests for streaming history export."""
+
+import csv
+import gzip
+import json
+import time
+import tracemalloc
+import pytest
+
+from gemini_cli.utils.export import (
+    detect_compression, detect_format, export_messages, parse_time, zstd_available
+)
+from gemini_cli.utils.memory import ConversationMemory
+
+
+def _memory(tmp_path, backend="jsonl"):
+    memory = ConversationMemory(data_dir=tmp_path, backend=backend)
+    memory.add_message("user", "first <b>question</b>", timestamp="2024-05-01T10:00:00")
+    memory.add_message("model", 'answer, with "quotes"\nand lines', timestamp="2024-05-02T10:00:00")
+    memory.switch("work")
+    memory.add_message("user", "work question", timestamp="2024-05-03T10:00:00")
+    return memory
+
+
+@pytest.mark.parametrize("backend", ["jsonl", "sqlite"])
+def test_exports_every_format_with_filters(tmp_path, backend):
+    memory = _memory(tmp_path / "data", backend)
+
+    assert memory.export(tmp_path / "all.jsonl") == 3
+    rows = [json.loads(line) for line in (tmp_path / "all.jsonl").read_text().splitlines()]
+    assert {(r["session"], r["content"]) for r in rows} == {
+        ("default", "first <b>question</b>"), ("default", 'answer, with "quotes"\nand lines'), ("work", "work question"),
+    }
+
+    assert memory.export(tmp_path / "default.csv", session="default") == 2
+    with open(tmp_path / "default.csv", newline="", encoding="utf-8") as f:
+        table = list(csv.reader(f))
+    assert table[0] == ["session", "timestamp", "role", "content", "tokens"]
+    assert table[2][3] == 'answer, with "quotes"\nand lines'
+
+    since, until = parse_time("2024-05-02"), parse_time("2024-05-03")
+    assert memory.export(tmp_path / "day.html", since=since, until=until) == 1
+    page = (tmp_path / "day.html").read_text()
+    assert "answer, with &quot;quotes&quot;" in page and page.rstrip().endswith("</html>")
+
+    # /save of the current session: Markdown by default
+    assert memory.export_to_file(tmp_path / "work.md")
+    text = (tmp_path / "work.md").read_text()
+    assert "## USER (2024-05-03T10:00:00)\n\nwork question" in text and "first" not in text
+    memory.close()
+
+
+def test_compression_follows_the_suffix(tmp_path):
+    memory = _memory(tmp_path / "data")
+    assert memory.export(tmp_path / "all.md.gz") == 3
+    with gzip.open(tmp_path / "all.md.gz", "rt", encoding="utf-8") as f:
+        assert f.read().startswith("# Gemini Conversation History")
+
+    if not zstd_available():
+        with pytest.raises(RuntimeError, match="zstandard"):
+            memory.export(tmp_path / "all.jsonl.zst")
+        assert not (tmp_path / "all.jsonl.zst").exists()
+    with pytest.raises(ValueError):
+        memory.export(tmp_path / "x", fmt="pdf")
+    memory.close()
+
+
+def test_names_and_times_are_parsed():
+    assert detect_format("a/chat.jsonl.gz") == "jsonl" and detect_compression("a/chat.jsonl.gz") == "gzip"
+    assert detect_format("chat.HTML") == "html" and detect_format("chat") == "md"
+    assert detect_compression("chat.csv.zst") == "zstd" and detect_compression(None) is None
+    assert abs(parse_time("1h") - (time.time() - 3600)) < 5
+    with pytest.raises(ValueError):
+        parse_time("last tuesday")
+
+
+def test_export_memory_does_not_grow_with_history(tmp_path):
+    def messages(count):
+        for i in range(count):
+            yield {"role": "user", "content": f"message {i} " + "x" * 500, "timestamp": "2024-05-01T10:00:00"}
+
+    tracemalloc.start()
+    try:
+        written = export_messages(messages(20_000), tmp_path / "big.jsonl.gz")
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert written == 20_000
+    # ~10 MB of messages; only the write buffers are held at once
+    assert peak < 3 * 1024 * 1024
@@ -0,0 +1,118 @@
+"""Tests for the offline fake Gemini API."""
+
+import asyncio
+import time
+
+import pytest
+
+from gemini_cli.core.async_client import AsyncGeminiClient
+from gemini_cli.core.client import GeminiClient
+from gemini_cli.core.fake import FakeServer, FakeSettings, FakeTransport
+from gemini_cli.core.resilience import CircuitBreaker, Resilience, RetryPolicy
+from gemini_cli.core.rest import RestError
+
+
+def _client(**settings):
+    transport = FakeTransport(FakeSettings(**settings))
+    client = GeminiClient("key", model="gemini-1.5-flash", backend="auto", transport=transport)
+    return client, transport.api
+
+
+def test_generate_stream_and_chat():
+    client, api = _client(response_chars=100, chunk_size=10)
+
+    text = client.generate_content("hello", use_cache=False)
+    assert text.startswith("Echo: hello. ") and len(text) == 100
+
+    chunks = list(client.generate_content("hello", stream=True, use_cache=False))
+    assert len(chunks) == 10 and "".join(chunks) == text
+
+    "".join(client.send_message("first", stream=True))
+    client.send_message("second")
+    assert [m["role"] for m in client.get_history()] == ["user", "model", "user", "model"]
+    assert client.count_tokens("12345678") == 2
+    assert api.stats["streams"] == 2
+
+
+def test_stream_timing_follows_settings():
+    client, _ = _client(ttft=0.15, chunk_delay=0.02, chunk_size=50, response_chars=200)
+
+    started = time.monotonic()
+    stream = client.generate_content("hi", stream=True, use_cache=False)
+    next(stream)
+    ttft = time.monotonic() - started
+    list(stream)
+    total = time.monotonic() - started
+
+    assert 0.15 <= ttft < 0.5
+    assert total >= ttft + 3 * 0.02
+
+
+def test_upload(tmp_path):
+    client, api = _client()
+    path = tmp_path / "notes.txt"
+    path.write_text("some notes")
+
+    assert client.generate_content("summarize", files=[path], use_cache=False).startswith("Echo: summarize")
+    (result,) = client.last_uploads
+    assert result.ok and result.part.uri.endswith("/v1beta/files/fake-1")
+    assert api.files["files/fake-1"]["mimeType"] == "text/plain"
+
+
+def test_injected_rate_limits_are_retried():
+    client, api = _client(rate_limit_rate=0.5, retry_after=0, seed=7)
+    client.resilience = Resilience(
+        RetryPolicy(max_retries=10, backoff_base=0, backoff_max=0), CircuitBreaker(threshold=0)
+    )
+
+    for _ in range(5):
+        assert client.generate_content("q", use_cache=False).startswith("Echo")
+    assert api.stats["rate_limited"] > 0
+
+
+def test_injected_errors_surface_without_retries():
+    client, _ = _client(error_rate=1.0)
+    client.resilience = Resilience(RetryPolicy(max_retries=0))
+
+    with pytest.raises(RestError, match="503"):
+        client.generate_content("q", use_cache=False)
+
+
+def test_batch_throughput_is_concurrent():
+    client, _ = _client(ttft=0.1, chunk_delay=0.01, response_chars=64)
+    async_client = AsyncGeminiClient.from_client(client, max_concurrency=8)
+
+    started = time.monotonic()
+    texts = asyncio.run(async_client.generate_many([f"q{i}" for i in range(8)]))
+    elapsed = time.monotonic() - started
+
+    assert [t.split(".")[0] for t in texts] == [f"Echo: q{i}" for i in range(8)]
+    assert elapsed < 0.8  # sequentially this takes over 1s
+
+
+def test_each_run_closes_its_async_connections():
+    client, _ = _client(response_chars=20)
+    async_client = AsyncGeminiClient.from_client(client)
+    opened = []
+
+    async def ask():
+        opened.append(client.api.async_client)
+        return await async_client.generate_text("q")
+
+    for _ in range(3):
+        assert async_client.run(ask()).startswith("Echo: q")
+    assert len(set(map(id, opened))) == 3 and all(c.is_closed for c in opened)
+    assert len(client.api._async_clients) == 0
+
+
+def test_local_server(tmp_path):
+    with FakeServer(FakeSettings(response_chars=80, chunk_size=20)) as server:
+        client = GeminiClient("key", model="gemini-1.5-pro", backend="rest", base_url=server.url)
+        chunks = list(client.generate_content("over http", stream=True, use_cache=False))
+
+        path = tmp_path / "a.txt"
+        path.write_text("x")
+        client.generate_content("with file", files=[path], use_cache=False)
+
+    assert len(chunks) == 4 and "".join(chunks).startswith("Echo: over http")
+    assert server.api.stats["uploads"] == 1
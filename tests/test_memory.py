@@ -0,0 +1,181 @@
+"""Tests for conversation memory and token-budgeted context."""
+
+import json
+
+from gemini_cli.core.tokens import context_budget, DEFAULT_INPUT_LIMIT
+from gemini_cli.utils.memory import ConversationMemory
+
+
+def _memory(tmp_path, sizes):
+    memory = ConversationMemory(data_dir=tmp_path)
+    for i, size in enumerate(sizes):
+        memory.add_message("user" if i % 2 == 0 else "model", "x" * size)
+    return memory
+
+
+def test_context_fills_budget_with_recent_messages(tmp_path):
+    # 40 tokens per message
+    memory = _memory(tmp_path, [160] * 30)
+
+    context = memory.get_context_for_api(max_tokens=400)
+    assert len(context) == 10
+    assert context[0]["role"] == "user"
+
+    # Short turns: far more than 10 messages fit
+    assert len(memory.get_context_for_api(max_tokens=10_000)) == 30
+
+
+def test_large_message_is_left_out_and_context_starts_with_user(tmp_path):
+    memory = _memory(tmp_path, [40, 40, 40_000, 40, 40])
+
+    context = memory.get_context_for_api(max_tokens=100)
+    # The pasted log (message 2) does not fit; message 3 is a model reply
+    # and is dropped so the context starts with a user turn
+    assert [len(m["content"]) for m in context] == [40]
+    assert context[0]["role"] == "user"
+
+
+def test_token_counts_are_cached_and_persisted(tmp_path):
+    memory = _memory(tmp_path, [100])
+    assert memory.history[0]["tokens"] == 25
+    memory.save()
+
+    reloaded = ConversationMemory(data_dir=tmp_path)
+    del reloaded.history[0]["tokens"]
+    assert reloaded.message_tokens(reloaded.history[0]) == 25
+    assert reloaded.history[0]["tokens"] == 25
+
+
+def test_exact_counter_shrinks_context(tmp_path):
+    memory = _memory(tmp_path, [40] * 20)
+    calls = []
+
+    def counter(messages):
+        calls.append(len(messages))
+        # The API reports twice the local estimate
+        return sum(len(m["content"]) // 2 for m in messages)
+
+    context = memory.get_context_for_api(max_tokens=100, counter=counter)
+    assert sum(len(m["content"]) // 2 for m in context) <= 100
+    assert context[0]["role"] == "user"
+    assert calls[0] == 10
+
+
+def test_context_budget():
+    assert context_budget("gemini-1.5-flash", 8192) == 1_048_576 - 8192
+    assert context_budget("gemini-1.5-pro", 8192, cap=32_000) == 32_000
+    assert context_budget("unknown-model") == DEFAULT_INPUT_LIMIT
+
+
+def test_save_appends_only_new_messages(tmp_path):
+    memory = _memory(tmp_path, [10, 10])
+    memory.save()
+    size = memory.history_file.stat().st_size
+
+    memory.add_message("user", "y" * 10)
+    memory.save()
+    memory.save()  # nothing new
+
+    lines = memory.history_file.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 3
+    assert memory.history_file.stat().st_size == size + len(lines[-1]) + 1
+
+
+def test_load_reads_tail_and_compaction_trims_log(tmp_path):
+    memory = ConversationMemory(data_dir=tmp_path, max_entries=10)
+    for i in range(50):
+        memory.add_message("user", f"message {i}")
+        memory.save()
+    memory.close()
+
+    assert len(memory.history_file.read_text().splitlines()) <= 20
+    reloaded = ConversationMemory(data_dir=tmp_path, max_entries=10)
+    assert [m["content"] for m in reloaded.history] == [f"message {i}" for i in range(40, 50)]
+
+
+def test_cut_off_line_is_skipped_and_terminated(tmp_path):
+    memory = _memory(tmp_path, [10, 10])
+    memory.save()
+    memory.close()
+    with open(memory.history_file, "a", encoding="utf-8") as f:
+        f.write('{"role": "user", "cont')
+
+    reloaded = ConversationMemory(data_dir=tmp_path)
+    assert len(reloaded.history) == 2
+    reloaded.add_message("user", "after crash")
+    reloaded.close()
+    assert ConversationMemory(data_dir=tmp_path).history[-1]["content"] == "after crash"
+
+
+def test_clear_and_legacy_migration(tmp_path):
+    legacy = [{"role": "user", "content": f"old {i}", "timestamp": ""} for i in range(5)]
+    (tmp_path / "history.json").write_text(json.dumps(legacy), encoding="utf-8")
+
+    memory = ConversationMemory(data_dir=tmp_path, max_entries=3)
+    assert [m["content"] for m in memory.history] == ["old 2", "old 3", "old 4"]
+    assert not (tmp_path / "history.json").exists()
+    assert (tmp_path / "history.json.bak").exists()
+
+    memory.clear()
+    memory.add_message("user", "fresh")
+    memory.close()
+    assert [m["content"] for m in ConversationMemory(data_dir=tmp_path).history] == ["fresh"]
+
+
+def test_sqlite_backend_persists_and_searches(tmp_path):
+    memory = ConversationMemory(data_dir=tmp_path, max_entries=3, backend="sqlite")
+    memory.add_message("user", "How do I enable WAL mode in SQLite?")
+    memory.add_message("model", "Run PRAGMA journal_mode=WAL; SQLite keeps it for the database.")
+    memory.add_message("user", "And full-text search?")
+    memory.add_message("model", "Create an FTS5 virtual table over the content column.")
+    memory.close()
+
+    reloaded = ConversationMemory(data_dir=tmp_path, max_entries=3, backend="sqlite")
+    assert [m["content"][:4] for m in reloaded.history] == ["Run ", "And ", "Crea"]
+    assert reloaded.history[0]["tokens"] > 0
+
+    results = reloaded.search("sqlite wal")
+    assert len(results) == 2 and results[0]["role"] in {"user", "model"}
+    assert "**WAL**" in results[0]["snippet"]
+    # Query syntax is never passed through to FTS5
+    assert reloaded.search('fts5" content:*') == reloaded.search("fts5 content")
+    assert reloaded.search("nothing-here-xyz") == []
+
+
+def test_sqlite_clear_and_import_from_jsonl(tmp_path):
+    jsonl = ConversationMemory(data_dir=tmp_path, max_entries=100)
+    for i in range(5):
+        jsonl.add_message("user", f"note number {i}")
+    jsonl.close()
+    assert jsonl.search("number 3")[0]["snippet"] == "note **number** **3**"
+
+    memory = ConversationMemory(data_dir=tmp_path, max_entries=100, backend="sqlite")
+    assert len(memory.history) == 5
+    assert memory.log.count() == 5
+
+    memory.clear()
+    memory.add_message("user", "fresh start")
+    memory.close()
+    assert [m["content"] for m in ConversationMemory(data_dir=tmp_path, backend="sqlite").history] == ["fresh start"]
+
+
+def test_sqlite_streaming_is_safe_while_another_thread_writes(tmp_path):
+    import threading
+    from gemini_cli.utils.history_db import HistoryDB
+
+    db = HistoryDB(tmp_path / "history.db")
+    db.append({"role": "user", "content": f"old {i}", "timestamp": "t"} for i in range(500))
+
+    def writer():
+        for i in range(200):
+            db.append([{"role": "model", "content": f"new {i}", "timestamp": "t"}])
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    streamed = [message["content"] for message in db.messages()]
+    thread.join()
+
+    # The stream is a consistent snapshot taken when it started
+    assert streamed[:500] == [f"old {i}" for i in range(500)]
+    assert db.count() == 700
+    db.close()
@@ -0,0 +1,85 @@
+"""Tests for compact message records and the ring buffer."""
+
+import sys
+
+import pytest
+
+from gemini_cli.utils.memory import ConversationMemory
+from gemini_cli.utils.messages import Message, MessageBuffer, _Messages, parse_timestamp
+
+
+def _messages(count):
+    return [Message("user", f"m{i}", float(i + 1)) for i in range(count)]
+
+
+def test_ring_overwrites_oldest_and_indexes_from_it():
+    buffer = MessageBuffer(3, _messages(2))
+    assert [m.content for m in buffer] == ["m0", "m1"]
+
+    for message in _messages(5)[2:]:
+        buffer.append(message)
+    assert len(buffer) == 3
+    assert [m.content for m in buffer] == ["m2", "m3", "m4"]
+    assert buffer[0].content == "m2" and buffer[-1].content == "m4"
+    assert [m.content for m in reversed(buffer)] == ["m4", "m3", "m2"]
+    with pytest.raises(IndexError):
+        buffer[3]
+
+    # Initial messages past the capacity keep only the newest
+    assert [m.content for m in MessageBuffer(2, _messages(5))] == ["m3", "m4"]
+    buffer.clear()
+    assert buffer == [] and not buffer
+
+
+def test_slices_are_views():
+    buffer = MessageBuffer(4, _messages(6))
+    view = buffer[-3:]
+    assert [m.content for m in view] == ["m3", "m4", "m5"]
+    assert view[0] is buffer[1]
+    assert [m.content for m in view[1:]] == ["m4", "m5"]
+    assert view[-1].content == "m5" and len(view[5:]) == 0
+    assert [m.content for m in buffer[::2]] == ["m2", "m4"]
+
+    assert not hasattr(view, "__dict__")
+
+
+def test_incomplete_sequence_fails_when_instantiated():
+    class Sized(_Messages):
+        def __len__(self):
+            return 0
+
+    with pytest.raises(TypeError, match="_at"):
+        Sized()
+
+
+def test_records_are_compact_and_dict_compatible():
+    first = Message.from_dict({"role": "".join(["us", "er"]), "content": "hi", "timestamp": "2024-05-01T10:00:00.250000"})
+    second = Message("".join(["us", "er"]), "yo")
+    assert first.role is second.role is sys.intern("user")
+    assert not hasattr(first, "__dict__")
+
+    assert first["content"] == "hi" and first.get("tokens") is None and "tokens" not in first
+    assert first["timestamp"] == "2024-05-01T10:00:00.250000"
+    assert first.ts == parse_timestamp("2024-05-01T10:00:00.250000")
+    first["tokens"] = 3
+    assert first.to_dict() == {"role": "user", "content": "hi", "timestamp": "2024-05-01T10:00:00.250000", "tokens": 3}
+    with pytest.raises(KeyError):
+        first["other"]
+    assert parse_timestamp("not a date") == 0.0 and parse_timestamp(None) == 0.0
+
+
+def test_memory_trims_in_place_and_keeps_unsaved_messages(tmp_path):
+    memory = ConversationMemory(data_dir=tmp_path, max_entries=3)
+    history = memory.history
+    for i in range(5):
+        memory.add_message("user", f"message {i}", timestamp=f"2024-01-01T10:00:0{i}")
+
+    assert memory.history is history
+    assert [m["content"] for m in memory.get_history()] == ["message 2", "message 3", "message 4"]
+    assert [m["content"] for m in memory.get_history(limit=1)] == ["message 4"]
+    memory.close()
+
+    # Every message reached the log, with its timestamp unchanged
+    stored = list(memory.log.messages())
+    assert [m["content"] for m in stored] == [f"message {i}" for i in range(5)]
+    assert stored[0]["timestamp"] == "2024-01-01T10:00:00"
@@ -0,0 +1,137 @@
+"""Tests for per-request latency metrics."""
+
+import io
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from gemini_cli.core import client as client_module
+from gemini_cli.core.client import GeminiClient
+from gemini_cli.core.metrics import (
+    Metrics,
+    MetricsLog,
+    parse_window,
+    percentile,
+    span,
+    summarize,
+    track,
+)
+from gemini_cli.ui.plain import PlainDisplay
+
+
+class StreamingModel:
+    def __init__(self, model_name, generation_config):
+        self.model_name = model_name
+
+    def generate_content(self, content, stream=False):
+        if not stream:
+            return SimpleNamespace(text="whole answer")
+        return iter([SimpleNamespace(text="héllo "), SimpleNamespace(text="world")])
+
+
+@pytest.fixture
+def client(monkeypatch):
+    fake_genai = SimpleNamespace(configure=lambda api_key: None, GenerativeModel=StreamingModel)
+    monkeypatch.setattr(client_module, "GENAI_AVAILABLE", True)
+    monkeypatch.setattr(client_module, "genai", fake_genai)
+    return GeminiClient("key", model="gemini-1.5-flash")
+
+
+def test_client_writes_one_record_per_request(client, tmp_path):
+    log = MetricsLog(tmp_path / "metrics.jsonl")
+    client.request_metrics = Metrics(log, command="serve")
+
+    assert "".join(client.generate_content("hi", stream=True)) == "héllo world"
+    assert client.generate_content("hi") == "whole answer"
+
+    streamed, whole = list(log.read())
+    assert streamed["cmd"] == "serve" and streamed["model"] == "gemini-1.5-flash"
+    assert streamed["ok"] is True
+    assert streamed["n"] == {"chunks": 2, "bytes": len("héllo world".encode())}
+    assert {"ttft", "stream", "total"} <= set(streamed["ms"])
+    assert streamed["ms"]["ttft"] <= streamed["ms"]["total"]
+    assert "generate" in whole["ms"] and whole["n"]["bytes"] == 12
+
+
+def test_cli_scope_collects_client_and_render_spans(client, tmp_path):
+    log = MetricsLog(tmp_path / "metrics.jsonl")
+    metrics = Metrics(log, command="ask")
+    metrics.startup = {"config": 0.004, "init": 0.05}
+    client.request_metrics = metrics
+    display = PlainDisplay(stream=io.StringIO())
+
+    for _ in range(2):
+        with track(metrics, client.model_name):
+            display.print_stream(client.generate_content("hi", stream=True))
+
+    first, second = list(log.read())
+    assert first["cmd"] == "ask"
+    assert {"ttft", "stream", "render", "config", "init"} <= set(first["ms"])
+    assert first["ms"]["config"] == 4.0
+    # Process startup is only charged to the first request
+    assert "config" not in second["ms"]
+
+
+def test_failed_request_is_recorded(tmp_path):
+    log = MetricsLog(tmp_path / "metrics.jsonl")
+    metrics = Metrics(log, command="ask")
+
+    with pytest.raises(ConnectionError):
+        with track(metrics, "gemini-1.5-pro"):
+            with span("generate"):
+                raise ConnectionError("offline")
+
+    (record,) = log.read()
+    assert record["ok"] is False and record["error"] == "ConnectionError"
+    assert "generate" in record["ms"]
+
+
+def test_log_rotates_and_reads_oldest_first(tmp_path):
+    log = MetricsLog(tmp_path / "metrics.jsonl", max_bytes=200, backups=2)
+    for i in range(40):
+        log.append({"ts": i, "cmd": "ask", "ms": {"total": i}})
+
+    assert len(log.files()) == 3
+    records = list(log.read())
+    assert [r["ts"] for r in records] == sorted(r["ts"] for r in records)
+    assert records[-1]["ts"] == 39
+    assert records[0]["ts"] > 0  # oldest rotated file was dropped
+    assert [r["ts"] for r in log.read(since=38)] == [38, 39]
+
+    assert log.clear() == 3
+    assert list(log.read()) == []
+
+
+def test_summarize_percentiles():
+    now = time.time()
+    records = [
+        {"ts": now, "cmd": "ask", "model": "gemini-1.5-flash", "ok": True, "ms": {"total": float(v)}}
+        for v in range(1, 101)
+    ]
+    records.append({"ts": now, "cmd": "chat", "model": "gemini-1.5-pro", "ok": False, "ms": {"total": 9e9}})
+
+    by_model = summarize(records, by="model")
+    assert by_model[0]["group"] == "gemini-1.5-flash"
+    assert by_model[0]["p50"] == pytest.approx(50.5)
+    assert by_model[0]["p99"] == pytest.approx(99.01)
+    # Failures are counted but excluded from latencies
+    assert by_model[1] == {
+        "group": "gemini-1.5-pro", "requests": 1, "errors": 1, "samples": 0,
+        "p50": None, "p95": None, "p99": None,
+    }
+
+    by_command = summarize(records, by="command", span_name="ttft")
+    assert [row["group"] for row in by_command] == ["ask", "chat"]
+    assert by_command[0]["samples"] == 0
+
+    assert percentile([], 50) is None
+    assert percentile([7.0], 99) == 7.0
+
+
+def test_parse_window():
+    assert parse_window("30m") == 1800
+    assert parse_window("24h") == parse_window("24") == 86400
+    assert parse_window("7d") == 604800
+    with pytest.raises(ValueError):
+        parse_window("yesterday")
@@ -0,0 +1,103 @@
+"""Tests for multi-model racing."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from gemini_cli.core.async_client import AsyncGeminiClient
+from gemini_cli.core.race import ModelRace, RaceStats, resolve_models
+
+MODELS = ["gemini-2.0-flash-exp", "gemini-1.5-pro", "gemini-1.5-flash", "gemini-1.5-flash-8b"]
+
+
+class DelayedModel:
+    """Model whose stream starts after `ttft` seconds (or fails)."""
+
+    def __init__(self, name, ttft, log, fail=False):
+        self.name = name
+        self.ttft = ttft
+        self.log = log
+        self.fail = fail
+
+    async def generate_content_async(self, prompt, stream=False):
+        return self._stream(prompt)
+
+    async def _stream(self, prompt):
+        try:
+            await asyncio.sleep(self.ttft)
+            if self.fail:
+                raise ConnectionError(f"{self.name} unavailable")
+            for word in [self.name, prompt]:
+                yield SimpleNamespace(text=word + " ")
+                await asyncio.sleep(0.01)
+            self.log.append(("finished", self.name))
+        except asyncio.CancelledError:
+            self.log.append(("cancelled", self.name))
+            raise
+
+
+class RaceClient:
+    MODELS = MODELS
+    model_name = MODELS[0]
+
+    def __init__(self, ttfts, failing=()):
+        self.log = []
+        self.models = {
+            name: DelayedModel(name, ttft, self.log, fail=name in failing)
+            for name, ttft in ttfts.items()
+        }
+
+    def get_model(self, model=None, generation_config=None):
+        return self.models[model]
+
+
+def _race(client, models, stats=None):
+    race = ModelRace(AsyncGeminiClient.from_client(client), models, stats)
+
+    async def run():
+        return [chunk async for chunk in race.run("prompt")]
+
+    return race, asyncio.run(run())
+
+
+def test_fastest_model_wins_and_others_are_cancelled(tmp_path):
+    client = RaceClient({"gemini-1.5-pro": 0.3, "gemini-1.5-flash": 0.01})
+    stats = RaceStats(tmp_path / "race.json")
+
+    race, chunks = _race(client, ["gemini-1.5-pro", "gemini-1.5-flash"], stats)
+
+    assert chunks == ["gemini-1.5-flash ", "prompt "]
+    assert race.winner == "gemini-1.5-flash"
+    assert race.ttft < 0.3
+    assert ("cancelled", "gemini-1.5-pro") in client.log
+    assert ("finished", "gemini-1.5-pro") not in client.log
+
+    summary = stats.summary()
+    assert summary[0]["model"] == "gemini-1.5-flash"
+    assert summary[0]["wins"] == 1 and summary[1]["races"] == 1
+
+
+def test_failed_entrant_drops_out():
+    client = RaceClient({"gemini-1.5-pro": 0.05, "gemini-1.5-flash": 0.0}, failing={"gemini-1.5-flash"})
+
+    race, chunks = _race(client, ["gemini-1.5-pro", "gemini-1.5-flash"])
+
+    assert race.winner == "gemini-1.5-pro"
+    assert chunks[0] == "gemini-1.5-pro "
+    assert isinstance(race.errors["gemini-1.5-flash"], ConnectionError)
+
+
+def test_all_entrants_failing_raises():
+    client = RaceClient({"gemini-1.5-pro": 0.0, "gemini-1.5-flash": 0.0}, failing=set(MODELS))
+    with pytest.raises(ConnectionError):
+        _race(client, ["gemini-1.5-pro", "gemini-1.5-flash"])
+
+
+def test_resolve_models():
+    assert resolve_models("1.5-flash, 2.0-flash-exp", MODELS) == ["gemini-1.5-flash", "gemini-2.0-flash-exp"]
+    assert resolve_models("gemini-1.5-pro,8b", MODELS) == ["gemini-1.5-pro", "gemini-1.5-flash-8b"]
+    with pytest.raises(ValueError, match="at least 2"):
+        resolve_models("1.5-pro,1.5-pro", MODELS)
+    with pytest.raises(ValueError, match="Ambiguous"):
+        resolve_models("flash,1.5-pro", MODELS)
@@ -0,0 +1,126 @@
+"""Tests for the cross-process RPM/TPM rate limiter."""
+
+import asyncio
+import multiprocessing
+import time
+
+import pytest
+
+from gemini_cli.core.ratelimit import RateLimiter
+from gemini_cli.core.resilience import Resilience, RetryPolicy
+from gemini_cli.core.tokens import estimate_content_tokens, estimate_tokens
+
+
+class ResourceExhausted(Exception):
+    """Mimics google.api_core.exceptions.ResourceExhausted (HTTP 429)."""
+    code = 429
+
+
+def _take(state_file, results):
+    limiter = RateLimiter(state_file, rpm=10, tpm=0)
+    results.put(sum(1 for _ in range(10) if not limiter.try_acquire("m")))
+
+
+def test_request_bucket_empties_and_reports_wait(tmp_path):
+    limiter = RateLimiter(tmp_path / "ratelimit.json", rpm=3, tpm=0)
+
+    assert [limiter.try_acquire("m") for _ in range(3)] == [0, 0, 0]
+    wait = limiter.try_acquire("m")
+    assert 0 < wait <= 20
+
+    # Models have independent buckets
+    assert limiter.try_acquire("other") == 0
+
+
+def test_token_bucket_limits_large_requests(tmp_path):
+    limiter = RateLimiter(tmp_path / "ratelimit.json", rpm=0, tpm=600)
+
+    assert limiter.try_acquire("m", tokens=500) == 0
+    wait = limiter.try_acquire("m", tokens=200)
+    assert wait == pytest.approx(10, abs=0.5)
+
+    limiter.record_tokens("m", 200)
+    assert limiter.status()["m"]["tokens"] < 0
+
+
+def test_per_model_overrides(tmp_path):
+    limiter = RateLimiter(tmp_path / "ratelimit.json", rpm=60,
+                          model_limits={"gemini-1.5-pro": {"rpm": 2}})
+    assert limiter.limits("gemini-1.5-pro") == (2, 1_000_000)
+    assert limiter.limits("gemini-1.5-flash") == (60, 1_000_000)
+
+
+def test_state_is_shared_across_processes(tmp_path):
+    state_file = tmp_path / "ratelimit.json"
+    results = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=_take, args=(state_file, results)) for _ in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(10)
+
+    # Refill during the run may grant a fraction of an extra request at most
+    granted = sum(results.get(timeout=1) for _ in workers)
+    assert 10 <= granted <= 11
+
+
+def test_quota_error_slows_down_then_recovers(tmp_path):
+    limiter = RateLimiter(tmp_path / "ratelimit.json", rpm=60, tpm=0)
+    permit = limiter.permit("m")
+
+    permit.failed(ResourceExhausted("quota"))
+    bucket = limiter.status()["m"]
+    assert bucket["scale"] == 0.5
+    assert limiter.try_acquire("m") > 0
+
+    permit.failed(ValueError("not a quota error"))
+    assert limiter.status()["m"]["scale"] == 0.5
+
+    for _ in range(20):
+        permit.succeeded()
+    assert limiter.status()["m"]["scale"] == 1.0
+
+
+def test_resilience_waits_on_permit_outside_deadline(tmp_path):
+    limiter = RateLimiter(tmp_path / "ratelimit.json", rpm=300, tpm=0)
+    while not limiter.try_acquire("m"):
+        pass
+    limiter.report_quota_error("m", retry_after=0.2)
+    resilience = Resilience(RetryPolicy(read_timeout=0.05))
+    permit = limiter.permit("m")
+
+    started = time.monotonic()
+    assert resilience.call(lambda: "ok", permit=permit) == "ok"
+    # Waited for quota although the read deadline is 0.05s
+    assert permit.waited >= 0.15
+    assert time.monotonic() - started >= 0.15
+
+
+def test_resilience_reports_quota_errors_to_permit(tmp_path):
+    limiter = RateLimiter(tmp_path / "ratelimit.json", rpm=6000, tpm=0)
+    resilience = Resilience(RetryPolicy(max_retries=2, backoff_base=0.001, backoff_max=0.001))
+    calls = []
+
+    def call():
+        calls.append(1)
+        if len(calls) == 1:
+            raise ResourceExhausted("quota")
+        return "ok"
+
+    async def stream():
+        yield "chunk"
+
+    assert resilience.call(call, permit=limiter.permit("m")) == "ok"
+    assert limiter.status()["m"]["scale"] == pytest.approx(0.55)
+
+    async def run():
+        return [c async for c in resilience.astream(stream, permit=limiter.permit("m"))]
+
+    assert asyncio.run(run()) == ["chunk"]
+
+
+def test_token_estimates():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd") == 1
+    assert estimate_tokens("abcde") == 2
+    assert estimate_content_tokens(["abcd", {"file_data": {}}]) == 1 + 258
@@ -0,0 +1,257 @@
+"""Tests for retries, deadlines, circuit breaking and hedging."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from gemini_cli.core.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RequestTimeout,
+    Resilience,
+    RetryPolicy,
+    is_transient,
+)
+
+
+class ResourceExhausted(Exception):
+    """Mimics google.api_core.exceptions.ResourceExhausted (HTTP 429)."""
+    code = 429
+
+
+class InvalidArgument(Exception):
+    code = 400
+
+
+def fast_policy(**overrides):
+    settings = dict(max_retries=3, backoff_base=0.001, backoff_max=0.001,
+                    connect_timeout=0.5, read_timeout=0.5)
+    settings.update(overrides)
+    return RetryPolicy(**settings)
+
+
+def flaky(failures, result="ok"):
+    """Callable that raises 429 `failures` times, then returns result."""
+    state = {"calls": 0}
+
+    def call():
+        state["calls"] += 1
+        if state["calls"] <= failures:
+            raise ResourceExhausted("quota")
+        return result
+
+    call.state = state
+    return call
+
+
+def test_is_transient_classification():
+    assert is_transient(ResourceExhausted())
+    assert is_transient(TimeoutError())
+    assert is_transient(ConnectionResetError())
+    assert not is_transient(InvalidArgument())
+    assert not is_transient(ValueError())
+
+
+def test_call_retries_transient_errors():
+    resilience = Resilience(fast_policy())
+    call = flaky(2)
+
+    assert resilience.call(call) == "ok"
+    assert call.state["calls"] == 3
+    assert resilience.metrics()["retries"] == 2
+
+
+def test_call_gives_up_on_permanent_errors():
+    resilience = Resilience(fast_policy())
+
+    def bad():
+        raise InvalidArgument("bad request")
+
+    with pytest.raises(InvalidArgument):
+        resilience.call(bad)
+    assert resilience.metrics()["retries"] == 0
+    assert resilience.metrics()["failures"] == 1
+
+
+def test_breaker_opens_and_fails_fast():
+    breaker = CircuitBreaker(threshold=2, cooldown=60)
+    resilience = Resilience(fast_policy(max_retries=5), breaker)
+
+    with pytest.raises(CircuitOpenError):
+        resilience.call(flaky(10))
+    assert breaker.state == CircuitBreaker.OPEN
+
+    call = flaky(0)
+    with pytest.raises(CircuitOpenError):
+        resilience.call(call)
+    assert call.state["calls"] == 0
+    assert resilience.metrics()["rejected"] == 2
+
+
+def test_breaker_half_opens_after_cooldown():
+    breaker = CircuitBreaker(threshold=1, cooldown=0.01)
+    resilience = Resilience(fast_policy(max_retries=0), breaker)
+    with pytest.raises(ResourceExhausted):
+        resilience.call(flaky(1))
+
+    time.sleep(0.02)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert resilience.call(flaky(0)) == "ok"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_breaker_lets_a_single_trial_through():
+    breaker = CircuitBreaker(threshold=1, cooldown=0.05)
+    resilience = Resilience(fast_policy(max_retries=0), breaker)
+    with pytest.raises(ResourceExhausted):
+        resilience.call(flaky(1))
+    time.sleep(0.06)
+
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def slow_trial():
+        calls.append(1)
+        release.wait(1)
+        return "ok"
+
+    def caller():
+        try:
+            results.append(resilience.call(slow_trial))
+        except CircuitOpenError:
+            results.append("rejected")
+
+    threads = [threading.Thread(target=caller) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert sorted(results) == ["ok"] + ["rejected"] * 7
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    # A trial ended by a client error lets the next call be the trial
+    breaker.record_failure()
+    time.sleep(0.06)
+    with pytest.raises(InvalidArgument):
+        resilience.call(lambda: (_ for _ in ()).throw(InvalidArgument("bad")))
+    assert resilience.call(flaky(0)) == "ok"
+
+
+def test_timed_out_call_is_not_repeated_unless_idempotent():
+    resilience = Resilience(fast_policy(max_retries=2))
+    calls = []
+
+    def timing_out():
+        calls.append(1)
+        raise TimeoutError("read timed out")
+
+    with pytest.raises(TimeoutError):
+        resilience.call(timing_out, idempotent=False)
+    assert len(calls) == 1
+
+    # The call's own read timeout: the attempt is over, so it is retried
+    with pytest.raises(TimeoutError):
+        resilience.call(timing_out)
+    assert len(calls) == 1 + 2
+
+
+def test_call_past_total_deadline_is_never_repeated():
+    resilience = Resilience(fast_policy(read_timeout=0.01, total_timeout=0.05, max_retries=2))
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return "late"
+
+    # Longer than read_timeout is fine; total_timeout is the deadline
+    assert Resilience(fast_policy(read_timeout=0.01, total_timeout=1)).call(lambda: time.sleep(0.05) or "ok") == "ok"
+    with pytest.raises(RequestTimeout):
+        resilience.call(slow)
+    assert len(calls) == 1
+    assert resilience.metrics()["timeouts"] == 1
+
+
+def test_stream_retries_before_first_chunk_only():
+    resilience = Resilience(fast_policy())
+    attempts = []
+
+    def factory():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ResourceExhausted("quota")
+
+        def chunks():
+            yield "a"
+            yield "b"
+            raise ResourceExhausted("mid-stream")
+        return chunks()
+
+    stream = resilience.stream(factory)
+    assert next(stream) == "a"
+    assert next(stream) == "b"
+    with pytest.raises(ResourceExhausted):
+        next(stream)
+    assert len(attempts) == 2
+
+
+def test_stream_read_deadline():
+    resilience = Resilience(fast_policy(read_timeout=0.05))
+
+    def factory():
+        def chunks():
+            yield "first"
+            time.sleep(0.3)
+            yield "too late"
+        return chunks()
+
+    stream = resilience.stream(factory)
+    assert next(stream) == "first"
+    with pytest.raises(RequestTimeout):
+        next(stream)
+
+
+def test_hedged_request_wins_when_first_is_slow():
+    resilience = Resilience(fast_policy(connect_timeout=2), hedge=True, hedge_min_samples=3)
+    for _ in range(5):
+        resilience._record_ttft(0.01)
+    attempts = []
+
+    def factory():
+        attempts.append(1)
+        delay = 1.0 if len(attempts) == 1 else 0.0
+
+        def chunks():
+            time.sleep(delay)
+            yield f"reply {len(attempts)}"
+        return chunks()
+
+    started = time.monotonic()
+    assert list(resilience.stream(factory, hedge=True)) == ["reply 2"]
+    assert time.monotonic() - started < 0.5
+    assert resilience.metrics()["hedge_wins"] == 1
+
+
+def test_astream_retries_and_yields():
+    resilience = Resilience(fast_policy())
+    attempts = []
+
+    async def chunks():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ResourceExhausted("quota")
+        yield "x"
+        yield "y"
+
+    async def run():
+        return [chunk async for chunk in resilience.astream(chunks)]
+
+    assert asyncio.run(run()) == ["x", "y"]
+    assert len(attempts) == 3
@@ -0,0 +1,161 @@
+"""Tests for the httpx REST transport."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from gemini_cli.core.resilience import is_transient, status_code
+from gemini_cli.core.rest import RestError, RestTransport, parse_sse
+
+
+def _reply(text):
+    return {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}]}
+
+
+def _sse(*texts):
+    return "".join(f"data: {json.dumps(_reply(t))}\r\n\r\n" for t in texts)
+
+
+class FakeAPI:
+    """Minimal Generative Language API for httpx.MockTransport."""
+
+    def __init__(self):
+        self.requests = []
+
+    def __call__(self, request):
+        self.requests.append(request)
+        path = request.url.path
+        if path.endswith(":streamGenerateContent"):
+            body = json.loads(request.content)
+            last = body["contents"][-1]["parts"][0]["text"]
+            return httpx.Response(200, text=_sse("echo ", last),
+                                  headers={"content-type": "text/event-stream"})
+        if path.endswith(":generateContent"):
+            if b"quota" in request.content:
+                return httpx.Response(429, json={"error": {"message": "Resource exhausted"}},
+                                      headers={"retry-after": "7"})
+            return httpx.Response(200, json=_reply("full reply"))
+        if path.endswith(":countTokens"):
+            return httpx.Response(200, json={"totalTokens": 42})
+        if path == "/upload/v1beta/files":
+            if request.headers.get("x-goog-upload-command") == "start":
+                return httpx.Response(200, headers={"x-goog-upload-url": "https://upload.invalid/u1"})
+        if request.url.host == "upload.invalid":
+            return httpx.Response(200, json={"file": {
+                "name": "files/abc",
+                "uri": "https://example.invalid/files/abc",
+                "mimeType": "text/plain",
+                "expirationTime": "2030-01-01T00:00:00.000000Z",
+            }})
+        return httpx.Response(404, json={"error": {"message": "not found"}})
+
+
+@pytest.fixture
+def api():
+    fake = FakeAPI()
+    return fake, RestTransport("key", transport=httpx.MockTransport(fake))
+
+
+def test_generate_sends_key_config_and_gzip(api):
+    fake, transport = api
+    model = transport.GenerativeModel("gemini-1.5-flash", {"temperature": 0.2, "max_output_tokens": 10})
+
+    assert model.generate_content("hello").text == "full reply"
+
+    request = fake.requests[0]
+    assert request.url.path == "/v1beta/models/gemini-1.5-flash:generateContent"
+    assert request.headers["x-goog-api-key"] == "key"
+    assert "gzip" in request.headers["accept-encoding"]
+    body = json.loads(request.content)
+    assert body["generationConfig"] == {"temperature": 0.2, "maxOutputTokens": 10}
+    assert body["contents"] == [{"role": "user", "parts": [{"text": "hello"}]}]
+
+
+def test_stream_chat_updates_history(api):
+    fake, transport = api
+    chat = transport.GenerativeModel("gemini-1.5-flash").start_chat(
+        history=[{"role": "user", "parts": ["hi"]}, {"role": "model", "parts": ["hello"]}]
+    )
+
+    chunks = [chunk.text for chunk in chat.send_message("ping", stream=True)]
+
+    assert chunks == ["echo ", "ping"]
+    assert fake.requests[0].url.params["alt"] == "sse"
+    assert len(json.loads(fake.requests[0].content)["contents"]) == 3
+    assert [(m.role, m.parts[0].text) for m in chat.history[-2:]] == [("user", "ping"), ("model", "echo ping")]
+
+
+def test_async_stream(api):
+    _, transport = api
+    model = transport.GenerativeModel("gemini-1.5-flash")
+
+    async def run():
+        response = await model.generate_content_async("async", stream=True)
+        return [chunk.text async for chunk in response]
+
+    assert asyncio.run(run()) == ["echo ", "async"]
+
+
+def test_errors_carry_status_for_retries(api):
+    _, transport = api
+    model = transport.GenerativeModel("gemini-1.5-flash")
+
+    with pytest.raises(RestError) as excinfo:
+        model.generate_content("quota please")
+    assert status_code(excinfo.value) == 429
+    assert is_transient(excinfo.value)
+    assert excinfo.value.response.headers["retry-after"] == "7"
+
+
+def test_files_and_count_tokens(api, tmp_path):
+    fake, transport = api
+    path = tmp_path / "notes.txt"
+    path.write_text("some notes")
+
+    handle = transport.upload_file(path=str(path))
+    assert handle.uri.endswith("/files/abc")
+    assert handle.expiration_time.year == 2030
+
+    model = transport.GenerativeModel("gemini-1.5-flash")
+    model.generate_content(["describe", {"file_data": {"mime_type": handle.mime_type, "file_uri": handle.uri}}])
+    parts = json.loads(fake.requests[-1].content)["contents"][0]["parts"]
+    assert parts[1] == {"fileData": {"mimeType": "text/plain", "fileUri": handle.uri}}
+
+    assert model.count_tokens([{"role": "user", "parts": ["hi"]}]).total_tokens == 42
+
+
+def test_sse_parser_handles_multiline_and_trailing_events():
+    lines = ["data: {\"a\":", "data: 1}", "", ": comment", "data: {\"b\": 2}"]
+    assert list(parse_sse(lines)) == [{"a": 1}, {"b": 2}]
+
+
+def test_client_passes_its_timeout_to_the_transport():
+    from gemini_cli.core.client import GeminiClient
+
+    client = GeminiClient("key", backend="rest", transport=httpx.MockTransport(FakeAPI()), timeout=5)
+    assert client.api.timeout.read == 5
+
+
+def test_close_closes_async_clients_left_on_open_loops(api):
+    _, transport = api
+
+    async def open_client():
+        return transport.async_client
+
+    loop = asyncio.new_event_loop()
+    try:
+        client = loop.run_until_complete(open_client())
+        transport.close()
+        assert client.is_closed
+    finally:
+        loop.close()
+
+    # A loop that closed without aclose() leaves nothing to close it on
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(open_client())
+    loop.close()
+    with pytest.raises(RuntimeError, match="aclose"):
+        transport.close()
+    assert len(transport._async_clients) == 0
@@ -0,0 +1,86 @@
+"""Tests for named conversation sessions and the session index."""
+
+import pytest
+
+from gemini_cli.utils.memory import ConversationMemory
+from gemini_cli.utils.sessions import SessionIndex, validate_session_name
+
+
+def test_index_records_totals_and_orders_by_activity(tmp_path):
+    index = SessionIndex(tmp_path / "sessions.json")
+    index.record("a", [{"content": "x" * 40, "timestamp": "2024-01-01T10:00:00"}])
+    index.record("b", [{"content": "y", "tokens": 7, "timestamp": "2024-01-02T10:00:00"}])
+    index.record("a", [{"content": "z" * 4, "timestamp": "2024-01-03T10:00:00"}])
+
+    assert [s["name"] for s in index.list()] == ["a", "b"]
+    assert index.get("a")["messages"] == 2 and index.get("a")["tokens"] == 11
+    assert index.get("b")["tokens"] == 7
+
+    index.reset("a")
+    assert index.get("a")["messages"] == 0
+    assert index.get("missing") is None
+
+
+def test_session_names_are_validated(tmp_path):
+    assert validate_session_name("proj-1.notes") == "proj-1.notes"
+    for name in ["", "../escape", ".hidden", "a/b", "x" * 65]:
+        with pytest.raises(ValueError):
+            validate_session_name(name)
+    with pytest.raises(ValueError):
+        ConversationMemory(data_dir=tmp_path, session="no spaces")
+
+
+@pytest.mark.parametrize("backend", ["jsonl", "sqlite"])
+def test_sessions_are_kept_apart(tmp_path, backend):
+    memory = ConversationMemory(data_dir=tmp_path, backend=backend)
+    memory.add_message("user", "default question")
+    memory.save()
+
+    memory.switch("project")
+    assert memory.history == []
+    memory.add_message("user", "project question")
+    memory.add_message("model", "project answer")
+    memory.switch("default")
+    assert [m["content"] for m in memory.history] == ["default question"]
+    memory.close()
+
+    reopened = ConversationMemory(data_dir=tmp_path, backend=backend, session="project")
+    assert [m["content"] for m in reopened.history] == ["project question", "project answer"]
+    assert {s["name"]: s["messages"] for s in reopened.sessions.list()} == {"default": 1, "project": 2}
+
+    assert {r["session"] for r in reopened.search("question")} == {"default", "project"}
+    assert [r["session"] for r in reopened.search("question", session="default")] == ["default"]
+
+    reopened.clear()
+    reopened.close()
+    assert reopened.sessions.get("project")["messages"] == 0
+
+
+def test_existing_history_is_indexed_and_imported(tmp_path):
+    legacy = ConversationMemory(data_dir=tmp_path)
+    legacy.add_message("user", "kept from before")
+    legacy.switch("notes")
+    legacy.add_message("user", "note one")
+    legacy.close()
+    (tmp_path / "sessions.json").unlink()
+
+    memory = ConversationMemory(data_dir=tmp_path)
+    assert memory.sessions.get("default")["messages"] == 1
+
+    # Switching backends imports every session's log into the database
+    database = ConversationMemory(data_dir=tmp_path, backend="sqlite", session="notes")
+    assert [m["content"] for m in database.history] == ["note one"]
+    assert database.log.count() == 2
+
+
+def test_index_matches_history_after_compaction(tmp_path):
+    memory = ConversationMemory(data_dir=tmp_path, max_entries=3)
+    for i in range(10):
+        memory.add_message("user", f"message {i} " + "x" * 40)
+        memory.save()
+    memory.close()
+
+    stored = list(memory.log.messages())
+    entry = memory.sessions.get("default")
+    assert len(stored) < 10 and entry["messages"] == len(stored)
+    assert entry["tokens"] == sum(message["tokens"] for message in stored)
@@ -0,0 +1,159 @@
+"""Tests for coalescing identical in-flight requests."""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from gemini_cli.core.async_client import AsyncGeminiClient
+from gemini_cli.core.client import GeminiClient
+from gemini_cli.core.fake import FakeSettings, FakeTransport
+from gemini_cli.core.singleflight import AsyncSingleFlight, SingleFlight
+
+
+def _upstream(calls, chunks=("a", "b", "c"), delay=0.02, closed=None):
+    def factory():
+        calls.append(1)
+        try:
+            for chunk in chunks:
+                time.sleep(delay)
+                yield chunk
+        finally:
+            if closed is not None:
+                closed.set()
+    return factory
+
+
+def test_threads_share_one_upstream_call():
+    group = SingleFlight()
+    calls = []
+    barrier = threading.Barrier(4)
+
+    def consume():
+        barrier.wait()
+        return "".join(group.subscribe("key", _upstream(calls, delay=0.05)))
+
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(lambda _: consume(), range(4)))
+
+    assert results == ["abc"] * 4
+    assert len(calls) == 1
+    assert group.stats == {"flights": 1, "coalesced": 3, "cancelled": 0}
+    assert group.in_flight() == 0
+
+
+def test_last_subscriber_leaving_cancels_upstream():
+    group = SingleFlight()
+    calls = []
+    closed = threading.Event()
+    factory = _upstream(calls, chunks=["x"] * 100, delay=0.01, closed=closed)
+
+    first = group.subscribe("key", factory)
+    second = group.subscribe("key", factory)
+    assert next(first) == "x" and next(second) == "x"
+
+    first.close()
+    assert not closed.wait(0.05)  # a follower is still reading
+    assert next(second) == "x"
+
+    second.close()
+    assert closed.wait(1)
+    assert group.stats["cancelled"] == 1
+    assert len(calls) == 1
+
+    # A new caller starts a fresh flight rather than joining the dead one
+    assert list(group.subscribe("key", _upstream(calls, chunks=["y"], delay=0))) == ["y"]
+    assert len(calls) == 2
+
+
+def test_errors_fan_out_to_every_subscriber():
+    group = SingleFlight()
+    release = threading.Event()
+
+    def failing():
+        yield "partial"
+        release.wait(1)
+        raise RuntimeError("upstream failed")
+
+    first = group.subscribe("key", failing)
+    second = group.subscribe("key", failing)
+    assert next(first) == "partial" and next(second) == "partial"
+    release.set()
+
+    for subscriber in (first, second):
+        with pytest.raises(RuntimeError, match="upstream failed"):
+            list(subscriber)
+    assert group.stats == {"flights": 1, "coalesced": 1, "cancelled": 0}
+
+
+def test_client_coalesces_concurrent_identical_requests():
+    transport = FakeTransport(FakeSettings(ttft=0.1, response_chars=64, chunk_size=8))
+    client = GeminiClient("key", model="gemini-1.5-flash", backend="rest", transport=transport)
+    client.inflight = SingleFlight()
+
+    def ask(stream):
+        result = client.generate_content("same question", stream=stream, use_cache=False)
+        return "".join(result) if stream else result
+
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(ask, [True, True, False, False]))
+
+    # Streamed and non-streamed callers share the same flight
+    assert len(set(results)) == 1 and results[0].startswith("Echo: same question")
+    assert transport.api.stats["requests"] == 1
+    assert client.inflight.stats == {"flights": 1, "coalesced": 3, "cancelled": 0}
+
+    client.generate_content("other question", use_cache=False)
+    assert transport.api.stats["requests"] == 2
+
+
+def test_async_batch_with_identical_prompts_makes_one_call():
+    transport = FakeTransport(FakeSettings(ttft=0.05, chunk_delay=0.01, response_chars=64, chunk_size=8))
+    client = GeminiClient("key", model="gemini-1.5-flash", backend="rest", transport=transport)
+    client.inflight = SingleFlight()
+
+    async def run():
+        async_client = AsyncGeminiClient.from_client(client)
+        return await async_client.generate_many(["repeat me"] * 5), async_client._flights.stats
+
+    results, stats = asyncio.run(run())
+
+    assert len(set(results)) == 1 and len(results) == 5
+    assert transport.api.stats["streams"] == 1
+    assert stats == {"flights": 1, "coalesced": 4, "cancelled": 0}
+
+
+def test_async_cancelling_all_subscribers_cancels_upstream():
+    async def run():
+        group = AsyncSingleFlight()
+        finished = asyncio.Event()
+
+        async def upstream():
+            try:
+                while True:
+                    await asyncio.sleep(0.01)
+                    yield "x"
+            finally:
+                finished.set()
+
+        async def consume():
+            async for _ in group.subscribe("key", upstream):
+                pass
+
+        tasks = [asyncio.create_task(consume()) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        tasks[0].cancel()
+        await asyncio.sleep(0.03)
+        assert not finished.is_set()
+
+        for task in tasks[1:]:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await asyncio.wait_for(finished.wait(), 1)
+        return group
+
+    group = asyncio.run(run())
+    assert group.stats == {"flights": 1, "coalesced": 2, "cancelled": 1}
+    assert group.in_flight() == 0
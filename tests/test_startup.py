@@ -0,0 +1,83 @@
+"""Import-budget regression tests for non-API CLI commands."""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+# Modules that only API/interactive commands may load
+HEAVY_MODULES = (
+    "rich",
+    "prompt_toolkit",
+    "google.generativeai",
+    "gemini_cli.core.client",
+    "gemini_cli.ui.display",
+    "gemini_cli.ui.chat",
+)
+
+# Wall-clock budget (seconds) for imports a command adds on top of bare Python
+IMPORT_BUDGET = 0.15
+
+
+def _import_profile(args, home):
+    """
+    Run Python under `-X importtime` and collect per-module self times.
+
+    Returns:
+        Dict mapping module name to self import time in seconds
+    """
+    env = dict(os.environ, HOME=str(home))
+    env.pop("GEMINI_API_KEY", None)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=False,
+    )
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _cumulative, name = line[len("import time:"):].split("|")
+        profile[name.strip()] = int(self_us) / 1_000_000
+    return profile
+
+
+@pytest.fixture(scope="module")
+def baseline(tmp_path_factory):
+    """Modules Python imports on its own before running any command."""
+    return _import_profile(["-c", "pass"], tmp_path_factory.mktemp("home"))
+
+
+@pytest.mark.parametrize("command", [
+    ["--version"],
+    ["--help"],
+    ["config", "show"],
+    ["doctor"],
+    ["stats"],
+    ["history", "search", "termux"],
+    ["history", "export", "--format", "jsonl"],
+])
+def test_command_import_budget(command, baseline, tmp_path):
+    """Non-API commands must not load heavy UI/SDK modules."""
+    profile = _import_profile(["-m", "gemini_cli.main", *command], tmp_path)
+    added = {name: cost for name, cost in profile.items() if name not in baseline}
+
+    loaded_heavy = [
+        name for name in added
+        if any(name == heavy or name.startswith(heavy + ".") for heavy in HEAVY_MODULES)
+    ]
+    assert loaded_heavy == []
+    assert sum(added.values()) < IMPORT_BUDGET, sorted(
+        added.items(), key=lambda item: item[1], reverse=True
+    )[:10]
+
+
+def test_version_skips_config_import(baseline, tmp_path):
+    """`--version` should not even parse config.toml."""
+    profile = _import_profile(["-m", "gemini_cli.main", "--version"], tmp_path)
+    assert "toml" not in profile
+    assert "gemini_cli.core.config" not in profile
@@ -0,0 +1,84 @@
+"""Tests for frame-rate-limited stream rendering."""
+
+import io
+import threading
+import time
+
+from gemini_cli.ui.plain import PlainDisplay
+from gemini_cli.ui.stream import StreamRenderer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_chunks_are_coalesced_into_frames():
+    writes = []
+    clock = FakeClock()
+    renderer = StreamRenderer(writes.append, fps=10, flush_bytes=1000, clock=clock)
+
+    renderer.feed("a")          # first chunk shows immediately
+    for chunk in "bcd":
+        clock.now += 0.02
+        renderer.feed(chunk)    # within the frame: buffered
+    clock.now += 0.05
+    renderer.feed("e")          # frame due
+    text = renderer.close()
+
+    assert writes == ["a", "bcde"]
+    assert text == "abcde"
+
+
+def test_byte_threshold_forces_flush():
+    writes = []
+    clock = FakeClock()
+    renderer = StreamRenderer(writes.append, fps=1, flush_bytes=4, clock=clock)
+
+    for chunk in ["x", "yy", "zz", "w"]:
+        renderer.feed(chunk)
+    renderer.close()
+
+    assert writes == ["x", "yyzz", "w"]
+
+
+def test_frames_are_written_on_the_callers_thread():
+    writes = []
+    renderer = StreamRenderer(lambda text: writes.append((text, threading.get_ident())), fps=50)
+    threads = threading.active_count()
+
+    renderer.feed("first ")
+    renderer.feed("second")
+    time.sleep(0.05)
+    assert threading.active_count() == threads
+    assert [text for text, _ in writes] == ["first "]
+
+    # Written by the next chunk once the frame is due, or by close()
+    renderer.feed(" third")
+    renderer.feed(" fourth")
+    renderer.close()
+    assert [text for text, _ in writes] == ["first ", "second third", " fourth"]
+    assert {thread for _, thread in writes} == {threading.get_ident()}
+
+
+def test_plain_display_print_stream():
+    out = io.StringIO()
+    display = PlainDisplay(stream=out, stream_fps=0)
+
+    text = display.print_stream(iter(["[bold]not markup[/bold]", " done"]))
+
+    assert text == "[bold]not markup[/bold] done"
+    assert out.getvalue() == "[bold]not markup[/bold] done\n"
+
+
+def test_plain_display_strips_only_style_tags():
+    out = io.StringIO()
+    display = PlainDisplay(stream=out)
+
+    display.print("[bold yellow]Note:[/bold yellow] - [x] done; see [docs](url) and arr[index] [dim]\\[bold][/]")
+    display.print_markdown("[dim] is not markup here")
+
+    assert out.getvalue() == "Note: - [x] done; see [docs](url) and arr[index] [bold]\n[dim] is not markup here\n"
@@ -0,0 +1,77 @@
+"""Tests for rolling summarization of older chat turns."""
+
+from gemini_cli.core.client import GeminiClient
+from gemini_cli.core.fake import FakeSettings, FakeTransport
+from gemini_cli.utils.memory import ConversationMemory
+from gemini_cli.utils.summary import SUMMARY_INTRO, Summarizer, client_summarize
+
+
+def _chat(memory, start, turns):
+    # 40 tokens per message
+    for i in range(start, start + turns):
+        memory.add_message("user", f"question {i:03d} " + "x" * 147)
+        memory.add_message("model", f"answer {i:03d} " + "y" * 149)
+
+
+def test_older_turns_are_summarized_incrementally(tmp_path):
+    prompts = []
+
+    def summarize(prompt):
+        prompts.append(prompt)
+        return f"summary {len(prompts)}"
+
+    summarizer = Summarizer(summarize, threshold=800, keep=0.5)
+    memory = ConversationMemory(data_dir=tmp_path)
+    _chat(memory, 0, 10)
+    assert memory.get_context_for_api(max_tokens=10_000, summarizer=summarizer)[0]["content"].startswith("question 000")
+    assert prompts == [] and memory.summary_saved == 0
+
+    _chat(memory, 10, 10)  # 1600 tokens
+    context = memory.get_context_for_api(max_tokens=10_000, summarizer=summarizer)
+    assert context[0]["content"] == SUMMARY_INTRO + "summary 1"
+    assert context[2]["role"] == "user" and context[2]["content"].startswith("question 015")
+    assert len(context) == 2 + 10
+    assert "question 000" in prompts[0] and "answer 014" in prompts[0] and "question 015" not in prompts[0]
+    assert memory.summary.messages == 30 and memory.summary.source_tokens == 1200
+    assert memory.summary_saved == 1200 - memory.summary.tokens
+
+    # The next update sends the previous summary and only the new turns
+    _chat(memory, 20, 10)
+    context = memory.get_context_for_api(max_tokens=10_000, summarizer=summarizer)
+    assert context[0]["content"] == SUMMARY_INTRO + "summary 2"
+    assert "summary 1" in prompts[1] and "question 015" in prompts[1]
+    assert "question 014" not in prompts[1]
+    assert memory.summary.messages == 50
+
+    # Cached alongside the session, and dropped with it by /clear
+    memory.save()
+    reopened = ConversationMemory(data_dir=tmp_path)
+    assert reopened.summary.text == "summary 2"
+    assert reopened.get_context_for_api(max_tokens=10_000, summarizer=summarizer) == context
+    assert len(prompts) == 2
+    reopened.clear()
+    assert not (tmp_path / "summaries" / "default.json").exists()
+    assert ConversationMemory(data_dir=tmp_path).summary.text == ""
+
+
+def test_failed_summary_falls_back_to_plain_context(tmp_path):
+    def summarize(prompt):
+        raise RuntimeError("quota exceeded")
+
+    summarizer = Summarizer(summarize, threshold=400)
+    memory = ConversationMemory(data_dir=tmp_path)
+    _chat(memory, 0, 10)
+
+    context = memory.get_context_for_api(max_tokens=600, summarizer=summarizer)
+    assert context == memory.get_context_for_api(max_tokens=600)
+    assert summarizer.last_error == "quota exceeded" and summarizer.stats["errors"] == 1
+    assert memory.summary_saved == 0
+
+
+def test_client_summarize_uses_a_fork_on_the_summary_model():
+    transport = FakeTransport(FakeSettings(response_chars=40))
+    client = GeminiClient("key", model="gemini-1.5-pro", backend="auto", transport=transport)
+
+    summarize = client_summarize(client, "gemini-1.5-flash-8b")
+    assert summarize("Summarize this").startswith("Echo: Summarize this")
+    assert client.model_name == "gemini-1.5-pro"
@@ -0,0 +1,104 @@
+"""Tests for upload deduplication and parallel uploads."""
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from gemini_cli.core.uploads import UploadManager, format_upload_report
+
+
+class RecordingUploader:
+    """Upload stand-in that tracks calls and overlapping uploads."""
+
+    def __init__(self, delay=0.05, expires_in=timedelta(hours=48)):
+        self.delay = delay
+        self.expires_in = expires_in
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, path):
+        with self.lock:
+            self.calls.append(path)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        if path.endswith("broken.txt"):
+            raise RuntimeError("upload rejected")
+        return SimpleNamespace(
+            name=f"files/{len(self.calls)}",
+            uri=f"https://example.invalid/files/{len(self.calls)}",
+            mime_type="text/plain",
+            expiration_time=datetime.now(timezone.utc) + self.expires_in,
+        )
+
+
+def _files(tmp_path, count):
+    paths = []
+    for i in range(count):
+        path = tmp_path / f"doc{i}.txt"
+        path.write_text(f"content {i}")
+        paths.append(path)
+    return paths
+
+
+def test_uploads_run_in_parallel(tmp_path):
+    uploader = RecordingUploader()
+    manager = UploadManager(tmp_path / "uploads.json", max_workers=3, uploader=uploader)
+
+    results = manager.upload(_files(tmp_path, 6))
+
+    assert all(r.ok and not r.reused for r in results)
+    assert uploader.peak == 3
+    assert all(r.seconds >= uploader.delay for r in results)
+
+
+def test_known_content_is_reused_across_managers(tmp_path):
+    uploader = RecordingUploader(delay=0)
+    files = _files(tmp_path, 2)
+    first = UploadManager(tmp_path / "uploads.json", uploader=uploader).upload(files)
+
+    # A renamed copy with the same bytes is recognised by content hash
+    copy = tmp_path / "renamed.txt"
+    copy.write_bytes(files[0].read_bytes())
+    results = UploadManager(tmp_path / "uploads.json", uploader=uploader).upload([copy, files[1]])
+
+    assert len(uploader.calls) == 2
+    assert all(r.reused for r in results)
+    assert results[0].part["file_data"]["file_uri"] == first[0].part.uri
+
+
+def test_expired_handles_are_uploaded_again(tmp_path):
+    uploader = RecordingUploader(delay=0, expires_in=timedelta(minutes=1))
+    manager = UploadManager(tmp_path / "uploads.json", uploader=uploader)
+    files = _files(tmp_path, 1)
+
+    manager.upload(files)
+    results = manager.upload(files)
+
+    assert len(uploader.calls) == 2
+    assert not results[0].reused
+
+
+def test_duplicates_and_failures_in_one_call(tmp_path):
+    uploader = RecordingUploader(delay=0)
+    manager = UploadManager(uploader=uploader)
+    doc = _files(tmp_path, 1)[0]
+    broken = tmp_path / "broken.txt"
+    broken.write_text("bad")
+
+    results = manager.upload([doc, doc, broken, tmp_path / "missing.txt"])
+
+    assert len(uploader.calls) == 2
+    assert results[0].ok and results[1].reused
+    assert results[2].error == "upload rejected"
+    assert not results[3].ok
+
+    report = format_upload_report(results)
+    assert report[0].startswith("doc0.txt: uploaded")
+    assert report[1] == "doc0.txt: reused existing upload"
+    assert report[2] == "broken.txt: failed (upload rejected)"